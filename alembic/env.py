@@ -9,6 +9,8 @@ from scout.utils.storage.postgres_models import Chunk  # noqa: F401 Unused impor
 from scout.utils.storage.postgres_models import Criterion  # noqa: F401 Unused import needed for alembic build
 from scout.utils.storage.postgres_models import CriterionGate  # noqa: F401 Unused import needed for alembic build
 from scout.utils.storage.postgres_models import File  # noqa: F401 Unused import needed for alembic build
+from scout.utils.storage.postgres_models import IngestionRun  # noqa: F401 Unused import needed for alembic build
+from scout.utils.storage.postgres_models import IngestionRunFile  # noqa: F401 Unused import needed for alembic build
 from scout.utils.storage.postgres_models import Project  # noqa: F401 Unused import needed for alembic build
 from scout.utils.storage.postgres_models import project_criterions  # noqa: F401 Unused import needed for alembic build
 from scout.utils.storage.postgres_models import project_users  # noqa: F401 Unused import needed for alembic build
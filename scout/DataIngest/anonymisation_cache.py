@@ -0,0 +1,93 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from presidio_analyzer import RecognizerResult
+
+from scout.utils.storage.cache_store import CacheStore, get_cache_store
+
+# Cache entries read or written at once, as entries in S3 are one request each
+DEFAULT_ANONYMISATION_CACHE_MAX_WORKERS = 16
+
+
+def anonymisation_cache_key(text: str, entities: List[str], score_threshold: float, model_version: str) -> str:
+    # Results depend on the entities looked for, the threshold and the NER model, so they are cached separately
+    text_hash = hashlib.sha256(text.encode()).hexdigest()
+    return f"{model_version}/{'-'.join(sorted(entities))}/{score_threshold}/{text_hash}.json"
+
+
+class AnonymisationCache:
+    """
+    Cache of the entities presidio found in texts (e.g. chunks), keyed by a hash of the text, the entities looked
+    for, the score threshold and the NER model version, so that the same text is only analysed once.
+
+    Only the spans of entities are cached, not their placeholders. Placeholders are given out by the `Anonymizer`
+    applying the results, so people are numbered by the project's own mapping whether results are cached or not.
+    """
+
+    def __init__(self, store: CacheStore):
+        self.store = store
+
+    def get(
+        self, text: str, entities: List[str], score_threshold: float, model_version: str
+    ) -> Optional[List[RecognizerResult]]:
+        """Entities found in the text before, or None if it isn't cached"""
+        body = self.store.get(anonymisation_cache_key(text, entities, score_threshold, model_version))
+        if body is None:
+            return None
+        return [RecognizerResult(**result) for result in json.loads(body)]
+
+    def put(
+        self,
+        text: str,
+        entities: List[str],
+        score_threshold: float,
+        model_version: str,
+        analyzer_results: List[RecognizerResult],
+    ) -> None:
+        body = json.dumps(
+            [
+                {"entity_type": result.entity_type, "start": result.start, "end": result.end, "score": result.score}
+                for result in analyzer_results
+            ]
+        ).encode()
+        self.store.put(anonymisation_cache_key(text, entities, score_threshold, model_version), body)
+
+    def get_many(
+        self, texts: List[str], entities: List[str], score_threshold: float, model_version: str
+    ) -> List[Optional[List[RecognizerResult]]]:
+        with ThreadPoolExecutor(max_workers=DEFAULT_ANONYMISATION_CACHE_MAX_WORKERS) as executor:
+            return list(executor.map(lambda text: self.get(text, entities, score_threshold, model_version), texts))
+
+    def put_many(
+        self,
+        texts: List[str],
+        entities: List[str],
+        score_threshold: float,
+        model_version: str,
+        all_analyzer_results: List[List[RecognizerResult]],
+    ) -> None:
+        with ThreadPoolExecutor(max_workers=DEFAULT_ANONYMISATION_CACHE_MAX_WORKERS) as executor:
+            list(
+                executor.map(
+                    lambda text, analyzer_results: self.put(
+                        text, entities, score_threshold, model_version, analyzer_results
+                    ),
+                    texts,
+                    all_analyzer_results,
+                )
+            )
+
+
+@lru_cache(maxsize=None)
+def get_anonymisation_cache() -> Optional[AnonymisationCache]:
+    """
+    Anonymisation cache set by the ANONYMISATION_CACHE environment variable: "local" (in
+    ANONYMISATION_CACHE_DIRECTORY) or "s3" (in the bucket used for project files). None if unset, so that texts are
+    always analysed.
+    """
+    store = get_cache_store("ANONYMISATION_CACHE", Path(".data/anonymisation_cache"), s3_prefix="anonymisation-cache/")
+    return AnonymisationCache(store) if store else None
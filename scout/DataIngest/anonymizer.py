@@ -1,48 +1,188 @@
-from typing import List
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from importlib.metadata import version
+from typing import Dict, List, Optional
 
 from presidio_analyzer import AnalyzerEngine, RecognizerResult
 from presidio_anonymizer import AnonymizerEngine, EngineResult
 from presidio_anonymizer.entities import OperatorConfig
 
+from scout.DataIngest.anonymisation_cache import get_anonymisation_cache
+from scout.utils.utils import logger
+
+ANONYMISED_ENTITIES = ["PERSON", "PHONE_NUMBER", "EMAIL_ADDRESS"]
+SCORE_THRESHOLD = 0.8
+
 
 class ConsistentPersonOperator:
     """Means that if a name comes up multiple times they are name consistently
     Expansion idea: use LLM to infer names of people (e.g SRO)
     """
 
-    def __init__(self):
-        self.person_map = {}
-        self.counter = 1
+    def __init__(self, person_map: Optional[Dict[str, str]] = None):
+        # An existing mapping (e.g. saved with a project) carries on numbering from where it left off
+        self.person_map = dict(person_map or {})
+        self.counter = len(self.person_map) + 1
+        self._lock = threading.Lock()
 
     def __call__(self, text, **kwargs):
-        if text not in self.person_map:
-            self.person_map[text] = f"<Person {self.counter}>"
-            self.counter += 1
-        return self.person_map[text]
+        with self._lock:
+            if text not in self.person_map:
+                self.person_map[text] = f"<Person {self.counter}>"
+                self.counter += 1
+            return self.person_map[text]
+
+
+@lru_cache(maxsize=None)
+def get_analyzer_engine() -> AnalyzerEngine:
+    """Analyzer engine shared by everything in this process - building one loads a spaCy model"""
+    return AnalyzerEngine()
+
+
+@lru_cache(maxsize=None)
+def get_analyzer_model_version() -> str:
+    """Versions of presidio and the NER models loaded by the shared analyzer engine, e.g. for cache keys"""
+    nlp = getattr(get_analyzer_engine().nlp_engine, "nlp", None) or {}
+    models = [f"{language}_{model.meta['name']}-{model.meta['version']}" for language, model in sorted(nlp.items())]
+    return "_".join([f"presidio-{version('presidio-analyzer')}", *models])
+
+
+@lru_cache(maxsize=None)
+def get_anonymizer_engine() -> AnonymizerEngine:
+    return AnonymizerEngine()
+
+
+def warm_up_engines() -> None:
+    """
+    Loads the shared presidio engines now rather than on first use, e.g. in a worker process initializer,
+    or before forking worker processes so that they inherit the loaded engines.
+    """
+    get_analyzer_engine().analyze(text="Warm up", language="en")
+    get_anonymizer_engine()
+
+
+def anonymising_pool_kwargs() -> dict:
+    """
+    Keyword arguments for a process pool whose workers anonymise text, so that each worker loads the presidio
+    engines once rather than for every file. With fork, workers inherit engines loaded here before forking.
+    """
+    if multiprocessing.get_start_method() == "fork":
+        warm_up_engines()
+        return {}
+    return {"initializer": warm_up_engines}
+
+
+def analyze_text(text: str) -> List[RecognizerResult]:
+    return get_analyzer_engine().analyze(
+        text=text,
+        language="en",
+        entities=ANONYMISED_ENTITIES,
+        score_threshold=SCORE_THRESHOLD,
+    )
+
+
+def _analyze_texts(
+    texts: List[str], max_workers: int = 1, executor: Optional[Executor] = None
+) -> List[List[RecognizerResult]]:
+    if len(texts) <= 1 or (executor is None and max_workers <= 1):
+        return [analyze_text(text) for text in texts]
+    chunksize = max(1, len(texts) // (max_workers * 4))
+    if executor is not None:
+        return list(executor.map(analyze_text, texts, chunksize=chunksize))
+    with ProcessPoolExecutor(max_workers=max_workers, **anonymising_pool_kwargs()) as executor:
+        return list(executor.map(analyze_text, texts, chunksize=chunksize))
+
+
+def analyze_texts(
+    texts: List[str], max_workers: int = 1, executor: Optional[Executor] = None
+) -> List[List[RecognizerResult]]:
+    """
+    Finds entities to anonymise in each text, spread across worker processes if max_workers > 1. Pass an executor
+    (see `anonymising_pool_kwargs`) with max_workers workers to reuse one process pool across many calls, rather
+    than starting a pool for each call.
+
+    Analysis is the slow part of anonymisation. Results can be applied with `Anonymizer.anonymize` afterwards,
+    in one process, so that people are numbered consistently.
+
+    If an anonymisation cache is set (see `get_anonymisation_cache`), texts analysed before (e.g. when a project is
+    ingested again, or a document is in several projects) are read from it, and only the rest are analysed.
+    """
+    anonymisation_cache = get_anonymisation_cache()
+    if anonymisation_cache is None:
+        return _analyze_texts(texts, max_workers=max_workers, executor=executor)
+
+    model_version = get_analyzer_model_version()
+    all_analyzer_results = anonymisation_cache.get_many(texts, ANONYMISED_ENTITIES, SCORE_THRESHOLD, model_version)
+    # Each text missing from the cache is analysed once, however many times it comes up
+    missed_texts = list(dict.fromkeys(text for text, results in zip(texts, all_analyzer_results) if results is None))
+    logger.info(f"Anonymisation cache hits: {len(texts) - len(missed_texts)} of {len(texts)} texts")
+    if not missed_texts:
+        return all_analyzer_results
+
+    missed_analyzer_results = _analyze_texts(missed_texts, max_workers=max_workers, executor=executor)
+    anonymisation_cache.put_many(
+        missed_texts, ANONYMISED_ENTITIES, SCORE_THRESHOLD, model_version, missed_analyzer_results
+    )
+    analyzer_results_by_text = dict(zip(missed_texts, missed_analyzer_results))
+    return [
+        results if results is not None else analyzer_results_by_text[text]
+        for text, results in zip(texts, all_analyzer_results)
+    ]
 
 
 class Anonymizer:
-    """Anonmyizes chunks using presidio"""
+    """Anonmyizes chunks using presidio
 
-    def __init__(self) -> None:
-        self.analyzer = AnalyzerEngine()
-        self.anonymizer = AnonymizerEngine()
+    The presidio engines are shared across Anonymizers in a process. Each Anonymizer keeps its own
+    mapping of people's names, which can be started from a saved mapping (e.g. for a project).
+    """
+
+    def __init__(
+        self,
+        analyzer: Optional[AnalyzerEngine] = None,
+        anonymizer: Optional[AnonymizerEngine] = None,
+        person_map: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.analyzer = analyzer or get_analyzer_engine()
+        self.anonymizer = anonymizer or get_anonymizer_engine()
 
-        consistent_person_operator = ConsistentPersonOperator()
+        self.consistent_person_operator = ConsistentPersonOperator(person_map)
         self.operators = {
-            "PERSON": OperatorConfig("custom", {"lambda": consistent_person_operator}),
+            "PERSON": OperatorConfig("custom", {"lambda": self.consistent_person_operator}),
             "PHONE_NUMBER": OperatorConfig("mask", {"chars_to_mask": 6, "masking_char": "*", "from_end": True}),
             "EMAIL_ADDRESS": OperatorConfig("replace", {"new_value": "<EMAIL>"}),
         }
 
+    @property
+    def person_map(self) -> Dict[str, str]:
+        """Names of people found so far, mapped to their placeholders"""
+        return dict(self.consistent_person_operator.person_map)
+
     def analyze(self, text: str) -> List[RecognizerResult]:
+        if self.analyzer is get_analyzer_engine():
+            # Goes through the anonymisation cache, which is keyed by the shared engine's models
+            return analyze_texts([text])[0]
         return self.analyzer.analyze(
             text=text,
             language="en",
-            entities=["PERSON", "PHONE_NUMBER", "EMAIL_ADDRESS"],
-            score_threshold=0.8,
+            entities=ANONYMISED_ENTITIES,
+            score_threshold=SCORE_THRESHOLD,
         )
 
-    def anonymize(self, text: str) -> EngineResult:
-        analyzer_results = self.analyze(text)
+    def anonymize(self, text: str, analyzer_results: Optional[List[RecognizerResult]] = None) -> EngineResult:
+        """Anonymizes text, using analyzer results found already (e.g. by `analyze_texts`) if given"""
+        if analyzer_results is None:
+            analyzer_results = self.analyze(text)
         return self.anonymizer.anonymize(text, analyzer_results, operators=self.operators)
+
+    def anonymize_many(self, texts: List[str], max_workers: int = 1, executor: Optional[Executor] = None) -> List[str]:
+        """
+        Anonymizes texts, analysing them across worker processes if max_workers > 1 (in executor, if given).
+        Placeholders are then applied here in order, so people are numbered the same however many workers are used.
+        """
+        all_analyzer_results = analyze_texts(texts, max_workers=max_workers, executor=executor)
+        return [
+            self.anonymize(text, analyzer_results).text for text, analyzer_results in zip(texts, all_analyzer_results)
+        ]
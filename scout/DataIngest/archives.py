@@ -0,0 +1,89 @@
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, Optional
+
+from scout.DataIngest.utils import is_ingestible_file
+from scout.utils.storage.filesystem import S3StorageHandler
+from scout.utils.utils import logger
+
+ARCHIVE_EXTENSIONS = (".zip",)
+DEFAULT_ARCHIVE_MAX_WORKERS = int(os.getenv("ARCHIVE_MAX_WORKERS", 4))
+
+
+def is_archive(file_name: str) -> bool:
+    return Path(file_name).suffix.lower() in ARCHIVE_EXTENSIONS
+
+
+@contextmanager
+def open_archive(
+    archive: str | Path, s3_storage_handler: Optional[S3StorageHandler] = None
+) -> Iterator[zipfile.ZipFile]:
+    """
+    Opens a zip archive on local disk, or if an S3 storage handler is given, the archive with that key in the bucket.
+    An archive in S3 is read into a spooled buffer (kept in memory if small, otherwise in a single temporary file),
+    and its members are read straight out of it rather than being extracted.
+    """
+    if s3_storage_handler is not None:
+        with s3_storage_handler.read_spooled(str(archive)) as buffer, zipfile.ZipFile(buffer) as zip_file:
+            yield zip_file
+    else:
+        with zipfile.ZipFile(archive) as zip_file:
+            yield zip_file
+
+
+def get_archive_members(zip_file: zipfile.ZipFile, exclude: Optional[List[str]] = None) -> Dict[str, zipfile.ZipInfo]:
+    """
+    Members of an archive to ingest, by the file name they are ingested as. Folders, hidden files (e.g. macOS
+    resource forks) and file types that can't be ingested are skipped. Files in folders are named after their
+    folder as well if another member has the same name.
+    """
+    members: Dict[str, zipfile.ZipInfo] = {}
+    for member in zip_file.infolist():
+        path = PurePosixPath(member.filename)
+        if member.is_dir() or any(part.startswith((".", "__MACOSX")) for part in path.parts):
+            continue
+        if not is_ingestible_file(path.name):
+            logger.info(f"Skipping {member.filename} in archive, its file type can't be ingested")
+            continue
+        file_name = path.name if path.name not in members else "-".join(path.parts)
+        members[file_name] = member
+    # Named before excluding, so members are named the same when an upload is retried
+    return {file_name: member for file_name, member in members.items() if file_name not in (exclude or [])}
+
+
+def upload_archive_members(
+    archive: str | Path,
+    s3_storage_handler: S3StorageHandler,
+    prefix: str,
+    archive_in_s3: bool = False,
+    exclude: Optional[List[str]] = None,
+    max_workers: int = DEFAULT_ARCHIVE_MAX_WORKERS,
+) -> List[str]:
+    """
+    Streams the files in a zip archive into S3 under prefix, decompressing each member as it is uploaded, several
+    members at once. Nothing is extracted to disk.
+
+    Args:
+        archive: local path, or key of the archive in the S3 bucket if archive_in_s3
+        exclude: file names to skip, e.g. files uploaded by an earlier attempt
+
+    Returns:
+        Keys of the uploaded files in S3
+    """
+    with open_archive(archive, s3_storage_handler=s3_storage_handler if archive_in_s3 else None) as zip_file:
+        members = get_archive_members(zip_file, exclude=exclude)
+        logger.info(f"Uploading {len(members)} files from archive {archive}")
+        if not members:
+            return []
+
+        def upload(file_name: str) -> str:
+            # Members can be read from several threads at once, each read seeks the shared file under a lock
+            with zip_file.open(members[file_name]) as member_file:
+                s3_storage_handler.write_fileobj(member_file, prefix + file_name)
+            return prefix + file_name
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(members))) as executor:
+            return list(executor.map(upload, members))
@@ -0,0 +1,130 @@
+import hashlib
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from unstructured.documents.elements import Element
+
+from scout.DataIngest.models.schemas import encoding
+from scout.utils.utils import logger
+
+# Only short blocks of text are treated as boilerplate (banners, headers, footers), so repeated paragraphs are kept
+MAX_BOILERPLATE_CHARACTERS = 300
+# Text is boilerplate if it is repeated on at least this many pages, and at least this fraction of the file's pages
+MIN_BOILERPLATE_PAGES = 3
+MIN_BOILERPLATE_PAGE_FRACTION = 0.5
+# Page numbers, e.g. "Page 3 of 40", "3 of 40", "3/40", "- 3 -" or "3"
+PAGE_NUMBER_PATTERN = re.compile(r"(page )?\d+( ?(of|/) ?\d+)?|[-–—] ?\d+ ?[-–—]")
+
+
+def normalise_text(text: str) -> str:
+    text = re.sub(r"\s+", " ", text.lower()).strip()
+    # Numbers are only ignored in page numbers, so "Page 3 of 40" matches "Page 4 of 40" but numbered headings,
+    # figures and years are kept apart
+    if PAGE_NUMBER_PATTERN.fullmatch(text):
+        return re.sub(r"\d+", "#", text)
+    return text
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(normalise_text(text).encode()).hexdigest()
+
+
+class BoilerplateReport:
+    """What was stripped from a file"""
+
+    def __init__(self, hashes: Set[str], elements_removed: int, tokens_saved: int):
+        self.hashes = hashes
+        self.elements_removed = elements_removed
+        self.tokens_saved = tokens_saved
+
+    def __str__(self) -> str:
+        return (
+            f"Stripped {self.elements_removed} boilerplate elements ({len(self.hashes)} distinct), "
+            f"saving {self.tokens_saved} tokens"
+        )
+
+
+class ProjectBoilerplate:
+    """
+    Boilerplate found in files of a project so far, so it is also stripped from later files where it isn't
+    repeated enough to be found (e.g. a classification banner on a one page letter).
+    """
+
+    def __init__(self, hashes: Optional[Iterable[str]] = None):
+        self.hashes: Set[str] = set(hashes or [])
+        self.elements_removed = 0
+        self.tokens_saved = 0
+        self._lock = threading.Lock()
+
+    def add(self, report: BoilerplateReport) -> None:
+        with self._lock:
+            self.hashes.update(report.hashes)
+            self.elements_removed += report.elements_removed
+            self.tokens_saved += report.tokens_saved
+
+    def copy_hashes(self) -> Set[str]:
+        """Hashes found so far, e.g. to send to a worker process"""
+        with self._lock:
+            return set(self.hashes)
+
+    def report(self) -> BoilerplateReport:
+        """What was stripped with this project boilerplate, e.g. to send back from a worker process"""
+        with self._lock:
+            return BoilerplateReport(
+                hashes=set(self.hashes), elements_removed=self.elements_removed, tokens_saved=self.tokens_saved
+            )
+
+
+def find_boilerplate(
+    elements: List[Element],
+    min_pages: int = MIN_BOILERPLATE_PAGES,
+    min_page_fraction: float = MIN_BOILERPLATE_PAGE_FRACTION,
+) -> Set[str]:
+    """Hashes of short text blocks repeated across many pages of a file"""
+    pages_by_hash: Dict[str, Set[int]] = defaultdict(set)
+    for element in elements:
+        page_number = element.metadata.page_number
+        if page_number is not None and element.text and len(element.text) <= MAX_BOILERPLATE_CHARACTERS:
+            pages_by_hash[text_hash(element.text)].add(page_number)
+    num_pages = len({page for pages in pages_by_hash.values() for page in pages})
+    threshold = max(min_pages, num_pages * min_page_fraction)
+    return {hash_ for hash_, pages in pages_by_hash.items() if len(pages) >= threshold}
+
+
+def strip_boilerplate(
+    elements: List[Element], project_boilerplate: Optional[ProjectBoilerplate] = None
+) -> Tuple[List[Element], BoilerplateReport]:
+    """
+    Removes headers, footers, banners and other text repeated across the pages of a file (or found in earlier
+    files of the project) from partitioned elements, before they are chunked.
+
+    Returns:
+        Remaining elements, and a report of what was removed
+    """
+    boilerplate_hashes = find_boilerplate(elements)
+    if project_boilerplate:
+        boilerplate_hashes |= project_boilerplate.hashes
+
+    kept, removed = [], []
+    for element in elements:
+        if (
+            element.text
+            and len(element.text) <= MAX_BOILERPLATE_CHARACTERS
+            and text_hash(element.text) in boilerplate_hashes
+        ):
+            removed.append(element)
+        else:
+            kept.append(element)
+
+    tokens_saved = sum(len(tokens) for tokens in encoding.encode_ordinary_batch([element.text for element in removed]))
+    report = BoilerplateReport(
+        hashes={text_hash(element.text) for element in removed},
+        elements_removed=len(removed),
+        tokens_saved=tokens_saved,
+    )
+    if project_boilerplate:
+        project_boilerplate.add(report)
+    logger.info(str(report))
+    return kept, report
@@ -0,0 +1,153 @@
+import threading
+from typing import Dict, List, Optional
+
+from scout.DataIngest.models.schemas import (
+    INGESTION_STAGE_ORDER,
+    File,
+    IngestionRunCreate,
+    IngestionRunFile,
+    IngestionRunFileCreate,
+    IngestionRunFileFilter,
+    IngestionRunFileUpdate,
+    IngestionRunUpdate,
+    IngestionStage,
+    Project,
+)
+from scout.utils.storage.storage_handler import BaseStorageHandler
+from scout.utils.utils import logger
+
+
+class IngestionCheckpointer:
+    """
+    Records how far each file of a project has got through ingestion in the `ingestion_run` and
+    `ingestion_run_file` tables, so that an ingestion run that fails part way can be resumed
+    without redoing finished work.
+
+    Files are identified by their raw file name, processed (PDF) files are matched back to them by name.
+    """
+
+    def __init__(self, project: Project, project_directory_name: str, storage_handler: BaseStorageHandler):
+        self.storage_handler = storage_handler
+        self.run = storage_handler.write_item(
+            IngestionRunCreate(project_directory_name=project_directory_name, project=project)
+        )
+        self.project = project
+        self._lock = threading.Lock()
+        existing_files = storage_handler.get_item_by_attribute(IngestionRunFileFilter(run=self.run)) or []
+        self.files: Dict[str, IngestionRunFile] = {run_file.name: run_file for run_file in existing_files}
+
+    def start(self) -> None:
+        """
+        Marks the run "running" when ingestion starts or resumes, so that ingestion workers claim its files. Not
+        done on construction, so that coordinators and workers reading a run leave a finished run finished.
+        """
+        if self.run.status != "running":
+            self.run = self.storage_handler.update_item(
+                IngestionRunUpdate(
+                    id=self.run.id,
+                    project_directory_name=self.run.project_directory_name,
+                    status="running",
+                    project=self.project,
+                )
+            )
+
+    def stage_of(self, file_name: str) -> Optional[IngestionStage]:
+        run_file = self._find(file_name)
+        return IngestionStage(run_file.stage) if run_file else None
+
+    def is_done(self, file_name: str, stage: IngestionStage) -> bool:
+        """Whether a file has already got to (or past) the given stage"""
+        current_stage = self.stage_of(file_name)
+        if current_stage is None:
+            return False
+        return INGESTION_STAGE_ORDER.index(current_stage) >= INGESTION_STAGE_ORDER.index(stage)
+
+    def files_at(self, stage: IngestionStage) -> List[IngestionRunFile]:
+        """Files that have got to exactly the given stage"""
+        return [run_file for run_file in self.files.values() if IngestionStage(run_file.stage) == stage]
+
+    def mark(
+        self,
+        file_name: str,
+        stage: IngestionStage,
+        raw_s3_key: Optional[str] = None,
+        processed_s3_key: Optional[str] = None,
+        file: Optional[File] = None,
+    ) -> IngestionRunFile:
+        """Records that a file has finished a stage, clearing any error from an earlier attempt"""
+        with self._lock:
+            run_file = self._find(file_name)
+            if run_file is None:
+                run_file = self.storage_handler.write_item(
+                    IngestionRunFileCreate(
+                        name=file_name,
+                        raw_s3_key=raw_s3_key,
+                        processed_s3_key=processed_s3_key,
+                        stage=stage,
+                        run=self.run,
+                        file=file,
+                    )
+                )
+            else:
+                run_file = self.storage_handler.update_item(
+                    IngestionRunFileUpdate(
+                        id=run_file.id,
+                        name=run_file.name,
+                        raw_s3_key=raw_s3_key or run_file.raw_s3_key,
+                        processed_s3_key=processed_s3_key or run_file.processed_s3_key,
+                        stage=stage,
+                        error=None,
+                        run=self.run,
+                        file=file or run_file.file,
+                    )
+                )
+            self.files[run_file.name] = run_file
+            return run_file
+
+    def mark_failed(self, file_name: str, error: Exception) -> None:
+        """Records the error a file failed with, leaving it at the last stage it finished"""
+        with self._lock:
+            run_file = self._find(file_name)
+            if run_file is None:
+                logger.error(f"Can't record error for {file_name}, it has no ingestion checkpoint")
+                return
+            update = IngestionRunFileUpdate(
+                id=run_file.id,
+                name=run_file.name,
+                raw_s3_key=run_file.raw_s3_key,
+                processed_s3_key=run_file.processed_s3_key,
+                stage=run_file.stage,
+                error=str(error),
+                run=self.run,
+                file=run_file.file,
+            )
+            self.files[run_file.name] = self.storage_handler.update_item(update)
+
+    def finish(self) -> str:
+        """Marks the run complete if every file is embedded, otherwise incomplete so that it can be resumed"""
+        unfinished = [
+            run_file.name
+            for run_file in self.files.values()
+            if IngestionStage(run_file.stage) != IngestionStage.EMBEDDED
+        ]
+        status = "incomplete" if unfinished else "complete"
+        if unfinished:
+            logger.error(f"{len(unfinished)} files did not finish ingesting, resume the project to retry: {unfinished}")
+        self.run = self.storage_handler.update_item(
+            IngestionRunUpdate(
+                id=self.run.id,
+                project_directory_name=self.run.project_directory_name,
+                status=status,
+                project=self.project,
+            )
+        )
+        return status
+
+    def _find(self, file_name: str) -> Optional[IngestionRunFile]:
+        # Accepts either the raw file name or the name of its processed PDF
+        if file_name in self.files:
+            return self.files[file_name]
+        for run_file in self.files.values():
+            if run_file.processed_s3_key and run_file.processed_s3_key.split("/")[-1] == file_name:
+                return run_file
+        return None
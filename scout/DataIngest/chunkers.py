@@ -1,75 +1,84 @@
+import hashlib
+import os
 import tempfile
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-import requests
+from langchain.embeddings import CacheBackedEmbeddings
+from presidio_analyzer import RecognizerResult
 from unstructured.chunking.title import chunk_by_title
 from unstructured.documents.elements import Element
-from unstructured.partition.auto import partition
 
 from scout.DataIngest.anonymizer import Anonymizer
-from scout.DataIngest.models.schemas import ChunkCreate, File
+from scout.DataIngest.boilerplate import ProjectBoilerplate, strip_boilerplate
+from scout.DataIngest.embedding import (
+    DEFAULT_MAX_CONCURRENT_BATCHES,
+    DEFAULT_MAX_TOKENS_PER_BATCH,
+    count_tokens,
+    make_token_batches,
+)
+from scout.DataIngest.memory import log_peak_rss
+from scout.DataIngest.models.schemas import Chunk, ChunkBase, ChunkCreate, File
+from scout.DataIngest.partition_cache import get_partition_cache
+from scout.DataIngest.partitioning import NATIVE_PARTITION_FILE_TYPES, partition_file
+from scout.utils.storage.filesystem import S3StorageHandler
 from scout.utils.utils import logger
 
+# Chunks are cut at the first title after new_after_n_chars characters, and never grow past max_characters.
+# Compare settings on a corpus with `scripts/benchmark_chunking.py`.
+DEFAULT_CHUNK_MAX_CHARACTERS = int(os.getenv("CHUNK_MAX_CHARACTERS", 2000))
+DEFAULT_CHUNK_NEW_AFTER_N_CHARS = int(os.getenv("CHUNK_NEW_AFTER_N_CHARS", 1750))
 
-def download_to_tempfile(presigned_url: str, suffix: Optional[str] = None) -> Path:
-    """
-    Downloads content from a presigned URL to a temporary file.
 
-    Args:
-        presigned_url (str): The presigned URL to download from
-        suffix (Optional[str]): Optional suffix for the temp file (e.g. '.pdf', '.zip')
+def download_s3_object_to_tempfile_with_hash(
+    s3_storage_handler: S3StorageHandler, key: str, suffix: Optional[str] = None
+) -> Tuple[Path, str]:
+    """
+    Downloads an object in our bucket to a temporary file, hashing the content as it is streamed. Reads through the
+    storage handler's boto3 client, reusing its pooled connections.
 
     Returns:
-        Path: Path to the temporary file
-
-    Raises:
-        requests.RequestException: If the download fails
+        Tuple[Path, str]: Path to the temporary file and SHA-256 hex digest of its content
     """
-    # Create a temporary file that will be automatically cleaned up
-    logger.info(f"Creating tempfile with suffix: {suffix}")
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    logger.info(f"Tempfile created: {temp_file.name}")
-    try:
-        # Stream the download to avoid loading entire file into memory
-        with requests.get(presigned_url, stream=True) as response:
-            response.raise_for_status()
-
-            # Write the content to the temporary file in chunks
-            for chunk in response.iter_content(chunk_size=8192):
+    content_hash = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        try:
+            for chunk in s3_storage_handler.iter_chunks(key):
                 temp_file.write(chunk)
+                content_hash.update(chunk)
+        except Exception:
+            temp_file.close()
+            Path(temp_file.name).unlink(missing_ok=True)
+            raise
+    logger.info(f"Downloaded {key} to {temp_file.name}")
+    return Path(temp_file.name), content_hash.hexdigest()
 
-        logger.info(f"Tempfile written to: {temp_file.name}")
-        temp_file.close()
-        return Path(temp_file.name)
-
-    except requests.RequestException as e:
-        # Clean up the temp file if download fails
-        temp_file.close()
-        logger.info(f"Tempfile closed with exception: {e}")
-        Path(temp_file.name).unlink(missing_ok=True)
-        raise e
 
-
-def process_chunks(file: File, raw_chunks: list[Element]) -> list[ChunkCreate]:
+def process_chunks(
+    file: File,
+    raw_chunks: list[Element],
+    partition_strategy: Optional[str] = None,
+    page_strategies: Optional[Dict[int, str]] = None,
+) -> list[ChunkCreate]:
     chunks = []
-    for i, raw_chunk in enumerate(raw_chunks):
-        raw_chunk = raw_chunk.to_dict()
-
-        if "page_number" in raw_chunk["metadata"]:
-            if isinstance(raw_chunk["metadata"]["page_number"], int):
-                raw_chunk["metadata"]["page_numbers"] = raw_chunk["metadata"]["page_number"]
-            elif isinstance(raw_chunk["metadata"]["page_number"], list):
-                raw_chunk["metadata"]["page_numbers"] = raw_chunk["metadata"]["page_number"][0]
-        else:
-            raw_chunk["metadata"]["page_numbers"] = 0
-
-        logger.info(f"file: {file}, type: {type(file)}")
+    # Counted in one batch, so later stages can budget prompts and embedding requests without tokenising again
+    token_counts = count_tokens([raw_chunk.text for raw_chunk in raw_chunks])
+    for i, (raw_chunk, token_count) in enumerate(zip(raw_chunks, token_counts)):
+        # Read from the element rather than `to_dict()`, which serialises every original element of the chunk
+        page_number = raw_chunk.metadata.page_number
+        if isinstance(page_number, list):
+            page_number = page_number[0]
+        elif not isinstance(page_number, int):
+            page_number = 0
+
         chunk = ChunkCreate(
             file=file,
             idx=i,
-            text=raw_chunk["text"],
-            page_num=raw_chunk["metadata"]["page_numbers"],
+            text=raw_chunk.text,
+            page_num=page_number,
+            partition_strategy=(page_strategies or {}).get(page_number, partition_strategy),
+            token_count=token_count,
         )
         chunks.append(chunk)
     return chunks
@@ -80,57 +89,180 @@ def partition_and_chunk_file(
     temp_filepath: str,
     chunking_strategy: str,
     anonymise: bool = False,
+    anonymizer: Optional[Anonymizer] = None,
+    anonymise_max_workers: int = 1,
+    anonymise_executor: Optional[Executor] = None,
+    partition_max_workers: int = 1,
+    strip_repeated_text: bool = True,
+    project_boilerplate: Optional[ProjectBoilerplate] = None,
+    max_characters: int = DEFAULT_CHUNK_MAX_CHARACTERS,
+    new_after_n_chars: int = DEFAULT_CHUNK_NEW_AFTER_N_CHARS,
 ) -> List[ChunkCreate]:
     # Chunking strategy options: https://docs.unstructured.io/open-source/core-functionality/partitioning#partition
-    anonymizer = Anonymizer()
-    logger.info(f"Partitioning file from temp file path: {temp_filepath}")
-    elements = partition(filename=temp_filepath, strategy=chunking_strategy)
-    logger.info(f"Finished Partitioning file: {elements}")
+    # Large PDFs are partitioned in page ranges across partition_max_workers processes
+    partition_cache = get_partition_cache()
+    cached = (
+        partition_cache.get(file.content_hash, chunking_strategy) if partition_cache and file.content_hash else None
+    )
+    if cached:
+        logger.info(f"Using cached partition of file: {file.name}")
+        elements, page_strategies = cached
+    else:
+        logger.info(f"Partitioning file from temp file path: {temp_filepath}")
+        elements, page_strategies = partition_file(
+            temp_filepath, strategy=chunking_strategy, max_workers=partition_max_workers
+        )
+        if partition_cache and file.content_hash:
+            partition_cache.put(file.content_hash, chunking_strategy, elements, page_strategies)
+    # Logs counts rather than elements, formatting every element of a large file would take up as much memory again
+    logger.info(f"Finished Partitioning file {file.name} into {len(elements)} elements")
 
-    logger.info(f"Chunking file by title: {elements}")
-    raw_chunks = chunk_by_title(elements=elements, max_characters=2000, new_after_n_chars=1750)
-    logger.info(f"Finished Chunking file by title: {raw_chunks}")
+    if strip_repeated_text:
+        # Headers, footers and banners repeated across pages would only use up embedding tokens
+        elements, _ = strip_boilerplate(elements, project_boilerplate=project_boilerplate)
+
+    raw_chunks = chunk_by_title(elements=elements, max_characters=max_characters, new_after_n_chars=new_after_n_chars)
+    logger.info(f"Chunked {len(elements)} elements of {file.name} by title into {len(raw_chunks)} chunks")
 
     if anonymise:
-        logger.info("Anonymizing chunks")
-        for raw_chunk in raw_chunks:
-            raw_chunk.text = anonymizer.anonymize(raw_chunk.text).text
-        logger.info("Finished Anonymizing chunks")
+        anonymise_chunks(
+            raw_chunks, anonymizer=anonymizer, max_workers=anonymise_max_workers, executor=anonymise_executor
+        )
 
-    logger.info(f"Processing chunks by title: {raw_chunks}")
-    chunks = process_chunks(file=file, raw_chunks=raw_chunks)
-    logger.info(f"Finished Processing chunks by title: {chunks}")
+    chunks = process_chunks(
+        file=file, raw_chunks=raw_chunks, partition_strategy=chunking_strategy, page_strategies=page_strategies
+    )
 
     temp_filepath.unlink(missing_ok=True)
     return chunks
 
 
-def add_chunks_to_vector_store(chunks: List[ChunkCreate], project_id, vector_store) -> None:
+def anonymise_chunks(
+    chunks: list[Element | ChunkCreate],
+    anonymizer: Optional[Anonymizer] = None,
+    analyzer_results: Optional[list[list[RecognizerResult]]] = None,
+    max_workers: int = 1,
+    executor: Optional[Executor] = None,
+) -> list[Element | ChunkCreate]:
+    """Anonymises the text of chunks in place, using one anonymizer so people are named consistently across them
+
+    Args:
+        anonymizer: pass the same anonymizer for every file in a project to number people across the project
+        analyzer_results: entities already found in each chunk (e.g. by `analyze_texts` in a worker process)
+        max_workers: number of worker processes to analyse chunks across, if analyzer results aren't given
+        executor: process pool with max_workers workers to analyse chunks in, e.g. shared by every file of a run
+    """
+    anonymizer = anonymizer or Anonymizer()
+    logger.info("Anonymizing chunks")
+    texts = [chunk.text for chunk in chunks]
+    if analyzer_results is None:
+        anonymised_texts = anonymizer.anonymize_many(texts, max_workers=max_workers, executor=executor)
+    else:
+        anonymised_texts = [anonymizer.anonymize(text, results).text for text, results in zip(texts, analyzer_results)]
+    for chunk, anonymised_text in zip(chunks, anonymised_texts):
+        chunk.text = anonymised_text
+    # Placeholders change the number of tokens in a chunk's text
+    counted_chunks = [chunk for chunk in chunks if isinstance(chunk, ChunkCreate) and chunk.token_count is not None]
+    for chunk, token_count in zip(counted_chunks, count_tokens([chunk.text for chunk in counted_chunks])):
+        chunk.token_count = token_count
+    logger.info("Finished Anonymizing chunks")
+    return chunks
+
+
+def get_chunk_metadata(chunk: ChunkBase | ChunkCreate, project_id) -> Dict:
+    """Metadata saved with a chunk's vector, whether the chunk is embedded or its embedding is copied"""
+    return {
+        "uuid": str(chunk.id),
+        "project": str(project_id),
+        "parent_doc_uuid": str(chunk.file.id),
+        "page_num": chunk.page_num,
+        **({"token_count": chunk.token_count} if chunk.token_count is not None else {}),
+    }
+
+
+def add_chunks_to_vector_store(
+    chunks: List[ChunkCreate],
+    project_id,
+    vector_store,
+    max_tokens_per_add: int = DEFAULT_MAX_TOKENS_PER_BATCH * DEFAULT_MAX_CONCURRENT_BATCHES,
+) -> None:
     """Takes a list of Chunks and embeds them into the vector store
 
+    Chunks are added a slice at a time, so only the embeddings of the slice being added are held in memory. The
+    vector store's embedding function (see `get_embedding_function`) embeds texts that aren't cached in batches
+    sized by token count, several batches at once, within the embedding rate limit.
+
     Args:
         chunks (List[Chunk]): The chunks to be added to the vector store
+        max_tokens_per_add (int): Maximum tokens of chunks added to the vector store at once
     """
-    batch_size = 160
-    for i in range(0, len(chunks), batch_size):
+    texts = [chunk.text for chunk in chunks]
+    # Token counts saved with the chunks, if every chunk has one
+    token_counts = [chunk.token_count for chunk in chunks]
+    if None in token_counts:
+        token_counts = count_tokens(texts)
+    metadatas = [get_chunk_metadata(chunk, project_id) for chunk in chunks]
+    ids = [str(chunk.id) for chunk in chunks]
+    for batch in make_token_batches(token_counts, max_tokens_per_batch=max_tokens_per_add):
         vector_store.add_texts(
-            texts=[chunk.text for chunk in chunks[i : i + batch_size]],
-            metadatas=[
-                {
-                    "uuid": str(chunk.id),
-                    "project": str(project_id),
-                    "parent_doc_uuid": str(chunk.file.id),
-                    "page_num": chunk.page_num,
-                }
-                for chunk in chunks[i : i + batch_size]
-            ],
-            ids=[str(chunk.id) for chunk in chunks[i : i + batch_size]],
+            texts=[texts[i] for i in batch], metadatas=[metadatas[i] for i in batch], ids=[ids[i] for i in batch]
         )
 
 
-def chunk_file(file: File, temp_filepath: Path, chunking_strategy: str, anonymise=False) -> List[ChunkCreate]:
-    # Chunking strategy options: https://docs.unstructured.io/open-source/core-functionality/partitioning#partition
+def check_file_can_be_chunked(file: File, temp_filepath: Path) -> None:
+    """Raises a ValueError unless the file is chunked from a PDF, or from an Office file partitioned natively"""
+    # The file record is always the PDF shown to users, but Office files may be chunked from the original
     if file.type != ".pdf":
         raise ValueError(f"File type {file.type} of {file.name} is not supported - must be PDF.")
-    chunks = partition_and_chunk_file(file, temp_filepath, anonymise=anonymise, chunking_strategy=chunking_strategy)
+    temp_file_type = Path(temp_filepath).suffix.lower()
+    if temp_file_type and temp_file_type != ".pdf" and temp_file_type not in NATIVE_PARTITION_FILE_TYPES:
+        raise ValueError(f"Can't chunk {file.name} from a {temp_file_type} file")
+
+
+def chunk_file(
+    file: File,
+    temp_filepath: Path,
+    chunking_strategy: str,
+    anonymise=False,
+    anonymizer: Optional[Anonymizer] = None,
+    anonymise_max_workers: int = 1,
+    anonymise_executor: Optional[Executor] = None,
+    partition_max_workers: int = 1,
+    strip_repeated_text: bool = True,
+    project_boilerplate: Optional[ProjectBoilerplate] = None,
+    max_characters: int = DEFAULT_CHUNK_MAX_CHARACTERS,
+    new_after_n_chars: int = DEFAULT_CHUNK_NEW_AFTER_N_CHARS,
+) -> List[ChunkCreate]:
+    # Chunking strategy options: https://docs.unstructured.io/open-source/core-functionality/partitioning#partition
+    check_file_can_be_chunked(file, temp_filepath)
+    with log_peak_rss(f"chunking {file.name}"):
+        chunks = partition_and_chunk_file(
+            file,
+            temp_filepath,
+            anonymise=anonymise,
+            chunking_strategy=chunking_strategy,
+            anonymizer=anonymizer,
+            anonymise_max_workers=anonymise_max_workers,
+            anonymise_executor=anonymise_executor,
+            partition_max_workers=partition_max_workers,
+            strip_repeated_text=strip_repeated_text,
+            project_boilerplate=project_boilerplate,
+            max_characters=max_characters,
+            new_after_n_chars=new_after_n_chars,
+        )
     return chunks
+
+
+def copy_chunk_vectors(chunks: List[Chunk], project_id, vector_store) -> None:
+    """Adds chunks copied from an already embedded file to the vector store.
+
+    Copies have the same text as the chunks they were copied from, so when the vector store embeds with a cache
+    (see `get_cached_embedding_function`) their embeddings are read from the cache rather than the embedding
+    model. Without a cache, the copies are embedded again.
+
+    Args:
+        chunks (List[Chunk]): Copied chunks, saved with ids of their own
+    """
+    if not isinstance(getattr(vector_store, "embeddings", None), CacheBackedEmbeddings):
+        logger.info(f"Vector store has no embedding cache, embedding {len(chunks)} copied chunks again")
+    add_chunks_to_vector_store(chunks=chunks, project_id=project_id, vector_store=vector_store)
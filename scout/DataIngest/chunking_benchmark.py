@@ -0,0 +1,206 @@
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+from unstructured.chunking.title import chunk_by_title
+from unstructured.documents.elements import Element
+
+from scout.DataIngest.boilerplate import strip_boilerplate
+from scout.DataIngest.embedding import count_tokens
+from scout.DataIngest.partitioning import partition_file
+from scout.utils.utils import logger
+
+# Settings swept by default: (max_characters, new_after_n_chars)
+DEFAULT_CHUNKING_SETTINGS = [
+    (500, 400),
+    (1000, 800),
+    (1500, 1250),
+    (2000, 1750),
+    (3000, 2500),
+    (4000, 3500),
+]
+# Settings with a hit rate within this of the best are treated as equally good, and the cheapest is recommended
+DEFAULT_HIT_RATE_TOLERANCE = 0.02
+
+
+class LabelledQuery(BaseModel):
+    """
+    A question with the file that answers it. If text is given, only chunks holding that text count as hits,
+    otherwise any chunk of the file does.
+    """
+
+    query: str
+    file_name: str
+    text: Optional[str] = None
+
+
+class ChunkingBenchmarkResult(BaseModel):
+    max_characters: int
+    new_after_n_chars: int
+    num_chunks: int
+    total_tokens: int
+    mean_chunk_tokens: float
+    partition_seconds: float
+    chunk_seconds: float
+    embed_seconds: float
+    hit_rate: float
+    # Tokens of the top k chunks retrieved for a query, i.e. the extracts added to each evaluation prompt
+    mean_context_tokens: float
+
+
+def load_labelled_queries(queries_path: Path) -> List[LabelledQuery]:
+    """Reads labelled queries from a JSON list or a CSV file with query, file_name and (optionally) text columns"""
+    queries_path = Path(queries_path)
+    if queries_path.suffix.lower() == ".csv":
+        with open(queries_path, newline="") as queries_file:
+            rows = list(csv.DictReader(queries_file))
+    else:
+        rows = json.loads(queries_path.read_text())
+    return [LabelledQuery(**{key: value for key, value in row.items() if value}) for row in rows]
+
+
+def partition_corpus(
+    file_paths: List[Path], strategy: str = "fast", strip_repeated_text: bool = True
+) -> Tuple[Dict[str, List[Element]], float]:
+    """
+    Partitions each file once, to be chunked with every setting.
+
+    Returns:
+        Elements by file name, and seconds spent partitioning
+    """
+    started_at = time.perf_counter()
+    elements_by_file = {}
+    for file_path in file_paths:
+        elements, _ = partition_file(Path(file_path), strategy=strategy)
+        if strip_repeated_text:
+            elements, _ = strip_boilerplate(elements)
+        elements_by_file[Path(file_path).name] = elements
+    return elements_by_file, time.perf_counter() - started_at
+
+
+def _normalise(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def is_hit(query: LabelledQuery, file_name: str, chunk_text: str) -> bool:
+    if file_name != query.file_name:
+        return False
+    return query.text is None or _normalise(query.text) in _normalise(chunk_text)
+
+
+def top_k_indices(query_embeddings: np.ndarray, chunk_embeddings: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k chunks most similar to each query by cosine similarity, most similar first"""
+    query_embeddings = query_embeddings / np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+    chunk_embeddings = chunk_embeddings / np.linalg.norm(chunk_embeddings, axis=1, keepdims=True)
+    similarities = query_embeddings @ chunk_embeddings.T
+    return np.argsort(-similarities, axis=1)[:, :k]
+
+
+def benchmark_setting(
+    elements_by_file: Dict[str, List[Element]],
+    queries: List[LabelledQuery],
+    query_embeddings: np.ndarray,
+    embed_documents: Callable[[List[str]], List[List[float]]],
+    max_characters: int,
+    new_after_n_chars: int,
+    partition_seconds: float = 0.0,
+    k: int = 3,
+) -> ChunkingBenchmarkResult:
+    """Chunks the partitioned corpus with one setting, embeds the chunks and checks what the queries retrieve"""
+    started_at = time.perf_counter()
+    chunk_file_names, chunk_texts = [], []
+    for file_name, elements in elements_by_file.items():
+        for raw_chunk in chunk_by_title(
+            elements=elements, max_characters=max_characters, new_after_n_chars=new_after_n_chars
+        ):
+            chunk_file_names.append(file_name)
+            chunk_texts.append(raw_chunk.text)
+    chunk_seconds = time.perf_counter() - started_at
+
+    token_counts = count_tokens(chunk_texts)
+    started_at = time.perf_counter()
+    chunk_embeddings = embed_documents(chunk_texts)
+    embed_seconds = time.perf_counter() - started_at
+
+    hits, context_tokens = 0, 0
+    if chunk_texts and queries:
+        for query, indices in zip(queries, top_k_indices(query_embeddings, np.array(chunk_embeddings), k)):
+            hits += any(is_hit(query, chunk_file_names[i], chunk_texts[i]) for i in indices)
+            context_tokens += sum(token_counts[i] for i in indices)
+
+    result = ChunkingBenchmarkResult(
+        max_characters=max_characters,
+        new_after_n_chars=new_after_n_chars,
+        num_chunks=len(chunk_texts),
+        total_tokens=sum(token_counts),
+        mean_chunk_tokens=sum(token_counts) / len(token_counts) if token_counts else 0.0,
+        partition_seconds=partition_seconds,
+        chunk_seconds=chunk_seconds,
+        embed_seconds=embed_seconds,
+        hit_rate=hits / len(queries) if queries else 0.0,
+        mean_context_tokens=context_tokens / len(queries) if queries else 0.0,
+    )
+    logger.info(f"Chunking benchmark: {result}")
+    return result
+
+
+def run_chunking_benchmark(
+    file_paths: List[Path],
+    queries: List[LabelledQuery],
+    embed_documents: Callable[[List[str]], List[List[float]]],
+    embed_query: Callable[[str], List[float]],
+    settings: List[Tuple[int, int]] = DEFAULT_CHUNKING_SETTINGS,
+    strategy: str = "fast",
+    k: int = 3,
+) -> List[ChunkingBenchmarkResult]:
+    """
+    Sweeps chunking settings over a corpus of files, partitioning each file only once.
+
+    Args:
+        embed_documents: embeds chunk texts, e.g. `Embeddings.embed_documents` from `get_embedding_function`.
+            Use a cached embedding function, as chunks that come out the same for several settings are then only
+            embedded once.
+        embed_query: embeds a query, e.g. `Embeddings.embed_query`
+        settings: (max_characters, new_after_n_chars) pairs to try
+        k: number of chunks retrieved for each query, as in `BaseEvaluator.answer_question`
+    """
+    elements_by_file, partition_seconds = partition_corpus(file_paths, strategy=strategy)
+    query_embeddings = np.array([embed_query(query.query) for query in queries])
+    return [
+        benchmark_setting(
+            elements_by_file,
+            queries,
+            query_embeddings,
+            embed_documents,
+            max_characters=max_characters,
+            new_after_n_chars=new_after_n_chars,
+            partition_seconds=partition_seconds,
+            k=k,
+        )
+        for max_characters, new_after_n_chars in settings
+    ]
+
+
+def recommend_setting(
+    results: List[ChunkingBenchmarkResult], hit_rate_tolerance: float = DEFAULT_HIT_RATE_TOLERANCE
+) -> ChunkingBenchmarkResult:
+    """
+    Recommends the setting that retrieves best for the corpus. Of settings with a hit rate within hit_rate_tolerance
+    of the best, the one with the fewest tokens in evaluation prompts (so the quickest evaluation) is chosen, then
+    the one with the fewest tokens to embed.
+    """
+    best_hit_rate = max(result.hit_rate for result in results)
+    candidates = [result for result in results if result.hit_rate >= best_hit_rate - hit_rate_tolerance]
+    return min(candidates, key=lambda result: (result.mean_context_tokens, result.total_tokens))
+
+
+def write_benchmark_results(results: List[ChunkingBenchmarkResult], output_path: Path) -> None:
+    with open(output_path, "w", newline="") as output_file:
+        writer = csv.DictWriter(output_file, fieldnames=list(ChunkingBenchmarkResult.model_fields))
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result.model_dump())
@@ -0,0 +1,243 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from scout.DataIngest.models.schemas import encoding
+from scout.utils.utils import logger
+
+# Azure allows up to 2048 inputs per embedding request, langchain splits larger batches itself
+DEFAULT_MAX_TOKENS_PER_BATCH = int(os.getenv("EMBEDDING_MAX_TOKENS_PER_BATCH", 50_000))
+DEFAULT_MAX_TEXTS_PER_BATCH = 2048
+DEFAULT_MAX_CONCURRENT_BATCHES = int(os.getenv("EMBEDDING_MAX_CONCURRENT_BATCHES", 4))
+
+
+def count_tokens(texts: List[str]) -> List[int]:
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+
+def make_token_batches(
+    token_counts: List[int],
+    max_tokens_per_batch: int = DEFAULT_MAX_TOKENS_PER_BATCH,
+    max_texts_per_batch: int = DEFAULT_MAX_TEXTS_PER_BATCH,
+) -> List[List[int]]:
+    """
+    Groups texts into batches of at most max_tokens_per_batch tokens and max_texts_per_batch texts, keeping them
+    in order. A text with more tokens than the budget gets a batch to itself.
+
+    Returns:
+        Indices of the texts in each batch
+    """
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    batch_tokens = 0
+    for i, tokens in enumerate(token_counts):
+        if batch and (batch_tokens + tokens > max_tokens_per_batch or len(batch) >= max_texts_per_batch):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class EmbeddingStats:
+    """Counters for a call to embed chunks"""
+
+    def __init__(self):
+        self.texts = 0
+        self.tokens = 0
+        self.batches = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, texts: int, tokens: int, waited: float) -> None:
+        with self._lock:
+            self.texts += texts
+            self.tokens += tokens
+            self.batches += 1
+            self.rate_limit_wait_seconds += waited
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def tokens_per_minute(self) -> float:
+        return self.tokens * 60 / self.wall_seconds if self.wall_seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Embedded {self.texts} texts ({self.tokens} tokens) in {self.batches} batches over "
+            f"{self.wall_seconds:.1f}s, {self.tokens_per_minute:.0f} tokens/min, "
+            f"{self.rate_limit_wait_seconds:.1f}s waiting on rate limits"
+        )
+
+
+class EmbeddingRateLimiter:
+    """
+    Keeps embedding requests within a tokens per minute allowance, and backs off when the API says to.
+
+    Tokens are spent from a bucket that refills at tokens_per_minute. `observe_response` can be hooked into
+    the HTTP client used for embedding requests, so the bucket follows the x-ratelimit-remaining-tokens header
+    and requests pause for retry-after when the API rate limits us.
+
+    Args:
+        tokens_per_minute: allowance for the embedding deployment, or None to only follow response headers
+    """
+
+    def __init__(self, tokens_per_minute: Optional[int] = None):
+        self.tokens_per_minute = tokens_per_minute
+        self.available_tokens = float(tokens_per_minute or 0)
+        self.paused_until = 0.0
+        self.rate_limited_responses = 0
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.tokens_per_minute:
+            refill = (now - self._refilled_at) * self.tokens_per_minute / 60
+            self.available_tokens = min(self.tokens_per_minute, self.available_tokens + refill)
+        self._refilled_at = now
+
+    def acquire(self, tokens: int) -> float:
+        """Waits until tokens can be spent, returning the number of seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.paused_until - now
+                if wait <= 0 and self.tokens_per_minute:
+                    # A batch bigger than the whole allowance waits for a full bucket
+                    needed = min(tokens, self.tokens_per_minute)
+                    if self.available_tokens < needed:
+                        wait = (needed - self.available_tokens) * 60 / self.tokens_per_minute
+                if wait <= 0:
+                    self.available_tokens -= tokens
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+    def observe_response(self, response) -> None:
+        """Updates the limiter from the rate limit headers of an embedding API response (e.g. an httpx hook)"""
+        headers = response.headers
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+            if self.tokens_per_minute and remaining_tokens is not None and remaining_tokens.isdigit():
+                self.available_tokens = min(self.available_tokens, float(remaining_tokens))
+            if response.status_code == 429:
+                self.rate_limited_responses += 1
+                retry_after = _retry_after_seconds(headers)
+                self.paused_until = max(self.paused_until, now + retry_after)
+                logger.warning(f"Embedding requests rate limited, pausing for {retry_after:.1f}s")
+
+
+def _retry_after_seconds(headers) -> float:
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return 1.0
+
+
+@lru_cache(maxsize=None)
+def get_embedding_rate_limiter() -> EmbeddingRateLimiter:
+    """Rate limiter shared by all embedding requests in this process, sized by EMBEDDING_TOKENS_PER_MINUTE"""
+    tokens_per_minute = os.getenv("EMBEDDING_TOKENS_PER_MINUTE")
+    return EmbeddingRateLimiter(int(tokens_per_minute) if tokens_per_minute else None)
+
+
+def embed_texts_in_batches(
+    texts: List[str],
+    embed_documents,
+    max_tokens_per_batch: int = DEFAULT_MAX_TOKENS_PER_BATCH,
+    max_concurrent_batches: int = DEFAULT_MAX_CONCURRENT_BATCHES,
+    rate_limiter: Optional[EmbeddingRateLimiter] = None,
+    stats: Optional[EmbeddingStats] = None,
+    token_counts: Optional[List[int]] = None,
+) -> tuple[List[List[float]], EmbeddingStats]:
+    """
+    Embeds texts in batches sized by token count, running several batches at once within the rate limit.
+
+    Args:
+        embed_documents: function embedding a list of texts, e.g. `Embeddings.embed_documents`
+        stats: adds to these stats, e.g. when embedding a file's chunks over several calls
+        token_counts: tokens in each text if already known, e.g. saved with chunks, otherwise they are counted
+
+    Returns:
+        Embeddings in the same order as the texts, and stats for the batches
+    """
+    rate_limiter = rate_limiter or get_embedding_rate_limiter()
+    stats = stats or EmbeddingStats()
+    token_counts = token_counts or count_tokens(texts)
+    batches = make_token_batches(token_counts, max_tokens_per_batch=max_tokens_per_batch)
+
+    def embed_batch(batch: List[int]) -> List[List[float]]:
+        batch_tokens = sum(token_counts[i] for i in batch)
+        waited = rate_limiter.acquire(batch_tokens)
+        embeddings = embed_documents([texts[i] for i in batch])
+        stats.record(texts=len(batch), tokens=batch_tokens, waited=waited)
+        return embeddings
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrent_batches, len(batches)))) as executor:
+        batch_embeddings = list(executor.map(embed_batch, batches))
+    stats.finished_at = time.perf_counter()
+
+    embeddings: List[List[float]] = [None] * len(texts)
+    for batch, batch_embedding in zip(batches, batch_embeddings):
+        for i, embedding in zip(batch, batch_embedding):
+            embeddings[i] = embedding
+    return embeddings, stats
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """
+    Embeds documents with `embed_texts_in_batches`, so texts are sent in batches sized by token count, several at
+    once, within the embedding rate limit. The embedding cache wraps this rather than the other way round, so texts
+    read from the cache don't take tokens from the rate limiter.
+
+    Args:
+        embeddings: embedding model that texts are sent to
+        rate_limiter: defaults to the limiter shared by the process
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_tokens_per_batch: int = DEFAULT_MAX_TOKENS_PER_BATCH,
+        max_concurrent_batches: int = DEFAULT_MAX_CONCURRENT_BATCHES,
+        rate_limiter: Optional[EmbeddingRateLimiter] = None,
+    ):
+        self.embeddings = embeddings
+        self.max_tokens_per_batch = max_tokens_per_batch
+        self.max_concurrent_batches = max_concurrent_batches
+        self.rate_limiter = rate_limiter
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        embeddings, stats = embed_texts_in_batches(
+            texts,
+            self.embeddings.embed_documents,
+            max_tokens_per_batch=self.max_tokens_per_batch,
+            max_concurrent_batches=self.max_concurrent_batches,
+            rate_limiter=self.rate_limiter,
+        )
+        logger.info(str(stats))
+        return embeddings
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
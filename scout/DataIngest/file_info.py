@@ -1,15 +1,58 @@
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 import instructor
-from instructor.exceptions import InstructorRetryException
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, AzureOpenAI
 
-from scout.DataIngest.models.schemas import ChunkCreate, File, FileInfo, FileUpdate
+from scout.DataIngest.models.schemas import Chunk, ChunkCreate, File, FileInfo, FileUpdate
 from scout.DataIngest.prompts import FILE_INFO_EXTRACTOR_SYSTEM_PROMPT
 from scout.utils.storage.storage_handler import BaseStorageHandler
 
 from scout.utils.utils import logger
 
+# Number of chunks from the start of a file sent to the LLM
+FILE_INFO_NUM_CHUNKS = 20
+# Number of files to get LLM generated info for at once
+DEFAULT_FILE_INFO_MAX_CONCURRENCY = int(os.getenv("FILE_INFO_MAX_CONCURRENCY", 8))
+
+
+def _azure_openai_kwargs() -> dict:
+    return dict(
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        api_key=os.getenv("AZURE_OPENAI_KEY"),
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+        azure_deployment=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_instructor_client() -> instructor.Instructor:
+    """Instructor client shared by all file info requests in this process, so connections are reused"""
+    return instructor.from_openai(AzureOpenAI(**_azure_openai_kwargs()))
+
+
+def get_async_instructor_client() -> instructor.AsyncInstructor:
+    # Not cached, as the async client's connection pool belongs to the event loop it is first used in
+    return instructor.from_openai(AsyncAzureOpenAI(**_azure_openai_kwargs()))
+
+
+def _file_info_messages(project_name: str, file_name: str, text: str) -> List[dict]:
+    # Create prompt that will be used to generate file info
+    sys_prompt = FILE_INFO_EXTRACTOR_SYSTEM_PROMPT.format(project_name=project_name, file_name=file_name)
+    return [
+        {
+            "role": "system",
+            "content": sys_prompt,
+        },
+        {
+            "role": "user",
+            "content": text,
+        },
+    ]
+
 
 def get_text_from_chunks(chunks: list[ChunkCreate], num_chunks: int):
     chunks = [chunk.text for chunk in chunks[:num_chunks]]
@@ -22,36 +65,17 @@ def get_llm_file_info(project_name: str, file_name: str, text: str) -> FileInfo:
     For a given file and text, get LLM generated metadata on file (FileInfo) e.g. name, summary.
     If LLM generated info fails - return blank FileInfo.
     """
-    client = instructor.from_openai(
-        AzureOpenAI(
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_key=os.getenv("AZURE_OPENAI_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            azure_deployment=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
-        )
-    )
-    # Create prompt that will be used to generate file info
-    sys_prompt = FILE_INFO_EXTRACTOR_SYSTEM_PROMPT.format(project_name=project_name, file_name=file_name)
-
+    client = get_instructor_client()
     # Extract structured metadata for file from natural language using cheaper LLM
     try:
         file_info = client.chat.completions.create(
             model=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
             response_model=FileInfo,
-            messages=[
-                {
-                    "role": "system",
-                    "content": sys_prompt,
-                },
-                {
-                    "role": "user",
-                    "content": text,
-                },
-            ],
+            messages=_file_info_messages(project_name, file_name, text),
             max_retries=3,
         )
-    except InstructorRetryException as e:
-        # Assumption that blank info is fine if we can't generate with LLM
+    except Exception as e:
+        # Assumption that blank info is fine if we can't generate with LLM, so the file is still embedded
         file_info = FileInfo()
         logger.error(f"{e} unable to get LLM generated file info for {file_name}, proceeding without...")
 
@@ -59,6 +83,65 @@ def get_llm_file_info(project_name: str, file_name: str, text: str) -> FileInfo:
     return file_info
 
 
+async def aget_llm_file_info(
+    client: instructor.AsyncInstructor, project_name: str, file_name: str, text: str
+) -> FileInfo:
+    """Async version of `get_llm_file_info`, using the given client"""
+    try:
+        file_info = await client.chat.completions.create(
+            model=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
+            response_model=FileInfo,
+            messages=_file_info_messages(project_name, file_name, text),
+            max_retries=3,
+        )
+    except Exception as e:
+        file_info = FileInfo()
+        logger.error(f"{e} unable to get LLM generated file info for {file_name}, proceeding without...")
+    return file_info
+
+
+async def _aget_llm_file_info_for_files(
+    project_name: str, file_names_and_texts: List[Tuple[str, str]], max_concurrency: int
+) -> List[FileInfo | BaseException]:
+    client = get_async_instructor_client()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get_file_info(file_name: str, text: str) -> FileInfo:
+        async with semaphore:
+            return await aget_llm_file_info(client, project_name=project_name, file_name=file_name, text=text)
+
+    try:
+        return await asyncio.gather(
+            *(get_file_info(file_name, text) for file_name, text in file_names_and_texts), return_exceptions=True
+        )
+    finally:
+        await client.client.close()
+
+
+def get_llm_file_info_for_files(
+    project_name: str,
+    file_names_and_texts: List[Tuple[str, str]],
+    max_concurrency: int = DEFAULT_FILE_INFO_MAX_CONCURRENCY,
+) -> List[FileInfo | BaseException]:
+    """
+    Gets LLM generated file info for several files at once, with up to max_concurrency requests in flight
+    over one pooled client.
+
+    Returns:
+        FileInfo for each file in the same order, or the exception raised getting it
+    """
+    if not file_names_and_texts:
+        return []
+    coroutine = _aget_llm_file_info_for_files(project_name, file_names_and_texts, max(1, max_concurrency))
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # asyncio.run can't be called while an event loop is running (e.g. in a notebook), so run in a thread of its own
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
 def get_file_update(file: File, file_info: FileInfo) -> FileUpdate:
     # Pre-populate a FileUpdate object with the details from File object
     file_update = FileUpdate(
@@ -67,6 +150,7 @@ def get_file_update(file: File, file_info: FileInfo) -> FileUpdate:
         s3_bucket=getattr(file, "s3_bucket", None),
         s3_key=getattr(file, "s3_key", None),
         storage_kind=getattr(file, "storage_kind", "local"),
+        content_hash=getattr(file, "content_hash", None),
         project=getattr(file, "project", None),
         chunks=getattr(file, "chunks", []),
         id=file.id,
@@ -82,8 +166,40 @@ def get_file_update(file: File, file_info: FileInfo) -> FileUpdate:
 def add_llm_generated_file_info(
     project_name: str, file: File, chunks_from_file: list[ChunkCreate], storage_handler: BaseStorageHandler
 ) -> File:
-    text = get_text_from_chunks(chunks=chunks_from_file, num_chunks=20)
+    text = get_text_from_chunks(chunks=chunks_from_file, num_chunks=FILE_INFO_NUM_CHUNKS)
     llm_generated_file_info = get_llm_file_info(project_name=project_name, file_name=file.name, text=text)
     file_update = get_file_update(file=file, file_info=llm_generated_file_info)
     updated_file = storage_handler.update_item(file_update)
     return updated_file
+
+
+def add_llm_generated_file_info_for_files(
+    project_name: str,
+    files_and_chunks: List[Tuple[File, List[Chunk]]],
+    storage_handler: BaseStorageHandler,
+    max_concurrency: int = DEFAULT_FILE_INFO_MAX_CONCURRENCY,
+) -> Tuple[List[File], Dict[str, BaseException]]:
+    """
+    Adds LLM generated file info to several files, getting it concurrently and saving the updates in bulk.
+
+    Returns:
+        Updated files, and a dictionary of file name to the exception raised for files that failed
+    """
+    file_infos = get_llm_file_info_for_files(
+        project_name=project_name,
+        file_names_and_texts=[
+            (file.name, get_text_from_chunks(chunks=chunks, num_chunks=FILE_INFO_NUM_CHUNKS))
+            for file, chunks in files_and_chunks
+        ],
+        max_concurrency=max_concurrency,
+    )
+    file_updates, failed_files = [], {}
+    for (file, _), file_info in zip(files_and_chunks, file_infos):
+        if isinstance(file_info, BaseException):
+            logger.error(f"Failed to get LLM generated file info for {file.name}: {file_info}")
+            failed_files[file.name] = file_info
+        else:
+            file_updates.append(get_file_update(file=file, file_info=file_info))
+    updated_files = storage_handler.update_items(file_updates) if file_updates else []
+    logger.info(f"File info generated for {len(updated_files)} files")
+    return updated_files, failed_files
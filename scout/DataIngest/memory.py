@@ -0,0 +1,138 @@
+import os
+import resource
+import sys
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from scout.utils.utils import logger
+
+# Partitioned elements and chunks of a file take up several times the size of the file itself
+DEFAULT_MEMORY_PER_FILE_BYTE = 20
+
+# Blocks measured by `log_peak_rss` in this process, and whether another block ran alongside each
+_measured_blocks: Dict[object, bool] = {}
+_measured_blocks_lock = threading.Lock()
+
+
+class MemoryBudget:
+    """
+    Limits the memory that files being partitioned and chunked at the same time are expected to take up.
+
+    A file reserves its estimated memory before it is partitioned and gives it back when it has been chunked, so
+    large files wait for others to finish rather than all being loaded at once. A file larger than the whole budget
+    is let through when nothing else is in flight, so it is never held back for ever.
+
+    Args:
+        max_bytes: memory that files in flight may take up between them, or None for no limit
+        memory_per_file_byte: estimated bytes of memory taken up per byte of file
+    """
+
+    def __init__(self, max_bytes: Optional[int], memory_per_file_byte: float = DEFAULT_MEMORY_PER_FILE_BYTE):
+        self.max_bytes = max_bytes
+        self.memory_per_file_byte = memory_per_file_byte
+        self.in_flight_bytes = 0
+        self._condition = threading.Condition()
+
+    def estimate(self, file_path: Path | str) -> int:
+        """Estimated memory taken up partitioning and chunking a file"""
+        return int(Path(file_path).stat().st_size * self.memory_per_file_byte)
+
+    def acquire(self, num_bytes: int) -> None:
+        """Waits until num_bytes more fit in the budget, then reserves them"""
+        with self._condition:
+            if self.max_bytes is not None and self.in_flight_bytes + num_bytes > self.max_bytes:
+                logger.info(
+                    f"Waiting for {num_bytes / 2**20:.0f} MB of ingestion memory budget, "
+                    f"{self.in_flight_bytes / 2**20:.0f} of {self.max_bytes / 2**20:.0f} MB in flight"
+                )
+            self._condition.wait_for(
+                lambda: (
+                    self.max_bytes is None
+                    or self.in_flight_bytes == 0
+                    or self.in_flight_bytes + num_bytes <= self.max_bytes
+                )
+            )
+            self.in_flight_bytes += num_bytes
+
+    def release(self, num_bytes: int) -> None:
+        with self._condition:
+            self.in_flight_bytes -= num_bytes
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, num_bytes: int):
+        self.acquire(num_bytes)
+        try:
+            yield
+        finally:
+            self.release(num_bytes)
+
+
+@lru_cache
+def get_memory_budget() -> MemoryBudget:
+    """Budget shared by the process, set by INGESTION_MEMORY_BUDGET_MB (no limit if unset)"""
+    budget_mb = os.getenv("INGESTION_MEMORY_BUDGET_MB")
+    return MemoryBudget(
+        max_bytes=int(float(budget_mb) * 2**20) if budget_mb else None,
+        memory_per_file_byte=float(os.getenv("INGESTION_MEMORY_PER_FILE_BYTE", DEFAULT_MEMORY_PER_FILE_BYTE)),
+    )
+
+
+def reset_peak_rss() -> bool:
+    """
+    Resets the peak resident memory of this process, so `peak_rss_bytes` measures from now. Only possible on Linux.
+    The peak is process-wide, so this also resets it for anything else measuring it in the process.
+
+    Returns:
+        Whether the peak was reset
+    """
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident memory of this process, since it started or `reset_peak_rss` was last called"""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+@contextmanager
+def log_peak_rss(description: str):
+    """
+    Logs the peak resident memory of the process while running the block.
+
+    Peak RSS is process-wide, so it is only the block's own when nothing else ran in the process alongside it, e.g.
+    when files are chunked one at a time or each in a worker process of its own. If other blocks overlap it (files
+    chunked in threads), the peak isn't reset under them, and the process's peak is logged as such instead.
+    """
+    block = object()
+    with _measured_blocks_lock:
+        overlapped = bool(_measured_blocks)
+        for other_block in _measured_blocks:
+            _measured_blocks[other_block] = True
+        _measured_blocks[block] = overlapped
+        was_reset = False if overlapped else reset_peak_rss()
+    try:
+        yield
+    finally:
+        with _measured_blocks_lock:
+            overlapped = _measured_blocks.pop(block)
+        peak_mb = peak_rss_bytes() / 2**20
+        if overlapped:
+            logger.info(f"Peak RSS of the process while {description} alongside other files: {peak_mb:.0f} MB")
+        else:
+            since = "" if was_reset else " since the process started"
+            logger.info(f"Peak RSS {description}: {peak_mb:.0f} MB{since}")
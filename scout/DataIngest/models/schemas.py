@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
 import tiktoken
@@ -63,6 +63,8 @@ class ChunkBase(BaseModel):
     idx: int
     text: str
     page_num: int
+    partition_strategy: Optional[str] = None  # unstructured strategy used to partition the chunk's page
+    token_count: Optional[int] = None  # tokens in the text with the cl100k_base encoding, None for older chunks
     created_datetime: datetime
     updated_datetime: Optional[datetime]
 
@@ -71,6 +73,8 @@ class ChunkCreate(BaseModel):
     idx: int
     text: str
     page_num: int
+    partition_strategy: Optional[str] = None
+    token_count: Optional[int] = None
     file: Optional["FileBase"] = None
     results: Optional[list["ResultBase"]] = Field(default_factory=list)
 
@@ -167,7 +171,10 @@ class FileBase(BaseModel):
     s3_key: Optional[str] = None  # This is the key of the file in s3.
     storage_kind: str = "local"
     url: Optional[str] = None
-    # TODO add back in file hash to avoid double uploads, do it the way redbox does
+    # SHA-256 of the file that was chunked: the processed PDF, or the uploaded file for Office files partitioned
+    # natively (see NATIVE_PARTITION_FILE_TYPES). Used to avoid re-ingesting duplicate files, and to key the
+    # partition cache
+    content_hash: Optional[str] = None
 
 
 class FileCreate(BaseModel):
@@ -180,6 +187,7 @@ class FileCreate(BaseModel):
     s3_bucket: Optional[str] = None
     s3_key: Optional[str] = None
     storage_kind: str = "local"
+    content_hash: Optional[str] = None
     project: Optional["ProjectBase"] = None
     chunks: Optional[list["ChunkBase"]] = Field(default_factory=list)
 
@@ -198,6 +206,7 @@ class FileFilter(BaseModel):
     s3_bucket: Optional[str] = None
     s3_key: Optional[str] = None
     storage_kind: Optional[str] = []
+    content_hash: Optional[str] = None
     project: Optional["ProjectBase"] = None
     chunks: Optional[list["ChunkBase"]] = []
 
@@ -216,11 +225,15 @@ class ProjectBase(BaseModel):
     updated_datetime: Optional[datetime]
     name: str
     results_summary: Optional[str] = None
+    # Placeholders for people's names, consistent across the project. Excluded when serialised so that
+    # the names are never returned by the API
+    person_map: Optional[Dict[str, str]] = Field(None, exclude=True)
 
 
 class ProjectCreate(BaseModel):
     name: str
     results_summary: Optional[str] = None
+    person_map: Optional[Dict[str, str]] = None
     users: Optional[List["UserBase"]] = Field(default_factory=list)
     files: Optional[List["FileBase"]] = Field(default_factory=list)
     criterions: Optional[List["CriterionBase"]] = Field(default_factory=list)
@@ -316,6 +329,91 @@ class User(UserBase):
     ratings: List["RatingBase"] = Field(default_factory=list)
 
 
+class IngestionStage(str, Enum):
+    # In the order files pass through ingestion
+    UPLOADED = "UPLOADED"
+    CONVERTED = "CONVERTED"
+    CHUNKED = "CHUNKED"
+    FILE_INFO_DONE = "FILE_INFO_DONE"
+    EMBEDDED = "EMBEDDED"
+
+
+INGESTION_STAGE_ORDER = list(IngestionStage)
+
+
+class IngestionRunBase(BaseModel):
+    model_config = global_model_config
+
+    id: UUID
+    created_datetime: datetime
+    updated_datetime: Optional[datetime]
+    project_directory_name: str
+    status: str
+
+
+class IngestionRunCreate(BaseModel):
+    project_directory_name: str
+    status: str = "running"
+    project: Optional["ProjectBase"] = None
+
+
+class IngestionRunUpdate(IngestionRunCreate):
+    id: UUID
+
+
+class IngestionRunFilter(BaseModel):
+    project_directory_name: Optional[str] = None
+    status: Optional[str] = None
+    project: Optional["ProjectBase"] = None
+
+
+class IngestionRun(IngestionRunBase):
+    project: Optional["ProjectBase"] = None
+    files: Optional[List["IngestionRunFileBase"]] = Field(default_factory=list)
+
+
+class IngestionRunFileBase(BaseModel):
+    model_config = global_model_config
+
+    id: UUID
+    created_datetime: datetime
+    updated_datetime: Optional[datetime]
+    name: str
+    raw_s3_key: Optional[str] = None
+    processed_s3_key: Optional[str] = None
+    stage: IngestionStage
+    error: Optional[str] = None
+    claimed_by: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    attempts: int = 0
+
+
+class IngestionRunFileCreate(BaseModel):
+    name: str
+    raw_s3_key: Optional[str] = None
+    processed_s3_key: Optional[str] = None
+    stage: IngestionStage = IngestionStage.UPLOADED
+    error: Optional[str] = None
+    run: Optional["IngestionRunBase"] = None
+    file: Optional["FileBase"] = None
+
+
+class IngestionRunFileUpdate(IngestionRunFileCreate):
+    id: UUID
+
+
+class IngestionRunFileFilter(BaseModel):
+    name: Optional[str] = None
+    stage: Optional[IngestionStage] = None
+    run: Optional["IngestionRunBase"] = None
+    file: Optional["FileBase"] = None
+
+
+class IngestionRunFile(IngestionRunFileBase):
+    run: Optional["IngestionRunBase"] = None
+    file: Optional["FileBase"] = None
+
+
 class SourceEnum(str, Enum):
     IPA = "IPA"
     PROJECT = "project"
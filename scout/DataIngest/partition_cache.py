@@ -0,0 +1,61 @@
+import gzip
+import json
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import unstructured
+from unstructured.documents.elements import Element
+from unstructured.staging.base import elements_from_dicts, elements_to_dicts
+
+from scout.utils.storage.cache_store import CacheStore, get_cache_store
+from scout.utils.utils import logger
+
+
+def partition_cache_key(content_hash: str, strategy: str) -> str:
+    # Partition output changes between unstructured versions, so they are cached separately
+    return f"{unstructured.__version__}/{strategy}/{content_hash}.json.gz"
+
+
+class PartitionCache:
+    """
+    Cache of unstructured elements partitioned from files, keyed by file content hash, partition strategy and
+    unstructured version, so that files can be chunked or anonymised again without partitioning them again.
+    """
+
+    def __init__(self, store: CacheStore):
+        self.store = store
+
+    def get(self, content_hash: str, strategy: str) -> Optional[Tuple[List[Element], Dict[int, str]]]:
+        """Elements and page strategies partitioned from a file before, or None if they aren't cached or can't be read"""
+        key = partition_cache_key(content_hash, strategy)
+        body = self.store.get(key)
+        if body is None:
+            return None
+        try:
+            cached = json.loads(gzip.decompress(body))
+            page_strategies = {
+                int(page_number): strategy for page_number, strategy in cached["page_strategies"].items()
+            }
+            return elements_from_dicts(cached["elements"]), page_strategies
+        except (OSError, EOFError, zlib.error, ValueError, KeyError, TypeError, AttributeError) as _:
+            # A corrupt or truncated entry (e.g. from an interrupted write) is partitioned again and overwritten
+            logger.exception(f"Failed to decode partition cache entry: {key}")
+            return None
+
+    def put(self, content_hash: str, strategy: str, elements: List[Element], page_strategies: Dict[int, str]) -> None:
+        body = gzip.compress(
+            json.dumps({"elements": elements_to_dicts(elements), "page_strategies": page_strategies}).encode()
+        )
+        self.store.put(partition_cache_key(content_hash, strategy), body)
+
+
+@lru_cache(maxsize=None)
+def get_partition_cache() -> Optional[PartitionCache]:
+    """
+    Partition cache set by the PARTITION_CACHE environment variable: "local" (in PARTITION_CACHE_DIRECTORY)
+    or "s3" (in the bucket used for project files). None if unset, so that files are always partitioned.
+    """
+    store = get_cache_store("PARTITION_CACHE", Path(".data/partition_cache"), s3_prefix="partition-cache/")
+    return PartitionCache(store) if store else None
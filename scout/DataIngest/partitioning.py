@@ -0,0 +1,201 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from pypdf import PdfReader, PdfWriter
+from unstructured.documents.elements import Element
+from unstructured.partition.auto import partition
+from unstructured.staging.base import elements_from_dicts, elements_to_dicts
+
+from scout.utils.utils import logger
+
+# PDFs with fewer pages than this are partitioned in one go
+PARALLEL_PARTITION_MIN_PAGES = 50
+DEFAULT_PAGES_PER_RANGE = 25
+
+# Chooses a strategy for each page of a PDF: pages with a text layer are extracted directly, only pages
+# without one (e.g. scanned annexes) are sent to OCR/layout detection
+PER_PAGE_STRATEGY = "per_page"
+TEXT_LAYER_STRATEGY = "fast"
+OCR_STRATEGY = "hi_res"
+# Pages with fewer characters of extractable text than this are treated as images
+MIN_TEXT_LAYER_CHARACTERS = 50
+
+# Office formats unstructured partitions directly, so they can be chunked without first converting them to PDF
+NATIVE_PARTITION_FILE_TYPES = (".docx", ".pptx")
+
+
+def can_partition_without_converting(file_name: str) -> bool:
+    return Path(file_name).suffix.lower() in NATIVE_PARTITION_FILE_TYPES
+
+
+def count_pdf_pages(filepath: Path) -> int:
+    return len(PdfReader(str(filepath)).pages)
+
+
+def write_pdf_page_range(reader: PdfReader, first_page: int, last_page: int) -> Path:
+    """Writes pages first_page to last_page (counting from 1, inclusive) of a PDF to a temporary file"""
+    writer = PdfWriter()
+    for page in reader.pages[first_page - 1 : last_page]:
+        writer.add_page(page)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+        writer.write(temp_file)
+    return Path(temp_file.name)
+
+
+def partition_page_range(filepath: Path, strategy: str, first_page: int, original_filepath: Path) -> List[dict]:
+    """
+    Partitions a PDF holding a range of pages of a larger PDF, renumbering pages to match the original.
+
+    Runs in a worker process, so elements are returned as dicts to be pickled.
+    """
+    try:
+        elements = partition(filename=str(filepath), strategy=strategy)
+    finally:
+        filepath.unlink(missing_ok=True)
+    for element in elements:
+        if element.metadata.page_number is not None:
+            element.metadata.page_number += first_page - 1
+        element.metadata.filename = original_filepath.name
+        element.metadata.file_directory = str(original_filepath.parent)
+    return elements_to_dicts(elements)
+
+
+def partition_pdf_in_parallel(
+    filepath: Path,
+    strategy: str,
+    max_workers: int = os.cpu_count() or 1,
+    pages_per_range: int = DEFAULT_PAGES_PER_RANGE,
+) -> List[Element]:
+    """
+    Splits a PDF into ranges of pages and partitions them in worker processes at once. Elements are merged
+    back in page order, so they can be chunked just like the output of partitioning the whole file.
+    """
+    filepath = Path(filepath)
+    reader = PdfReader(str(filepath))
+    num_pages = len(reader.pages)
+    page_ranges: List[Tuple[int, Path]] = [
+        (first_page, write_pdf_page_range(reader, first_page, min(first_page + pages_per_range - 1, num_pages)))
+        for first_page in range(1, num_pages + 1, pages_per_range)
+    ]
+    logger.info(f"Partitioning {num_pages} pages of {filepath.name} in {len(page_ranges)} ranges")
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(page_ranges))) as executor:
+        futures = [
+            executor.submit(partition_page_range, range_filepath, strategy, first_page, filepath)
+            for first_page, range_filepath in page_ranges
+        ]
+        element_dicts = [element_dict for future in futures for element_dict in future.result()]
+    return elements_from_dicts(element_dicts)
+
+
+def choose_page_strategies(reader: PdfReader) -> List[str]:
+    """Strategy for each page of a PDF, depending on whether it has a usable text layer"""
+    strategies = []
+    for page in reader.pages:
+        try:
+            text = page.extract_text() or ""
+        except Exception as _:
+            logger.exception("Failed to extract text layer of page, sending it to OCR")
+            text = ""
+        strategies.append(TEXT_LAYER_STRATEGY if len(text.strip()) >= MIN_TEXT_LAYER_CHARACTERS else OCR_STRATEGY)
+    return strategies
+
+
+def group_pages_by_strategy(strategies: List[str], max_pages_per_range: int) -> List[Tuple[int, int, str]]:
+    """
+    Groups consecutive pages with the same strategy into ranges of at most max_pages_per_range pages
+
+    Returns:
+        First page, last page (counting from 1, inclusive) and strategy of each range
+    """
+    page_ranges = []
+    for page_number, strategy in enumerate(strategies, start=1):
+        if page_ranges:
+            first_page, last_page, range_strategy = page_ranges[-1]
+            if range_strategy == strategy and last_page - first_page + 1 < max_pages_per_range:
+                page_ranges[-1] = (first_page, page_number, strategy)
+                continue
+        page_ranges.append((page_number, page_number, strategy))
+    return page_ranges
+
+
+def partition_pdf_per_page(
+    filepath: Path,
+    max_workers: int = 1,
+    pages_per_range: int = DEFAULT_PAGES_PER_RANGE,
+) -> Tuple[List[Element], Dict[int, str]]:
+    """
+    Partitions a PDF choosing a strategy for each page: the text layer is used where there is one, and only
+    image-only pages go through OCR. Runs of pages with the same strategy are partitioned together, across
+    max_workers processes if more than 1, and merged back in page order.
+
+    Returns:
+        Elements, and the strategy used for each page number
+    """
+    filepath = Path(filepath)
+    reader = PdfReader(str(filepath))
+    strategies = choose_page_strategies(reader)
+    page_strategies = dict(enumerate(strategies, start=1))
+    logger.info(
+        f"Partitioning {filepath.name}: {strategies.count(TEXT_LAYER_STRATEGY)} pages from text layer, "
+        f"{strategies.count(OCR_STRATEGY)} pages with {OCR_STRATEGY}"
+    )
+    if len(set(strategies)) <= 1:
+        # Every page uses the same strategy, e.g. a born-digital PDF
+        strategy = strategies[0] if strategies else TEXT_LAYER_STRATEGY
+        elements, _ = partition_file(filepath, strategy, max_workers=max_workers, pages_per_range=pages_per_range)
+        return elements, page_strategies
+
+    page_ranges = [
+        (first_page, strategy, write_pdf_page_range(reader, first_page, last_page))
+        for first_page, last_page, strategy in group_pages_by_strategy(strategies, pages_per_range)
+    ]
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(page_ranges))) as executor:
+            futures = [
+                executor.submit(partition_page_range, range_filepath, strategy, first_page, filepath)
+                for first_page, strategy, range_filepath in page_ranges
+            ]
+            element_dicts = [element_dict for future in futures for element_dict in future.result()]
+    else:
+        element_dicts = [
+            element_dict
+            for first_page, strategy, range_filepath in page_ranges
+            for element_dict in partition_page_range(range_filepath, strategy, first_page, filepath)
+        ]
+    return elements_from_dicts(element_dicts), page_strategies
+
+
+def partition_file(
+    filepath: Path,
+    strategy: str,
+    max_workers: int = 1,
+    pages_per_range: int = DEFAULT_PAGES_PER_RANGE,
+) -> Tuple[List[Element], Dict[int, str]]:
+    """
+    Partitions a file with unstructured. Large PDFs are split into page ranges partitioned in parallel
+    when max_workers > 1. With the "per_page" strategy, PDFs are partitioned with a strategy chosen for each page.
+    Office files (see NATIVE_PARTITION_FILE_TYPES) are partitioned from their own XML, so strategy doesn't apply.
+
+    Returns:
+        Elements, and the strategy used for each page number (empty if the whole file used one strategy)
+    """
+    filepath = Path(filepath)
+    if strategy == PER_PAGE_STRATEGY:
+        if filepath.suffix.lower() == ".pdf":
+            return partition_pdf_per_page(filepath, max_workers=max_workers, pages_per_range=pages_per_range)
+        strategy = TEXT_LAYER_STRATEGY
+    if (
+        max_workers > 1
+        and filepath.suffix.lower() == ".pdf"
+        and count_pdf_pages(filepath) >= max(PARALLEL_PARTITION_MIN_PAGES, pages_per_range + 1)
+    ):
+        elements = partition_pdf_in_parallel(
+            filepath, strategy=strategy, max_workers=max_workers, pages_per_range=pages_per_range
+        )
+    else:
+        elements = partition(filename=str(filepath), strategy=strategy)
+    return elements, {}
@@ -0,0 +1,191 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from scout.utils.utils import logger
+
+# Marks the end of the items sent to a stage
+_END = object()
+
+
+class StageStats:
+    """Throughput counters for one stage of a pipeline"""
+
+    def __init__(self, name: str, concurrency: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, succeeded: bool, produced_output: bool) -> None:
+        with self._lock:
+            self.items_in += 1
+            self.busy_seconds += seconds
+            if not succeeded:
+                self.errors += 1
+            elif produced_output:
+                self.items_out += 1
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items_in / self.wall_seconds if self.wall_seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.items_in} in, {self.items_out} out, {self.errors} errors, "
+            f"{self.items_per_second:.2f} items/s over {self.wall_seconds:.1f}s "
+            f"({self.busy_seconds:.1f}s busy across {self.concurrency} workers)"
+        )
+
+
+class Stage:
+    """
+    A step of a pipeline, run by `concurrency` worker threads.
+
+    `func` takes an item from the previous stage and returns the item to pass to the next stage,
+    or None to drop the item. CPU bound stages should hand work off to a process pool inside `func`,
+    so that the threads only wait on it.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], concurrency: int = 1):
+        if concurrency < 1:
+            raise ValueError(f"Stage {name} must have a concurrency of at least 1, got {concurrency}")
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+
+
+class StagedPipeline:
+    """
+    Runs items through a sequence of stages connected by bounded queues, so that every stage works
+    on different items at the same time. A full queue blocks the stage before it, so a slow stage
+    holds back the stages feeding it rather than letting work pile up in memory.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4, describe_item: Callable[[Any], str] = str):
+        """
+        Args:
+            describe_item: short description of an item for logs, e.g. the name of the file it is for, so that
+                large items (such as a file's chunks) aren't written out in full
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.describe_item = describe_item
+        self.stats = [StageStats(stage.name, stage.concurrency) for stage in stages]
+        self.errors: List[Tuple[str, Any, Exception]] = []
+        self._errors_lock = threading.Lock()
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """
+        Runs all items through the pipeline, blocking until they are done.
+
+        Returns:
+            The outputs of the last stage, in the order they completed. Items that raised an
+            exception in any stage are recorded in `self.errors` as (stage name, item, exception).
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = []
+        results_lock = threading.Lock()
+
+        threads = []
+        for stage_index, stage in enumerate(self.stages):
+            output_queue = queues[stage_index + 1] if stage_index + 1 < len(self.stages) else None
+            next_concurrency = self.stages[stage_index + 1].concurrency if output_queue else 0
+            remaining_workers = [stage.concurrency]
+            remaining_lock = threading.Lock()
+            for worker_index in range(stage.concurrency):
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"{stage.name}-{worker_index}",
+                    args=(
+                        stage,
+                        self.stats[stage_index],
+                        queues[stage_index],
+                        output_queue,
+                        next_concurrency,
+                        remaining_workers,
+                        remaining_lock,
+                        results,
+                        results_lock,
+                    ),
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].concurrency):
+            queues[0].put(_END)
+
+        for thread in threads:
+            thread.join()
+
+        self.log_stats()
+        return results
+
+    def _work(
+        self,
+        stage: Stage,
+        stats: StageStats,
+        input_queue: queue.Queue,
+        output_queue: Optional[queue.Queue],
+        next_concurrency: int,
+        remaining_workers: List[int],
+        remaining_lock: threading.Lock,
+        results: List[Any],
+        results_lock: threading.Lock,
+    ) -> None:
+        while True:
+            item = input_queue.get()
+            if item is _END:
+                break
+            start = time.perf_counter()
+            with remaining_lock:
+                if stats.started_at is None:
+                    stats.started_at = start
+            try:
+                output = stage.func(item)
+                stats.record(time.perf_counter() - start, succeeded=True, produced_output=output is not None)
+            except Exception as e:
+                stats.record(time.perf_counter() - start, succeeded=False, produced_output=False)
+                logger.exception(f"Pipeline stage {stage.name} failed for item {self.describe_item(item)}")
+                with self._errors_lock:
+                    self.errors.append((stage.name, item, e))
+                continue
+
+            if output is None:
+                continue
+            if output_queue is not None:
+                output_queue.put(output)
+            else:
+                with results_lock:
+                    results.append(output)
+
+        # The last worker of a stage to finish tells the next stage that no more items are coming
+        with remaining_lock:
+            remaining_workers[0] -= 1
+            is_last_worker = remaining_workers[0] == 0
+            if is_last_worker:
+                stats.finished_at = time.perf_counter()
+        if is_last_worker and output_queue is not None:
+            for _ in range(next_concurrency):
+                output_queue.put(_END)
+
+    def log_stats(self) -> None:
+        for stats in self.stats:
+            logger.info(f"Pipeline stage {stats}")
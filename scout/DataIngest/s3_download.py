@@ -1,21 +1,115 @@
 import os
-from typing import Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
 from urllib.parse import ParseResult, unquote, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from scout.utils.storage.filesystem import S3StorageHandler
+from scout.utils.utils import logger
 
-def convert_to_pdf_from_s3(s3_file_keys: list[str]) -> list[str]:
-    # keys of converted files in s3.
-    s3_converted_file_keys = []
 
-    # send files to libreoffice service
+def get_processed_file_key(input_key: str) -> str:
+    """
+    Key the LibreOffice service writes a converted file to - the last folder is replaced
+    with "processed" and the extension with ".pdf" (mirrors `transform_file_path` in the service).
+    """
+    directory, filename = os.path.split(input_key)
+    dir_parts = directory.split("/")
+    if len(dir_parts) > 1:
+        dir_parts[-1] = "processed"
+    else:
+        dir_parts.append("processed")
+    return "/".join(dir_parts + [os.path.splitext(filename)[0] + ".pdf"])
+
+
+class LibreOfficeClient:
+    """
+    Client for the LibreOffice conversion service, sending several conversions at once over pooled connections.
+
+    Args:
+        base_url: URL of the LibreOffice service, defaults to the LIBREOFFICE_SERVICE_URL environment variable
+        max_in_flight: maximum number of conversion requests sent at once
+        timeout: seconds to wait for each conversion request
+        retries: number of times to retry a conversion that fails with a connection error or server error
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_in_flight: int = 4,
+        timeout: float = 300,
+        retries: int = 3,
+    ):
+        self.base_url = base_url or os.getenv("LIBREOFFICE_SERVICE_URL")
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+
+        # Conversion writes to a fixed output key, so retrying a POST is safe
+        retry = Retry(
+            total=retries,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["POST"],
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def convert(self, s3_file_key: str) -> str:
+        """Converts a file in S3 to PDF, returning the key of the converted file"""
+        response = self.session.post(f"{self.base_url}/convert", json={"input_key": s3_file_key}, timeout=self.timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to convert file {s3_file_key}: {response.status_code} {response.text}")
+        return response.json()["output_key"]
+
+    def convert_many(self, s3_file_keys: list[str]) -> list[str]:
+        """Converts files in S3 to PDF concurrently, returning keys of converted files in the same order"""
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            return list(executor.map(self.convert, s3_file_keys))
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def convert_to_pdf_from_s3(
+    s3_file_keys: list[str],
+    s3_storage_handler: Optional[S3StorageHandler] = None,
+    max_in_flight: int = 4,
+    timeout: float = 300,
+    retries: int = 3,
+) -> list[str]:
+    """
+    Converts files in S3 to PDF using the LibreOffice service, several at a time.
+
+    If an S3 storage handler is given, files that are already PDFs are copied to their processed key
+    within S3 instead of being sent to the service.
+
+    Returns:
+        Keys of converted files in S3, in the same order as the input keys
+    """
+    s3_converted_file_keys = {}
+    keys_to_convert = []
     for s3_file_key in s3_file_keys:
-        response = requests.post(f"{os.getenv('LIBREOFFICE_SERVICE_URL')}/convert", json={"input_key": s3_file_key})
-        assert response.status_code == 200, f"Failed to convert file {s3_file_key}"
-        s3_converted_file_keys.append(response.json()["output_key"])
+        if s3_storage_handler is not None and s3_file_key.lower().endswith(".pdf"):
+            processed_key = get_processed_file_key(s3_file_key)
+            s3_storage_handler.copy_item(s3_file_key, processed_key)
+            s3_converted_file_keys[s3_file_key] = processed_key
+        else:
+            keys_to_convert.append(s3_file_key)
+    logger.info(f"Copied {len(s3_converted_file_keys)} PDFs, converting {len(keys_to_convert)} files")
+
+    # send files to libreoffice service
+    client = LibreOfficeClient(max_in_flight=max_in_flight, timeout=timeout, retries=retries)
+    try:
+        s3_converted_file_keys.update(zip(keys_to_convert, client.convert_many(keys_to_convert)))
+    finally:
+        client.close()
 
-    return s3_converted_file_keys
+    return [s3_converted_file_keys[s3_file_key] for s3_file_key in s3_file_keys]
 
 
 def extract_bucket_key(url: Union[str, ParseResult]) -> str:
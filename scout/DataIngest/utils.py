@@ -1,6 +1,9 @@
 import datetime
 from pathlib import Path
 
+# File types that can be ingested, as in `S3StorageHandler.upload_folder_contents`
+INGESTED_FILE_EXTENSIONS = ["pdf", "docx", "doc", "txt", "pptx", "ppt"]
+
 
 def get_project_directory(project_directory_name):
     # Project directory name is name of the folder where project
@@ -20,3 +23,7 @@ def get_project_name_with_date_time(project_directory_name):
 
 def sanitise_project_name(project_name: str) -> str:
     return project_name.replace(" ", "-")
+
+
+def is_ingestible_file(file_name: str) -> bool:
+    return not file_name.startswith(".") and file_name.split(".")[-1].lower() in INGESTED_FILE_EXTENSIONS
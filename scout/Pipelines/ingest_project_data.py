@@ -1,24 +1,78 @@
 import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from langchain_core.vectorstores import VectorStore
 
-from scout.DataIngest.chunkers import add_chunks_to_vector_store, chunk_file, download_to_tempfile
-from scout.DataIngest.file_info import add_llm_generated_file_info
-from scout.DataIngest.models.schemas import Chunk, File, FileCreate, Project, ProjectCreate
-from scout.DataIngest.s3_download import convert_to_pdf_from_s3, s3_key_from_presigned_url
+from scout.DataIngest.anonymizer import Anonymizer, analyze_texts, anonymising_pool_kwargs
+from scout.DataIngest.archives import is_archive, upload_archive_members
+from scout.DataIngest.boilerplate import BoilerplateReport, ProjectBoilerplate
+from scout.DataIngest.checkpoints import IngestionCheckpointer
+from scout.DataIngest.chunkers import (
+    add_chunks_to_vector_store,
+    anonymise_chunks,
+    check_file_can_be_chunked,
+    chunk_file,
+    copy_chunk_vectors,
+    download_s3_object_to_tempfile_with_hash,
+)
+from scout.DataIngest.file_info import (
+    DEFAULT_FILE_INFO_MAX_CONCURRENCY,
+    add_llm_generated_file_info,
+    add_llm_generated_file_info_for_files,
+    get_file_update,
+)
+from scout.DataIngest.memory import MemoryBudget, get_memory_budget
+from scout.DataIngest.models.schemas import (
+    Chunk,
+    ChunkCreate,
+    ChunkFilter,
+    File,
+    FileCreate,
+    FileFilter,
+    FileInfo,
+    IngestionStage,
+    Project,
+    ProjectCreate,
+    ProjectFilter,
+)
+from scout.DataIngest.partitioning import can_partition_without_converting
+from scout.DataIngest.pipeline import Stage, StagedPipeline
+from scout.DataIngest.s3_download import convert_to_pdf_from_s3, get_processed_file_key
 from scout.DataIngest.utils import get_project_directory, get_project_name_with_date_time, sanitise_project_name
 from scout.utils.storage.filesystem import S3StorageHandler
+from scout.utils.storage.postgres_interface import save_project_person_map
 from scout.utils.storage.postgres_storage_handler import PostgresStorageHandler
 from scout.utils.storage.storage_handler import BaseStorageHandler
 from scout.utils.utils import logger
 
+# Number of worker threads for each stage of the staged ingestion pipeline. The partition and anonymise
+# stages are CPU bound, so each of their threads drives one worker process.
+DEFAULT_STAGE_CONCURRENCY = {
+    "download": 4,
+    "partition": os.cpu_count() or 1,
+    "anonymise": 2,
+    "persist": 2,
+    "file_info": 4,
+    "embed": 2,
+}
+# Chunks written to the database in one statement
+DEFAULT_CHUNK_WRITE_BATCH_SIZE = 500
+# Files downloaded from S3 at once, within the S3 client's connection pool (S3_MAX_POOL_CONNECTIONS)
+DEFAULT_MAX_CONCURRENT_DOWNLOADS = int(os.getenv("S3_MAX_CONCURRENT_DOWNLOADS", 8))
 
-def create_file_from_presigned_url(
-    presigned_url: str, project: Project, s3_storage_handler: S3StorageHandler, storage_handler: PostgresStorageHandler
+
+def create_file_from_s3_key(
+    s3_key: str,
+    project: Project,
+    s3_storage_handler: S3StorageHandler,
+    storage_handler: PostgresStorageHandler,
+    content_hash: Optional[str] = None,
 ) -> File:
-    s3_key = s3_key_from_presigned_url(presigned_url)
+    if can_partition_without_converting(s3_key):
+        # An Office file chunked without converting it first, the file is shown to users as its converted PDF
+        s3_key = get_processed_file_key(s3_key)
     logger.info(f"Saving file with S3 key: {s3_key}")
     file_name = s3_key.split("/")[-1]  # Get the last part of the path
     logger.info(f"File name: {file_name}")
@@ -28,28 +82,245 @@ def create_file_from_presigned_url(
         type=os.path.splitext(file_name)[1],
         project=project,
         s3_bucket=s3_storage_handler.bucket_name,
+        content_hash=content_hash,
     )
     file = storage_handler.write_item(file_create)
     return file
 
 
 def save_files_to_db_and_temp(
-    presigned_urls: List[str],
+    s3_keys: List[str],
     project: Project,
     s3_storage_handler: S3StorageHandler,
     storage_handler: PostgresStorageHandler,
+    max_concurrent_downloads: int = DEFAULT_MAX_CONCURRENT_DOWNLOADS,
 ) -> List[Tuple[File, Path]]:
-    """Saves files at the presigned URLs to the database and to a temp folder."""
+    """
+    Saves the files with the given keys in our bucket to the database and to a temp folder. Files are read with the
+    S3 storage handler's client, several at once.
+    """
+    downloads = download_files(s3_keys, s3_storage_handler, max_concurrent_downloads=max_concurrent_downloads)
     created_files = [
-        create_file_from_presigned_url(
-            url, project=project, s3_storage_handler=s3_storage_handler, storage_handler=storage_handler
+        create_file_from_s3_key(
+            s3_key,
+            project=project,
+            s3_storage_handler=s3_storage_handler,
+            storage_handler=storage_handler,
+            content_hash=content_hash,
         )
-        for url in presigned_urls
+        for s3_key, (_, content_hash) in zip(s3_keys, downloads)
     ]
-    temp_filepaths = [download_to_tempfile(url) for url in presigned_urls]
+    temp_filepaths = [temp_filepath for temp_filepath, _ in downloads]
     return zip(created_files, temp_filepaths)
 
 
+def download_file(s3_key: str, s3_storage_handler: S3StorageHandler) -> Tuple[Path, str]:
+    """Downloads a file in our bucket to a temp file, returning its path and content hash"""
+    return download_s3_object_to_tempfile_with_hash(s3_storage_handler, s3_key, suffix=get_file_type(s3_key))
+
+
+def download_files(
+    s3_keys: List[str],
+    s3_storage_handler: S3StorageHandler,
+    max_concurrent_downloads: int = DEFAULT_MAX_CONCURRENT_DOWNLOADS,
+) -> List[Tuple[Path, str]]:
+    """Downloads several files at once, returned in the same order as the keys"""
+    if not s3_keys:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_concurrent_downloads, len(s3_keys))) as executor:
+        return list(executor.map(lambda s3_key: download_file(s3_key, s3_storage_handler), s3_keys))
+
+
+def get_file_type(s3_key: str) -> str:
+    # Temp files keep the extension of the file in S3, so unstructured partitions them as the right type
+    return os.path.splitext(s3_key)[1].lower()
+
+
+def find_processed_file_with_same_content(file: File, storage_handler: PostgresStorageHandler) -> Optional[File]:
+    """
+    Finds another file in the same project with the same content hash that has already been chunked, if there is one.
+    Chunks are only reused within a project, as their text holds the project's placeholders for people's names.
+    """
+    if not file.content_hash:
+        return None
+    matching_files = (
+        storage_handler.get_item_by_attribute(FileFilter(content_hash=file.content_hash, project=file.project)) or []
+    )
+    for matching_file in matching_files:
+        if matching_file.id != file.id and matching_file.chunks:
+            return matching_file
+    return None
+
+
+def reuse_processed_file(
+    file: File,
+    processed_file: File,
+    storage_handler: PostgresStorageHandler,
+    project: Project,
+    vector_store: VectorStore,
+    checkpointer: Optional[IngestionCheckpointer] = None,
+) -> List[Chunk]:
+    """
+    Copies chunks and LLM generated file info from an already processed file with identical content, instead of
+    partitioning and anonymising the file again. The copied chunks' embeddings come from the embedding cache.
+    """
+    logger.info(f"File {file.name} has the same content as already ingested file {processed_file.name}, reusing it")
+    source_chunks = sorted(processed_file.chunks, key=lambda chunk: chunk.idx)
+    chunks = [
+        ChunkCreate(
+            idx=chunk.idx,
+            text=chunk.text,
+            page_num=chunk.page_num,
+            partition_strategy=chunk.partition_strategy,
+            token_count=chunk.token_count,
+            file=file,
+        )
+        for chunk in source_chunks
+    ]
+    new_chunks = persist_chunks(chunks=chunks, storage_handler=storage_handler)
+    if checkpointer:
+        checkpointer.mark(file.name, IngestionStage.CHUNKED, file=file)
+
+    file_update = get_file_update(file=file, file_info=FileInfo())
+    file_update.clean_name = processed_file.clean_name
+    file_update.source = processed_file.source
+    file_update.summary = processed_file.summary
+    file_update.published_date = processed_file.published_date
+    storage_handler.update_item(file_update)
+    if checkpointer:
+        checkpointer.mark(file.name, IngestionStage.FILE_INFO_DONE)
+
+    copy_chunk_vectors(chunks=new_chunks, project_id=project.id, vector_store=vector_store)
+    if checkpointer:
+        checkpointer.mark(file.name, IngestionStage.EMBEDDED)
+    return new_chunks
+
+
+def persist_chunks(
+    chunks: List[ChunkCreate],
+    storage_handler: PostgresStorageHandler,
+    batch_size: int = DEFAULT_CHUNK_WRITE_BATCH_SIZE,
+) -> List[Chunk]:
+    # Written in batches, so a file with many chunks isn't sent to the database in one statement. Chunks already
+    # written are found again rather than duplicated, so a file that fails part way can be saved again.
+    new_chunks: List[Chunk] = []
+    for i in range(0, len(chunks), batch_size):
+        new_chunks.extend(storage_handler.write_items(chunks[i : i + batch_size]))
+    for i, new_chunk in enumerate(new_chunks):
+        new_chunk.file = chunks[i].file
+    return new_chunks
+
+
+def save_chunks(
+    file: File,
+    chunks: List[ChunkCreate],
+    storage_handler: PostgresStorageHandler,
+    checkpointer: Optional[IngestionCheckpointer] = None,
+) -> List[Chunk]:
+    """Saves chunks of a file to the database, ready for `finish_chunked_files`"""
+    new_chunks = persist_chunks(chunks=chunks, storage_handler=storage_handler)
+    if checkpointer:
+        checkpointer.mark(file.name, IngestionStage.CHUNKED, file=file)
+    return new_chunks
+
+
+def finish_chunked_files(
+    files_and_chunks: List[Tuple[File, List[Chunk]]],
+    storage_handler: PostgresStorageHandler,
+    project: Project,
+    vector_store: VectorStore,
+    checkpointer: Optional[IngestionCheckpointer] = None,
+    file_info_max_concurrency: int = DEFAULT_FILE_INFO_MAX_CONCURRENCY,
+) -> Dict[str, Exception]:
+    """
+    Adds LLM generated file info to files with saved chunks and embeds the chunks, skipping stages already
+    checkpointed. File info for all the files is requested at once and saved in bulk, rather than one LLM
+    round trip per file.
+
+    Returns:
+        Dictionary of file name to the exception raised, for files that failed to ingest
+    """
+    files_needing_info = [
+        (file, chunks)
+        for file, chunks in files_and_chunks
+        if not (checkpointer and checkpointer.is_done(file.name, IngestionStage.FILE_INFO_DONE))
+    ]
+    failed_files = {}
+    if files_needing_info:
+        # Now we can create LLM file attributes. This uses instructor and the file_info_extractor prompt.
+        try:
+            _, failed_files = add_llm_generated_file_info_for_files(
+                project_name=project.name,
+                files_and_chunks=files_needing_info,
+                storage_handler=storage_handler,
+                max_concurrency=file_info_max_concurrency,
+            )
+        except Exception as e:
+            logger.exception(f"Failed to save LLM generated file info for {len(files_needing_info)} files")
+            failed_files = {file.name: e for file, _ in files_needing_info}
+        if checkpointer:
+            for file, _ in files_needing_info:
+                if file.name not in failed_files:
+                    checkpointer.mark(file.name, IngestionStage.FILE_INFO_DONE)
+
+    for file, chunks in files_and_chunks:
+        if file.name in failed_files:
+            continue
+        try:
+            add_chunks_to_vector_store(chunks=chunks, vector_store=vector_store, project_id=project.id)
+            if checkpointer:
+                checkpointer.mark(file.name, IngestionStage.EMBEDDED)
+            logger.info(f"Finished ingesting file: {file.name}")
+        except Exception as e:
+            logger.exception(f"Failed to embed file: {file.name}")
+            failed_files[file.name] = e
+
+    if checkpointer:
+        for file_name, e in failed_files.items():
+            checkpointer.mark_failed(file_name, e)
+    return failed_files
+
+
+def resume_chunked_files(
+    checkpointer: IngestionCheckpointer,
+    storage_handler: PostgresStorageHandler,
+    project: Project,
+    vector_store: VectorStore,
+    file_info_max_concurrency: int = DEFAULT_FILE_INFO_MAX_CONCURRENCY,
+) -> Dict[str, Exception]:
+    """
+    Finishes files that an earlier attempt saved chunks for but didn't finish, loading the file and its chunks
+    back from the database rather than downloading and partitioning the file again.
+
+    Returns:
+        Dictionary of file name to the exception raised, for files that failed to ingest
+    """
+    failed_files = {}
+    files_and_chunks = []
+    run_files = checkpointer.files_at(IngestionStage.CHUNKED) + checkpointer.files_at(IngestionStage.FILE_INFO_DONE)
+    for run_file in run_files:
+        try:
+            file = storage_handler.read_item(object_id=run_file.file.id, model=File)
+            chunks = storage_handler.get_item_by_attribute(ChunkFilter(file=file)) or []
+            logger.info(f"Resuming file {file.name} from stage {run_file.stage}")
+            files_and_chunks.append((file, sorted(chunks, key=lambda chunk: chunk.idx)))
+        except Exception as e:
+            logger.exception(f"Failed to resume file: {run_file.name}")
+            checkpointer.mark_failed(run_file.name, e)
+            failed_files[run_file.name] = e
+    failed_files.update(
+        finish_chunked_files(
+            files_and_chunks,
+            storage_handler=storage_handler,
+            project=project,
+            vector_store=vector_store,
+            checkpointer=checkpointer,
+            file_info_max_concurrency=file_info_max_concurrency,
+        )
+    )
+    return failed_files
+
+
 def chunk_embed_save_from_temp_filepath(
     file: File,
     temp_filepath: Path,
@@ -57,23 +328,376 @@ def chunk_embed_save_from_temp_filepath(
     project: Project,
     vector_store: VectorStore,
     chunking_strategy: str,
-):
-    assert file.type == ".pdf"
+    checkpointer: Optional[IngestionCheckpointer] = None,
+    anonymizer: Optional[Anonymizer] = None,
+    anonymise_max_workers: int = 1,
+    anonymise_executor: Optional[Executor] = None,
+    partition_max_workers: int = 1,
+    project_boilerplate: Optional[ProjectBoilerplate] = None,
+    finish: bool = True,
+) -> Optional[Tuple[File, List[Chunk]]]:
+    """
+    Chunks a file and saves the chunks. With finish=False, LLM file info and embedding are left for the caller
+    to run for many files at once with `finish_chunked_files`.
+
+    Returns:
+        The file and its saved chunks, if they still need finishing
+    """
+    check_file_can_be_chunked(file, temp_filepath)
+    processed_file = find_processed_file_with_same_content(file, storage_handler)
+    if processed_file:
+        temp_filepath.unlink(missing_ok=True)
+        reuse_processed_file(
+            file=file,
+            processed_file=processed_file,
+            storage_handler=storage_handler,
+            project=project,
+            vector_store=vector_store,
+            checkpointer=checkpointer,
+        )
+        return None
+
     try:
         logger.info(f"Trying to Chunk file: {file.name}")
-        chunks = chunk_file(file=file, temp_filepath=temp_filepath, anonymise=True, chunking_strategy=chunking_strategy)
-        new_chunks: List[Chunk] = storage_handler.write_items(chunks)
-        for i, new_chunk in enumerate(new_chunks):
-            new_chunk.file = chunks[i].file
-        chunks = new_chunks
+        chunks = chunk_file(
+            file=file,
+            temp_filepath=temp_filepath,
+            anonymise=True,
+            chunking_strategy=chunking_strategy,
+            anonymizer=anonymizer,
+            anonymise_max_workers=anonymise_max_workers,
+            anonymise_executor=anonymise_executor,
+            partition_max_workers=partition_max_workers,
+            project_boilerplate=project_boilerplate,
+        )
     except FileNotFoundError as e:
         logger.error(e)
+        return None
+
+    new_chunks = save_chunks(file=file, chunks=chunks, storage_handler=storage_handler, checkpointer=checkpointer)
+    if not finish:
+        return file, new_chunks
+    failed_files = finish_chunked_files(
+        [(file, new_chunks)],
+        storage_handler=storage_handler,
+        project=project,
+        vector_store=vector_store,
+        checkpointer=checkpointer,
+    )
+    if failed_files:
+        raise failed_files[file.name]
+    return None
+
+
+def _chunk_file_in_worker(
+    file: File, temp_filepath: Path, chunking_strategy: str, boilerplate_hashes: Optional[Set[str]] = None
+) -> Tuple[List[ChunkCreate], BoilerplateReport]:
+    # Runs in a worker process, so must be importable at module level to be pickled. Boilerplate found in the
+    # project so far is passed in, and what this file adds is reported back for the parent process to share
+    check_file_can_be_chunked(file, temp_filepath)
+    project_boilerplate = ProjectBoilerplate(boilerplate_hashes)
+    chunks = chunk_file(
+        file=file,
+        temp_filepath=temp_filepath,
+        anonymise=False,
+        chunking_strategy=chunking_strategy,
+        project_boilerplate=project_boilerplate,
+    )
+    return chunks, project_boilerplate.report()
 
-    # Now we can create LLM file attributes. This uses instructor and the file_info_extractor prompt.
-    add_llm_generated_file_info(
-        project_name=project.name, file=file, chunks_from_file=chunks, storage_handler=storage_handler
+
+def _chunk_and_analyze_file_in_worker(
+    file: File, temp_filepath: Path, chunking_strategy: str, boilerplate_hashes: Optional[Set[str]] = None
+):
+    # Finds people etc. to anonymise in the worker, placeholders are applied in the parent process so that
+    # they are consistent across the project
+    chunks, boilerplate_report = _chunk_file_in_worker(file, temp_filepath, chunking_strategy, boilerplate_hashes)
+    return chunks, analyze_texts([chunk.text for chunk in chunks]), boilerplate_report
+
+
+def save_person_map(project: Project, anonymizer: Anonymizer) -> None:
+    """Saves the placeholders given to people's names with the project, so later ingestion numbers them the same"""
+    save_project_person_map(project.id, anonymizer.person_map)
+
+
+def chunk_embed_save_files_in_parallel(
+    files_to_chunk: Iterable[Tuple[File, Path]],
+    storage_handler: PostgresStorageHandler,
+    project: Project,
+    vector_store: VectorStore,
+    chunking_strategy: str,
+    max_workers: int,
+    checkpointer: Optional[IngestionCheckpointer] = None,
+    anonymizer: Optional[Anonymizer] = None,
+    file_info_max_concurrency: int = DEFAULT_FILE_INFO_MAX_CONCURRENCY,
+    memory_budget: Optional[MemoryBudget] = None,
+    project_boilerplate: Optional[ProjectBoilerplate] = None,
+) -> Dict[str, Exception]:
+    """
+    Chunk several files at once in a pool of worker processes.
+
+    Partitioning, chunking and finding entities to anonymise are CPU bound, so run in the worker processes.
+    Anonymised placeholders are applied in this process with one anonymizer, so people are numbered consistently
+    across files. Database writes, LLM file info and embedding also stay in this process (database connections
+    and the vector store can't be shared across processes). Chunks are saved as soon as they are ready, then
+    LLM file info is requested for all the files at once and the chunks are embedded. Files are only handed to
+    workers while they fit in the memory budget (see `MemoryBudget`), defaulting to the one shared by the process.
+    Each file is stripped of the project boilerplate found by the time it is handed to a worker, so boilerplate
+    found in files chunked at the same time isn't shared between them.
+
+    Returns:
+        Dictionary of file name to the exception raised, for files that failed to ingest
+    """
+    anonymizer = anonymizer or Anonymizer()
+    memory_budget = memory_budget or get_memory_budget()
+    project_boilerplate = project_boilerplate or ProjectBoilerplate()
+    failed_files = {}
+    chunked_files = []
+    with ProcessPoolExecutor(max_workers=max_workers, **anonymising_pool_kwargs()) as executor:
+        futures = {}
+        duplicate_files = []
+        for file, temp_filepath in files_to_chunk:
+            processed_file = find_processed_file_with_same_content(file, storage_handler)
+            if processed_file:
+                temp_filepath.unlink(missing_ok=True)
+                duplicate_files.append((file, processed_file))
+            else:
+                # Waits for room in the memory budget, which is given back as soon as the worker is done with the file
+                num_bytes = memory_budget.estimate(temp_filepath)
+                memory_budget.acquire(num_bytes)
+                future = executor.submit(
+                    _chunk_and_analyze_file_in_worker,
+                    file,
+                    temp_filepath,
+                    chunking_strategy,
+                    project_boilerplate.copy_hashes(),
+                )
+                future.add_done_callback(lambda _, num_bytes=num_bytes: memory_budget.release(num_bytes))
+                futures[future] = file
+
+        for file, processed_file in duplicate_files:
+            try:
+                reuse_processed_file(
+                    file=file,
+                    processed_file=processed_file,
+                    storage_handler=storage_handler,
+                    project=project,
+                    vector_store=vector_store,
+                    checkpointer=checkpointer,
+                )
+            except Exception as e:
+                logger.exception(f"Failed to reuse processed file for: {file.name}")
+                failed_files[file.name] = e
+
+        for future in as_completed(futures):
+            file = futures[future]
+            try:
+                chunks, analyzer_results, boilerplate_report = future.result()
+                project_boilerplate.add(boilerplate_report)
+                anonymise_chunks(chunks, anonymizer=anonymizer, analyzer_results=analyzer_results)
+                new_chunks = save_chunks(
+                    file=file, chunks=chunks, storage_handler=storage_handler, checkpointer=checkpointer
+                )
+                chunked_files.append((file, new_chunks))
+            except Exception as e:
+                logger.exception(f"Failed to ingest file: {file.name}")
+                failed_files[file.name] = e
+
+    if checkpointer:
+        for file_name, e in failed_files.items():
+            checkpointer.mark_failed(file_name, e)
+
+    failed_files.update(
+        finish_chunked_files(
+            chunked_files,
+            storage_handler=storage_handler,
+            project=project,
+            vector_store=vector_store,
+            checkpointer=checkpointer,
+            file_info_max_concurrency=file_info_max_concurrency,
+        )
     )
-    add_chunks_to_vector_store(chunks=chunks, vector_store=vector_store, project_id=project.id)
+    return failed_files
+
+
+def describe_pipeline_item(item) -> str:
+    # Items are S3 keys until the file is downloaded, then tuples starting with the file
+    if isinstance(item, tuple):
+        return item[0].name
+    return item
+
+
+def ingest_files_with_staged_pipeline(
+    s3_keys: List[str],
+    project: Project,
+    s3_storage_handler: S3StorageHandler,
+    storage_handler: PostgresStorageHandler,
+    vector_store: VectorStore,
+    chunking_strategy: str,
+    stage_concurrency: Optional[Dict[str, int]] = None,
+    checkpointer: Optional[IngestionCheckpointer] = None,
+    anonymizer: Optional[Anonymizer] = None,
+    memory_budget: Optional[MemoryBudget] = None,
+    project_boilerplate: Optional[ProjectBoilerplate] = None,
+) -> Dict[str, Exception]:
+    """
+    Ingests files through a pipeline of stages connected by bounded queues: download, partition/chunk,
+    anonymise, persist chunks, LLM file info and embed. Each stage works on a different file at the same
+    time, so network bound stages (S3, instructor calls, embeddings) overlap with CPU bound partitioning.
+
+    Args:
+        stage_concurrency: number of workers for each stage, overriding DEFAULT_STAGE_CONCURRENCY
+        anonymizer: shared by all files, so people are numbered consistently across the project
+        memory_budget: files are only partitioned while they fit in this budget, defaults to the process's budget
+        project_boilerplate: boilerplate found in files partitioned so far, stripped from each file partitioned after
+
+    Returns:
+        Dictionary of file name (or S3 key, if the file failed to download) to the exception raised
+    """
+    concurrency = {**DEFAULT_STAGE_CONCURRENCY, **(stage_concurrency or {})}
+    anonymizer = anonymizer or Anonymizer()
+    memory_budget = memory_budget or get_memory_budget()
+    project_boilerplate = project_boilerplate or ProjectBoilerplate()
+
+    def download(s3_key: str) -> Optional[Tuple[File, Path]]:
+        temp_filepath, content_hash = download_file(s3_key, s3_storage_handler)
+        file = create_file_from_s3_key(
+            s3_key,
+            project=project,
+            s3_storage_handler=s3_storage_handler,
+            storage_handler=storage_handler,
+            content_hash=content_hash,
+        )
+        processed_file = find_processed_file_with_same_content(file, storage_handler)
+        if processed_file:
+            temp_filepath.unlink(missing_ok=True)
+            reuse_processed_file(
+                file=file,
+                processed_file=processed_file,
+                storage_handler=storage_handler,
+                project=project,
+                vector_store=vector_store,
+                checkpointer=checkpointer,
+            )
+            return None
+        return file, temp_filepath
+
+    def persist(item: Tuple[File, List[ChunkCreate]]) -> Tuple[File, List[Chunk]]:
+        file, chunks = item
+        new_chunks = persist_chunks(chunks=chunks, storage_handler=storage_handler)
+        if checkpointer:
+            checkpointer.mark(file.name, IngestionStage.CHUNKED, file=file)
+        return file, new_chunks
+
+    def file_info(item: Tuple[File, List[Chunk]]) -> Tuple[File, List[Chunk]]:
+        file, chunks = item
+        add_llm_generated_file_info(
+            project_name=project.name, file=file, chunks_from_file=chunks, storage_handler=storage_handler
+        )
+        if checkpointer:
+            checkpointer.mark(file.name, IngestionStage.FILE_INFO_DONE)
+        return item
+
+    def embed(item: Tuple[File, List[Chunk]]) -> File:
+        file, chunks = item
+        add_chunks_to_vector_store(chunks=chunks, vector_store=vector_store, project_id=project.id)
+        if checkpointer:
+            checkpointer.mark(file.name, IngestionStage.EMBEDDED)
+        logger.info(f"Finished ingesting file: {file.name}")
+        return file
+
+    with (
+        ProcessPoolExecutor(max_workers=concurrency["partition"]) as partition_executor,
+        ProcessPoolExecutor(max_workers=concurrency["anonymise"], **anonymising_pool_kwargs()) as anonymise_executor,
+    ):
+
+        def partition(item: Tuple[File, Path]) -> Tuple[File, List[ChunkCreate]]:
+            file, temp_filepath = item
+            with memory_budget.reserve(memory_budget.estimate(temp_filepath)):
+                chunks, boilerplate_report = partition_executor.submit(
+                    _chunk_file_in_worker, file, temp_filepath, chunking_strategy, project_boilerplate.copy_hashes()
+                ).result()
+            project_boilerplate.add(boilerplate_report)
+            return file, chunks
+
+        def anonymise(item: Tuple[File, List[ChunkCreate]]) -> Tuple[File, List[ChunkCreate]]:
+            # Entities are found in a worker process, placeholders are applied with the shared anonymizer
+            file, chunks = item
+            analyzer_results = anonymise_executor.submit(analyze_texts, [chunk.text for chunk in chunks]).result()
+            return file, anonymise_chunks(chunks, anonymizer=anonymizer, analyzer_results=analyzer_results)
+
+        pipeline = StagedPipeline(
+            [
+                Stage("download", download, concurrency["download"]),
+                Stage("partition", partition, concurrency["partition"]),
+                Stage("anonymise", anonymise, concurrency["anonymise"]),
+                Stage("persist", persist, concurrency["persist"]),
+                Stage("file_info", file_info, concurrency["file_info"]),
+                Stage("embed", embed, concurrency["embed"]),
+            ],
+            describe_item=describe_pipeline_item,
+        )
+        pipeline.run(s3_keys)
+
+    failed_files = {describe_pipeline_item(item): e for _, item, e in pipeline.errors}
+
+    if checkpointer:
+        for file_name, e in failed_files.items():
+            checkpointer.mark_failed(file_name.split("/")[-1], e)
+    return failed_files
+
+
+def wait_for_viewing_conversion(
+    viewing_conversion: Optional[Future], s3_file_keys: List[str], checkpointer: IngestionCheckpointer
+) -> None:
+    """
+    Waits for Office files chunked without converting to finish converting to PDF. Failures don't fail ingestion,
+    as the files are searchable, but are recorded against the files as they can't be viewed.
+    """
+    if viewing_conversion is None:
+        return
+    try:
+        converted_keys = viewing_conversion.result()
+        logger.info(f"Converted {converted_keys} files to pdf for viewing")
+    except Exception as e:
+        logger.exception("Failed to convert files to pdf for viewing")
+        for s3_file_key in s3_file_keys:
+            checkpointer.mark_failed(s3_file_key.split("/")[-1], e)
+
+
+def upload_project_archives(
+    project_folder_path: Path,
+    s3_storage_handler: S3StorageHandler,
+    prefix: str,
+    archive_s3_keys: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Uploads the files in zip archives in the project folder, and in archives already in the S3 bucket, under prefix.
+    Files with the same name as one in exclude, or in an earlier archive, are skipped.
+
+    Returns:
+        Keys of the uploaded files in S3
+    """
+    archives = [(str(path), False) for path in sorted(Path(project_folder_path).glob("*")) if is_archive(path.name)]
+    archives += [(archive_s3_key, True) for archive_s3_key in archive_s3_keys or []]
+    exclude = list(exclude or [])
+    s3_file_keys = []
+    for archive, archive_in_s3 in archives:
+        member_keys = upload_archive_members(
+            archive, s3_storage_handler, prefix=prefix, archive_in_s3=archive_in_s3, exclude=exclude
+        )
+        exclude += [member_key.split("/")[-1] for member_key in member_keys]
+        s3_file_keys += member_keys
+    return s3_file_keys
+
+
+def get_project_to_resume(project_name: str, storage_handler: BaseStorageHandler) -> Project:
+    projects = storage_handler.get_item_by_attribute(ProjectFilter(name=project_name)) or []
+    for project in projects:
+        if project.name == project_name:
+            return project
+    raise ValueError(f"No project named {project_name} to resume")
 
 
 def ingest_project_files(
@@ -82,65 +706,231 @@ def ingest_project_files(
     storage_handler: BaseStorageHandler = PostgresStorageHandler(),
     s3_storage_handler: S3StorageHandler = S3StorageHandler(),
     chunking_partition_strategy: str = "fast",
+    max_workers: int = 1,
+    stage_concurrency: Optional[Dict[str, int]] = None,
+    conversion_max_in_flight: int = 4,
+    resume_project_name: Optional[str] = None,
+    anonymise_max_workers: int = 1,
+    partition_max_workers: int = 1,
+    file_info_max_concurrency: int = DEFAULT_FILE_INFO_MAX_CONCURRENCY,
+    partition_office_natively: bool = False,
+    archive_s3_keys: Optional[List[str]] = None,
 ) -> str:
     """
     Ingest all project files in a given folder. This converts files to PDF, uploads to S3 storage,
     chunks the text content of files and saves info to a Postgres database and a vector store
     (for chunks).
 
+    How far each file has got is checkpointed in the database. If ingestion fails part way, call this again
+    with `resume_project_name` to carry on from the last finished stage of each file.
+
     Args:
         project_directory_name: name of folder where the project files are saved (within .data folder)
         vector_store: for embedding file chunks
         storage_handler: for saving to database
         s3_storage_handler: for saving to S3
         strategy: one of ["auto", "hi_res", "fast" and "ocr_only"] as in
-            https://docs.unstructured.io/open-source/core-functionality/partitioning#partition
+            https://docs.unstructured.io/open-source/core-functionality/partitioning#partition, or "per_page"
+            to use "fast" for pages with a text layer and "hi_res" only for pages without one
+        max_workers: number of files to chunk at once in worker processes, 1 chunks files one at a time
+        stage_concurrency: if given, ingest files through the staged pipeline, with this many workers per stage
+            (see DEFAULT_STAGE_CONCURRENCY for stage names and defaults)
+        conversion_max_in_flight: maximum number of files converted to PDF by the LibreOffice service at once
+        resume_project_name: name of an existing project to resume ingesting, instead of creating a new project
+        anonymise_max_workers: number of worker processes to spread each file's chunks across when anonymising,
+            when files are chunked one at a time
+        partition_max_workers: number of worker processes to partition page ranges of large PDFs across,
+            when files are chunked one at a time
+        file_info_max_concurrency: number of LLM file info requests in flight at once, once files are chunked
+            (the staged pipeline uses its "file_info" stage concurrency instead)
+        partition_office_natively: chunk docx and pptx files straight from the uploaded file, instead of waiting
+            for them to be converted to PDF and downloading the PDF. They are still converted to PDF for viewing,
+            alongside ingestion.
+        archive_s3_keys: keys of zip archives in the S3 bucket to ingest the files of. Zip archives in the project
+            folder are always ingested. Their files are streamed into S3 without extracting the archive.
 
     Returns:
         Project name (as string)
     """
-    project_name = get_project_name_with_date_time(project_directory_name)
-    print(f"project_name: {project_name}")
     project_folder_path = get_project_directory(project_directory_name)
     print(f"project_folder_path: {project_folder_path}")
 
-    # Create project in DB
-    project = ProjectCreate(name=project_name)
-    project = storage_handler.write_item(project)
+    if resume_project_name:
+        project = get_project_to_resume(resume_project_name, storage_handler)
+        logger.info(f"Resuming ingestion of project: {project.name}")
+    else:
+        # Create project in DB
+        project_name = get_project_name_with_date_time(project_directory_name)
+        print(f"project_name: {project_name}")
+        project = ProjectCreate(name=project_name)
+        project = storage_handler.write_item(project)
+    checkpointer = IngestionCheckpointer(project, project_directory_name, storage_handler)
+    checkpointer.start()
+    # People are given the same placeholder across the whole project, carrying on from any earlier ingestion
+    anonymizer = Anonymizer(person_map=project.person_map)
+    # Boilerplate found in one file is also stripped from files chunked after it
+    project_boilerplate = ProjectBoilerplate()
 
-    # Upload files to s3
+    # Upload files to s3, skipping any uploaded by an earlier attempt
     s3_file_keys = s3_storage_handler.upload_folder_contents(
         str(project_folder_path),
         recursive=False,
         prefix=sanitise_project_name(project.name) + "/raw/",
+        exclude=list(checkpointer.files),
+    )
+    s3_file_keys += upload_project_archives(
+        project_folder_path,
+        s3_storage_handler=s3_storage_handler,
+        prefix=sanitise_project_name(project.name) + "/raw/",
+        archive_s3_keys=archive_s3_keys,
+        exclude=list(checkpointer.files) + [s3_file_key.split("/")[-1] for s3_file_key in s3_file_keys],
     )
+    for s3_file_key in s3_file_keys:
+        checkpointer.mark(s3_file_key.split("/")[-1], IngestionStage.UPLOADED, raw_s3_key=s3_file_key)
     logger.info(f"Uploaded {s3_file_keys} files to s3")
 
+    s3_file_keys = [run_file.raw_s3_key for run_file in checkpointer.files_at(IngestionStage.UPLOADED)]
+    viewing_conversion_executor = ThreadPoolExecutor(max_workers=1)
+    viewing_conversion: Optional[Future] = None
+    native_file_keys = []
+    if partition_office_natively:
+        # Office files are chunked from the uploaded file, so converting them to PDF (only needed for viewing)
+        # runs in the background rather than holding up ingestion
+        native_file_keys = [key for key in s3_file_keys if can_partition_without_converting(key)]
+        s3_file_keys = [key for key in s3_file_keys if not can_partition_without_converting(key)]
+        for s3_file_key in native_file_keys:
+            checkpointer.mark(
+                s3_file_key.split("/")[-1],
+                IngestionStage.CONVERTED,
+                processed_s3_key=get_processed_file_key(s3_file_key),
+            )
+        if native_file_keys:
+            logger.info(f"Converting {native_file_keys} files to pdf for viewing, in the background")
+            viewing_conversion = viewing_conversion_executor.submit(
+                convert_to_pdf_from_s3, native_file_keys, max_in_flight=conversion_max_in_flight
+            )
+
     # send files to libreoffice service and convert to pdf.
     logger.info(f"Converting {s3_file_keys} files to pdf")
-    s3_converted_file_keys = convert_to_pdf_from_s3(s3_file_keys)
+    s3_converted_file_keys = convert_to_pdf_from_s3(
+        s3_file_keys, s3_storage_handler=s3_storage_handler, max_in_flight=conversion_max_in_flight
+    )
+    for s3_file_key, s3_converted_file_key in zip(s3_file_keys, s3_converted_file_keys):
+        checkpointer.mark(s3_file_key.split("/")[-1], IngestionStage.CONVERTED, processed_s3_key=s3_converted_file_key)
     logger.info(f"Converted {s3_converted_file_keys} files to pdf")
 
-    # Get presigned urls for these files - save file info to DB and files to temp for chunking
-    presigned_urls = s3_storage_handler.presigned_url_list(sanitise_project_name(project.name) + "/processed/")
-    files_to_chunk = save_files_to_db_and_temp(
-        presigned_urls=presigned_urls,
-        project=project,
-        s3_storage_handler=s3_storage_handler,
+    # Files an earlier attempt already chunked only need their file info and embeddings finishing
+    failed_files = resume_chunked_files(
+        checkpointer=checkpointer,
         storage_handler=storage_handler,
+        project=project,
+        vector_store=vector_store,
+        file_info_max_concurrency=file_info_max_concurrency,
     )
 
-    # Chunks, embed and save file metadata to DB and vector store from temp files
-    logger.info("Chunking and embedding files")
-    for file, temp_filepath in files_to_chunk:
-        chunk_embed_save_from_temp_filepath(
-            file=file,
-            temp_filepath=temp_filepath,
-            storage_handler=storage_handler,
+    # Keys of converted files, as recorded by the checkpoints - save file info to DB and files to temp for chunking
+    s3_keys = [
+        run_file.raw_s3_key
+        if partition_office_natively and can_partition_without_converting(run_file.raw_s3_key or "")
+        else run_file.processed_s3_key
+        for run_file in checkpointer.files_at(IngestionStage.CONVERTED)
+    ]
+
+    if stage_concurrency is not None:
+        logger.info("Ingesting files through staged pipeline")
+        failed_files.update(
+            ingest_files_with_staged_pipeline(
+                s3_keys=s3_keys,
+                project=project,
+                s3_storage_handler=s3_storage_handler,
+                storage_handler=storage_handler,
+                vector_store=vector_store,
+                chunking_strategy=chunking_partition_strategy,
+                stage_concurrency=stage_concurrency,
+                checkpointer=checkpointer,
+                anonymizer=anonymizer,
+                project_boilerplate=project_boilerplate,
+            )
+        )
+    else:
+        files_to_chunk = save_files_to_db_and_temp(
+            s3_keys=s3_keys,
             project=project,
-            vector_store=vector_store,
-            chunking_strategy=chunking_partition_strategy,
+            s3_storage_handler=s3_storage_handler,
+            storage_handler=storage_handler,
         )
 
+        # Chunks, embed and save file metadata to DB and vector store from temp files
+        logger.info("Chunking and embedding files")
+        if max_workers > 1:
+            failed_files.update(
+                chunk_embed_save_files_in_parallel(
+                    files_to_chunk=files_to_chunk,
+                    storage_handler=storage_handler,
+                    project=project,
+                    vector_store=vector_store,
+                    chunking_strategy=chunking_partition_strategy,
+                    max_workers=max_workers,
+                    checkpointer=checkpointer,
+                    anonymizer=anonymizer,
+                    file_info_max_concurrency=file_info_max_concurrency,
+                    project_boilerplate=project_boilerplate,
+                )
+            )
+        else:
+            chunked_files = []
+            # One pool analyses every file's chunks, rather than a pool being started for each file
+            anonymise_executor = (
+                ProcessPoolExecutor(max_workers=anonymise_max_workers, **anonymising_pool_kwargs())
+                if anonymise_max_workers > 1
+                else None
+            )
+            for file, temp_filepath in files_to_chunk:
+                try:
+                    chunked_file = chunk_embed_save_from_temp_filepath(
+                        file=file,
+                        temp_filepath=temp_filepath,
+                        storage_handler=storage_handler,
+                        project=project,
+                        vector_store=vector_store,
+                        chunking_strategy=chunking_partition_strategy,
+                        checkpointer=checkpointer,
+                        anonymizer=anonymizer,
+                        anonymise_max_workers=anonymise_max_workers,
+                        anonymise_executor=anonymise_executor,
+                        partition_max_workers=partition_max_workers,
+                        project_boilerplate=project_boilerplate,
+                        finish=False,
+                    )
+                    if chunked_file:
+                        chunked_files.append(chunked_file)
+                except Exception as e:
+                    # Record where the file got to, so it can be resumed from there, and carry on with other files
+                    logger.exception(f"Failed to ingest file: {file.name}")
+                    checkpointer.mark_failed(file.name, e)
+                    failed_files[file.name] = e
+            if anonymise_executor:
+                anonymise_executor.shutdown()
+            # LLM file info for all the chunked files is requested at once, then their chunks are embedded
+            failed_files.update(
+                finish_chunked_files(
+                    chunked_files,
+                    storage_handler=storage_handler,
+                    project=project,
+                    vector_store=vector_store,
+                    checkpointer=checkpointer,
+                    file_info_max_concurrency=file_info_max_concurrency,
+                )
+            )
+
+    if failed_files:
+        logger.error(f"Failed to ingest {len(failed_files)} files: {list(failed_files)}")
+    if project_boilerplate.tokens_saved:
+        logger.info(f"Stripping boilerplate saved {project_boilerplate.tokens_saved} tokens across the project")
+    save_person_map(project=project, anonymizer=anonymizer)
+    wait_for_viewing_conversion(viewing_conversion, native_file_keys, checkpointer)
+    viewing_conversion_executor.shutdown()
+    checkpointer.finish()
+
     # Project name is useful for checks
     return project.name
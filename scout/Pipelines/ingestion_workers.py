@@ -0,0 +1,300 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from langchain_core.vectorstores import VectorStore
+
+from scout.DataIngest.anonymizer import Anonymizer, analyze_texts, warm_up_engines
+from scout.DataIngest.checkpoints import IngestionCheckpointer
+from scout.DataIngest.chunkers import anonymise_chunks, chunk_file
+from scout.DataIngest.models.schemas import (
+    ChunkFilter,
+    File,
+    IngestionRun,
+    IngestionRunBase,
+    IngestionRunFile,
+    IngestionStage,
+    Project,
+    ProjectCreate,
+)
+from scout.DataIngest.s3_download import convert_to_pdf_from_s3
+from scout.DataIngest.utils import (
+    get_project_directory,
+    get_project_name_with_date_time,
+    get_vector_store_directory,
+    sanitise_project_name,
+)
+from scout.Pipelines.ingest_project_data import (
+    find_processed_file_with_same_content,
+    finish_chunked_files,
+    reuse_processed_file,
+    save_chunks,
+    save_files_to_db_and_temp,
+    save_person_map,
+    upload_project_archives,
+)
+from scout.Pipelines.update_project_files import get_project_directory_name
+from scout.Pipelines.utils import get_or_create_vector_store
+from scout.utils.storage.filesystem import S3StorageHandler
+from scout.utils.storage.postgres_interface import (
+    claim_ingestion_run_file,
+    project_lock,
+    release_ingestion_run_file,
+    renew_ingestion_run_file_lease,
+)
+from scout.utils.storage.postgres_storage_handler import PostgresStorageHandler
+from scout.utils.storage.storage_handler import BaseStorageHandler
+from scout.utils.utils import logger
+
+DEFAULT_LEASE_SECONDS = int(os.getenv("INGESTION_WORKER_LEASE_SECONDS", 300))
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("INGESTION_WORKER_MAX_ATTEMPTS", 3))
+DEFAULT_IDLE_SECONDS = 10
+
+
+def queue_project_files(
+    project_directory_name: str,
+    storage_handler: BaseStorageHandler = PostgresStorageHandler(),
+    s3_storage_handler: S3StorageHandler = S3StorageHandler(),
+    archive_s3_keys: Optional[List[str]] = None,
+) -> Project:
+    """
+    Creates a project and uploads its files, queueing them in the project's ingestion run for ingestion workers
+    (see `IngestionWorker`) to convert, chunk and embed. The files in zip archives in the project folder, or in the
+    S3 bucket under archive_s3_keys, are queued as well.
+    """
+    project = storage_handler.write_item(ProjectCreate(name=get_project_name_with_date_time(project_directory_name)))
+    checkpointer = IngestionCheckpointer(project, project_directory_name, storage_handler)
+    checkpointer.start()
+    project_folder_path = get_project_directory(project_directory_name)
+    prefix = sanitise_project_name(project.name) + "/raw/"
+    s3_file_keys = s3_storage_handler.upload_folder_contents(str(project_folder_path), recursive=False, prefix=prefix)
+    s3_file_keys += upload_project_archives(
+        project_folder_path,
+        s3_storage_handler=s3_storage_handler,
+        prefix=prefix,
+        archive_s3_keys=archive_s3_keys,
+        exclude=[s3_file_key.split("/")[-1] for s3_file_key in s3_file_keys],
+    )
+    for s3_file_key in s3_file_keys:
+        checkpointer.mark(s3_file_key.split("/")[-1], IngestionStage.UPLOADED, raw_s3_key=s3_file_key)
+    logger.info(f"Queued {len(s3_file_keys)} files of {project.name} for ingestion workers")
+    return project
+
+
+def wait_for_project_files(
+    project: Project,
+    storage_handler: BaseStorageHandler = PostgresStorageHandler(),
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    poll_interval: float = DEFAULT_IDLE_SECONDS,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Coordinates ingestion workers for a project: waits until each of its files is embedded or has used up its
+    attempts, then marks the project's ingestion run "complete", or "incomplete" if any files failed.
+
+    Returns:
+        Status of the ingestion run
+    """
+    project_directory_name = get_project_directory_name(project, storage_handler)
+    started_at = time.monotonic()
+    while True:
+        checkpointer = IngestionCheckpointer(project, project_directory_name, storage_handler)
+        now = datetime.now(timezone.utc)
+        # Files that a worker is on, or that will be claimed again
+        unfinished = [
+            run_file.name
+            for run_file in checkpointer.files.values()
+            if IngestionStage(run_file.stage) != IngestionStage.EMBEDDED
+            and (run_file.attempts < max_attempts or (run_file.lease_expires_at and run_file.lease_expires_at > now))
+        ]
+        if not unfinished:
+            break
+        if timeout is not None and time.monotonic() - started_at > timeout:
+            logger.warning(f"Gave up waiting for {len(unfinished)} files of {project.name}: {unfinished}")
+            break
+        logger.info(f"Waiting for ingestion workers to finish {len(unfinished)} files of {project.name}")
+        time.sleep(poll_interval)
+    return checkpointer.finish()
+
+
+class LeaseHeartbeat:
+    """Renews a worker's lease on a file in a background thread while the file is being processed"""
+
+    def __init__(self, run_file: IngestionRunFile, worker_id: str, lease_seconds: float):
+        self.run_file = run_file
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.lease_seconds / 3):
+            if not renew_ingestion_run_file_lease(self.run_file.id, self.worker_id, self.lease_seconds):
+                self.lost = True
+                logger.warning(f"Lost lease on {self.run_file.name}, another worker may pick it up")
+                return
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+
+class IngestionWorker:
+    """
+    Claims files queued for ingestion from the shared `ingestion_run_file` table and converts, chunks, anonymises,
+    adds file info to and embeds them. Run any number of workers, in separate processes or on separate hosts, against
+    the same database and S3 bucket.
+
+    Workers carry on from the last stage recorded for a file, so a file a worker died part way through is resumed
+    by the next worker to claim it. Entities to anonymise are found in parallel, but placeholders are given out under
+    a lock on the project, so people are numbered consistently across workers.
+
+    Args:
+        get_vector_store: returns the vector store for a project directory name. Workers on different hosts need a
+            vector store they all write to, e.g. a shared volume or a Chroma server.
+        run_id: only claim files from this ingestion run
+    """
+
+    def __init__(
+        self,
+        storage_handler: BaseStorageHandler = PostgresStorageHandler(),
+        s3_storage_handler: S3StorageHandler = S3StorageHandler(),
+        get_vector_store: Optional[Callable[[str], VectorStore]] = None,
+        chunking_strategy: str = "fast",
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        run_id: Optional[uuid.UUID] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.storage_handler = storage_handler
+        self.s3_storage_handler = s3_storage_handler
+        self.get_vector_store = get_vector_store or (
+            lambda project_directory_name: get_or_create_vector_store(
+                get_vector_store_directory(project_directory_name)
+            )
+        )
+        self.chunking_strategy = chunking_strategy
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.run_id = run_id
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._vector_stores = {}
+
+    def _vector_store(self, project_directory_name: str) -> VectorStore:
+        # Kept for the life of the worker, so its embedding client is reused
+        if project_directory_name not in self._vector_stores:
+            self._vector_stores[project_directory_name] = self.get_vector_store(project_directory_name)
+        return self._vector_stores[project_directory_name]
+
+    def run_once(self) -> bool:
+        """
+        Claims and processes one file.
+
+        Returns:
+            Whether there was a file to claim
+        """
+        run_file = claim_ingestion_run_file(
+            self.worker_id, lease_seconds=self.lease_seconds, max_attempts=self.max_attempts, run_id=self.run_id
+        )
+        if run_file is None:
+            return False
+        logger.info(f"Worker {self.worker_id} claimed {run_file.name} at stage {run_file.stage}")
+        try:
+            with LeaseHeartbeat(run_file, self.worker_id, self.lease_seconds):
+                self.process(run_file)
+        except Exception as e:
+            logger.exception(f"Worker {self.worker_id} failed to ingest {run_file.name}")
+            try:
+                self._checkpointer(run_file.run).mark_failed(run_file.name, e)
+            except Exception as _:
+                # The file is released below either way, and claimed again while it has attempts left
+                logger.exception(f"Worker {self.worker_id} failed to record the error for {run_file.name}")
+        finally:
+            release_ingestion_run_file(run_file.id, self.worker_id)
+        return True
+
+    def run(self, stop_event: Optional[threading.Event] = None, idle_seconds: float = DEFAULT_IDLE_SECONDS) -> None:
+        """Claims and processes files until stop_event is set, waiting idle_seconds whenever there are none"""
+        stop_event = stop_event or threading.Event()
+        warm_up_engines()
+        while not stop_event.is_set():
+            if not self.run_once():
+                stop_event.wait(idle_seconds)
+
+    def _checkpointer(self, run: IngestionRunBase) -> IngestionCheckpointer:
+        # Read for each file, as other workers update the run's files. A claimed file's run comes without its
+        # project, so the run is read with it
+        run = self.storage_handler.read_item(object_id=run.id, model=IngestionRun)
+        project = self.storage_handler.read_item(object_id=run.project.id, model=Project)
+        return IngestionCheckpointer(project, run.project_directory_name, self.storage_handler)
+
+    def process(self, run_file: IngestionRunFile) -> None:
+        """Takes a claimed file through the stages it hasn't finished yet"""
+        checkpointer = self._checkpointer(run_file.run)
+        project = checkpointer.project
+        vector_store = self._vector_store(run_file.run.project_directory_name)
+        stage = IngestionStage(run_file.stage)
+
+        if stage == IngestionStage.UPLOADED:
+            [processed_s3_key] = convert_to_pdf_from_s3(
+                [run_file.raw_s3_key], s3_storage_handler=self.s3_storage_handler
+            )
+            run_file = checkpointer.mark(run_file.name, IngestionStage.CONVERTED, processed_s3_key=processed_s3_key)
+            stage = IngestionStage.CONVERTED
+
+        if stage == IngestionStage.CONVERTED:
+            [(file, temp_filepath)] = save_files_to_db_and_temp(
+                s3_keys=[run_file.processed_s3_key],
+                project=project,
+                s3_storage_handler=self.s3_storage_handler,
+                storage_handler=self.storage_handler,
+            )
+            processed_file = find_processed_file_with_same_content(file, self.storage_handler)
+            if processed_file:
+                temp_filepath.unlink(missing_ok=True)
+                reuse_processed_file(
+                    file=file,
+                    processed_file=processed_file,
+                    storage_handler=self.storage_handler,
+                    project=project,
+                    vector_store=vector_store,
+                    checkpointer=checkpointer,
+                )
+                return
+            chunks = chunk_file(
+                file=file, temp_filepath=temp_filepath, anonymise=False, chunking_strategy=self.chunking_strategy
+            )
+            analyzer_results = analyze_texts([chunk.text for chunk in chunks])
+            with project_lock(project.id):
+                # Carries on from placeholders other workers have given out
+                project = self.storage_handler.read_item(object_id=project.id, model=Project)
+                anonymizer = Anonymizer(person_map=project.person_map)
+                anonymise_chunks(chunks, anonymizer=anonymizer, analyzer_results=analyzer_results)
+                save_person_map(project=project, anonymizer=anonymizer)
+            new_chunks = save_chunks(
+                file=file, chunks=chunks, storage_handler=self.storage_handler, checkpointer=checkpointer
+            )
+        else:
+            # Chunked by an earlier attempt, only file info and embedding are left
+            file = self.storage_handler.read_item(object_id=run_file.file.id, model=File)
+            chunks = self.storage_handler.get_item_by_attribute(ChunkFilter(file=file)) or []
+            new_chunks = sorted(chunks, key=lambda chunk: chunk.idx)
+
+        failed_files = finish_chunked_files(
+            [(file, new_chunks)],
+            storage_handler=self.storage_handler,
+            project=project,
+            vector_store=vector_store,
+            checkpointer=checkpointer,
+        )
+        if failed_files:
+            raise failed_files[file.name]
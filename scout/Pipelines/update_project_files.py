@@ -0,0 +1,275 @@
+import os
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from langchain_core.vectorstores import VectorStore
+
+from scout.DataIngest.anonymizer import Anonymizer
+from scout.DataIngest.boilerplate import ProjectBoilerplate
+from scout.DataIngest.checkpoints import IngestionCheckpointer
+from scout.DataIngest.models.schemas import (
+    File,
+    FileFilter,
+    IngestionRunFileFilter,
+    IngestionRunFilter,
+    IngestionStage,
+    Project,
+)
+from scout.DataIngest.partitioning import can_partition_without_converting
+from scout.DataIngest.s3_download import convert_to_pdf_from_s3, get_processed_file_key
+from scout.DataIngest.utils import sanitise_project_name
+from scout.Pipelines.ingest_project_data import (
+    chunk_embed_save_from_temp_filepath,
+    get_project_to_resume,
+    save_files_to_db_and_temp,
+    save_person_map,
+)
+from scout.utils.storage.filesystem import S3StorageHandler
+from scout.utils.storage.postgres_storage_handler import PostgresStorageHandler
+from scout.utils.storage.storage_handler import BaseStorageHandler
+from scout.utils.utils import logger
+
+
+def get_processed_file_name(file_name: str) -> str:
+    # Files are saved under the name of the PDF they are converted to
+    return os.path.splitext(os.path.basename(file_name))[0] + ".pdf"
+
+
+def find_project_file(project: Project, file_name: str, storage_handler: BaseStorageHandler) -> Optional[File]:
+    """Finds the file of a project ingested from a file with the given name, if there is one"""
+    processed_file_name = get_processed_file_name(file_name)
+    files = storage_handler.get_item_by_attribute(FileFilter(name=processed_file_name, project=project)) or []
+    for file in files:
+        if file.name == processed_file_name:
+            return file
+    return None
+
+
+def get_project_directory_name(project: Project, storage_handler: BaseStorageHandler) -> str:
+    """Name of the folder a project was ingested from, recorded with its ingestion run"""
+    runs = storage_handler.get_item_by_attribute(IngestionRunFilter(project=project)) or []
+    if not runs:
+        raise ValueError(f"Project {project.name} has no ingestion run, ingest it with ingest_project_files first")
+    return runs[0].project_directory_name
+
+
+def get_file_s3_keys(file: File, storage_handler: BaseStorageHandler) -> List[str]:
+    """Keys of a file's raw and processed objects in S3, as recorded with the file and its ingestion checkpoints"""
+    run_files = storage_handler.get_item_by_attribute(IngestionRunFileFilter(file=file)) or []
+    keys = [file.s3_key] + [key for run_file in run_files for key in (run_file.raw_s3_key, run_file.processed_s3_key)]
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+def delete_file_from_project(
+    file: File,
+    vector_store: VectorStore,
+    storage_handler: BaseStorageHandler,
+    s3_storage_handler: Optional[S3StorageHandler] = None,
+    s3_keys: Optional[List[str]] = None,
+) -> None:
+    """
+    Deletes a file from a project: its chunks' vectors, its chunks and their links to results, and the file itself.
+    Results generated from the file's chunks are kept, so regenerate LLM flags if they should no longer cite it.
+
+    If an S3 storage handler is given, the file's raw and processed objects are deleted from S3 too: those with
+    s3_keys if given, otherwise those found with `get_file_s3_keys`.
+    """
+    if s3_storage_handler is not None and s3_keys is None:
+        s3_keys = get_file_s3_keys(file, storage_handler)
+    chunk_ids = [str(chunk.id) for chunk in file.chunks or []]
+    if chunk_ids:
+        vector_store.delete(ids=chunk_ids)
+    storage_handler.delete_item(file)
+    logger.info(f"Deleted file {file.name} and {len(chunk_ids)} chunks")
+    for s3_key in s3_keys or []:
+        try:
+            s3_storage_handler.delete_key(s3_key)
+        except Exception as _:
+            # The file is already gone from the project, so a leftover object is only logged
+            logger.exception(f"Failed to delete {s3_key} of deleted file {file.name} from S3")
+
+
+def remove_project_file(
+    project_name: str,
+    file_name: str,
+    vector_store: VectorStore,
+    storage_handler: BaseStorageHandler = PostgresStorageHandler(),
+    s3_storage_handler: S3StorageHandler = S3StorageHandler(),
+) -> bool:
+    """
+    Removes a file from an existing project.
+
+    Returns:
+        Whether the project had the file
+    """
+    project = get_project_to_resume(project_name, storage_handler)
+    file = find_project_file(project, file_name, storage_handler)
+    if file is None:
+        logger.warning(f"Project {project.name} has no file {file_name} to remove")
+        return False
+    delete_file_from_project(
+        file, vector_store=vector_store, storage_handler=storage_handler, s3_storage_handler=s3_storage_handler
+    )
+    return True
+
+
+def find_files_to_replace(
+    project: Project, file_names: List[str], storage_handler: BaseStorageHandler, replace: bool = False
+) -> List[File]:
+    """
+    Files a project already has with the given names, to be replaced by new versions. Raises a ValueError instead
+    if the project has any of the files and replace is False.
+    """
+    existing_files = [find_project_file(project, file_name, storage_handler) for file_name in file_names]
+    existing_files = [file for file in existing_files if file is not None]
+    if existing_files and not replace:
+        raise ValueError(
+            f"Project {project.name} already has files {[file.name for file in existing_files]}, "
+            "pass replace=True to replace"
+        )
+    return existing_files
+
+
+def add_project_files(
+    project_name: str,
+    file_paths: List[Path],
+    vector_store: VectorStore,
+    storage_handler: BaseStorageHandler = PostgresStorageHandler(),
+    s3_storage_handler: S3StorageHandler = S3StorageHandler(),
+    chunking_partition_strategy: str = "fast",
+    replace: bool = False,
+    partition_office_natively: bool = False,
+) -> List[File]:
+    """
+    Adds files to an existing project, ingesting only those files rather than creating a new project and
+    ingesting the whole folder again. People are given the same placeholders as in the rest of the project.
+
+    Args:
+        project_name: name of the project to add the files to
+        file_paths: local paths of the files to add
+        vector_store: the project's vector store
+        replace: replace files the project already has with the same name, otherwise files the project already
+            has raise a ValueError. An old file (with its chunks, vectors and S3 objects) is only deleted once its
+            replacement has been ingested, so it is kept if ingesting the replacement fails.
+        partition_office_natively: chunk docx and pptx files without waiting for them to be converted to PDF
+
+    Returns:
+        The added files
+    """
+    project = get_project_to_resume(project_name, storage_handler)
+    file_paths = [Path(file_path) for file_path in file_paths]
+    files_to_replace = find_files_to_replace(
+        project, [file_path.name for file_path in file_paths], storage_handler=storage_handler, replace=replace
+    )
+    raw_s3_keys = []
+    for file_path in file_paths:
+        raw_s3_key = get_raw_s3_key(project, file_path.name, replacing=files_to_replace)
+        s3_storage_handler.write_item(str(file_path), raw_s3_key)
+        raw_s3_keys.append(raw_s3_key)
+    return ingest_uploaded_project_files(
+        project,
+        raw_s3_keys,
+        vector_store=vector_store,
+        storage_handler=storage_handler,
+        s3_storage_handler=s3_storage_handler,
+        chunking_partition_strategy=chunking_partition_strategy,
+        partition_office_natively=partition_office_natively,
+        files_to_replace=files_to_replace,
+    )
+
+
+def get_raw_s3_key(project: Project, file_name: str, replacing: Optional[List[File]] = None) -> str:
+    """
+    Key to upload a file of a project to. A new version of a file in replacing is uploaded to a folder of its own,
+    so the old version's objects are left as they are until the new version has been ingested.
+    """
+    if any(file.name == get_processed_file_name(file_name) for file in replacing or []):
+        return f"{sanitise_project_name(project.name)}/replacements/{uuid.uuid4().hex}/raw/{file_name}"
+    return sanitise_project_name(project.name) + "/raw/" + file_name
+
+
+def ingest_uploaded_project_files(
+    project: Project,
+    raw_s3_keys: List[str],
+    vector_store: VectorStore,
+    storage_handler: BaseStorageHandler = PostgresStorageHandler(),
+    s3_storage_handler: S3StorageHandler = S3StorageHandler(),
+    chunking_partition_strategy: str = "fast",
+    partition_office_natively: bool = False,
+    files_to_replace: Optional[List[File]] = None,
+) -> List[File]:
+    """
+    Ingests files already uploaded to a project's raw folder in S3 (see `get_raw_s3_key`) into the project.
+
+    Args:
+        files_to_replace: files the project already has (see `find_files_to_replace`). Each is deleted, with its S3
+            objects, once a file with the same name has been ingested and embedded in its place.
+
+    Returns:
+        The added files
+    """
+    # Read before the new versions' checkpoints take over the old files' ingestion run files
+    replaced_files = {file.name: (file, get_file_s3_keys(file, storage_handler)) for file in files_to_replace or []}
+    # Progress is recorded in the project's ingestion run, alongside the files it was first ingested with
+    checkpointer = IngestionCheckpointer(
+        project, get_project_directory_name(project, storage_handler), storage_handler=storage_handler
+    )
+    checkpointer.start()
+    anonymizer = Anonymizer(person_map=project.person_map)
+    project_boilerplate = ProjectBoilerplate()
+    for raw_s3_key in raw_s3_keys:
+        checkpointer.mark(raw_s3_key.split("/")[-1], IngestionStage.UPLOADED, raw_s3_key=raw_s3_key)
+    native_keys = [key for key in raw_s3_keys if partition_office_natively and can_partition_without_converting(key)]
+    keys_to_convert = [key for key in raw_s3_keys if key not in native_keys]
+    converted_keys = dict(
+        zip(keys_to_convert, convert_to_pdf_from_s3(keys_to_convert, s3_storage_handler=s3_storage_handler))
+    )
+    download_keys = []
+    for raw_s3_key in raw_s3_keys:
+        processed_s3_key = converted_keys.get(raw_s3_key) or get_processed_file_key(raw_s3_key)
+        checkpointer.mark(raw_s3_key.split("/")[-1], IngestionStage.CONVERTED, processed_s3_key=processed_s3_key)
+        download_keys.append(raw_s3_key if raw_s3_key in native_keys else processed_s3_key)
+
+    files_to_chunk = save_files_to_db_and_temp(
+        s3_keys=download_keys,
+        project=project,
+        s3_storage_handler=s3_storage_handler,
+        storage_handler=storage_handler,
+    )
+    added_files = []
+    try:
+        for file, temp_filepath in files_to_chunk:
+            chunk_embed_save_from_temp_filepath(
+                file=file,
+                temp_filepath=temp_filepath,
+                storage_handler=storage_handler,
+                project=project,
+                vector_store=vector_store,
+                chunking_strategy=chunking_partition_strategy,
+                checkpointer=checkpointer,
+                anonymizer=anonymizer,
+                project_boilerplate=project_boilerplate,
+            )
+            added_files.append(file)
+            logger.info(f"Added file {file.name} to project {project.name}")
+            if file.name in replaced_files and checkpointer.is_done(file.name, IngestionStage.EMBEDDED):
+                replaced_file, s3_keys = replaced_files.pop(file.name)
+                delete_file_from_project(
+                    replaced_file,
+                    vector_store=vector_store,
+                    storage_handler=storage_handler,
+                    s3_storage_handler=s3_storage_handler,
+                    s3_keys=s3_keys,
+                )
+    except Exception as e:
+        checkpointer.mark_failed(file.name, e)
+        raise
+    finally:
+        save_person_map(project=project, anonymizer=anonymizer)
+        checkpointer.finish()
+
+    if native_keys:
+        # Office files chunked without converting still need converting to PDF for viewing
+        convert_to_pdf_from_s3(native_keys)
+    return added_files
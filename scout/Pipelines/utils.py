@@ -1,17 +1,73 @@
 import os
 from pathlib import Path
+from typing import Optional
 
+import httpx
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
 from langchain_openai import AzureOpenAIEmbeddings
 
+from scout.DataIngest.embedding import RateLimitedEmbeddings, get_embedding_rate_limiter
 
-def get_or_create_vector_store(vector_store_directory: Path):
-    embedding_function = AzureOpenAIEmbeddings(
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-        api_key=os.getenv("AZURE_OPENAI_KEY"),
-        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-        azure_deployment="text-embedding-3-large",
+EMBEDDING_MODEL = "text-embedding-3-large"
+
+
+def get_cached_embedding_function(embedding_function: Embeddings, cache_directory: Path, model: str) -> Embeddings:
+    """
+    Wraps an embedding function with a cache on local disk, keyed by the model and a hash of each text, so
+    text that has been embedded before (in an earlier run or another project) isn't sent to the model again.
+    """
+    return CacheBackedEmbeddings.from_bytes_store(
+        embedding_function,
+        LocalFileStore(str(cache_directory)),
+        namespace=model,
+    )
+
+
+def get_embedding_function(embedding_cache_directory: Optional[Path] = None) -> Embeddings:
+    """
+    Embedding model used for chunks and queries.
+
+    Args:
+        embedding_cache_directory: where to cache embeddings, or None to always call the embedding model
+    """
+    embedding_function = RateLimitedEmbeddings(
+        AzureOpenAIEmbeddings(
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            api_key=os.getenv("AZURE_OPENAI_KEY"),
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+            azure_deployment=EMBEDDING_MODEL,
+            # Lets embedding batches follow the rate limit headers of responses
+            http_client=httpx.Client(event_hooks={"response": [get_embedding_rate_limiter().observe_response]}),
+        )
     )
+    # Cached texts are read before batching, so only texts sent to the model take tokens from the rate limiter
+    if embedding_cache_directory:
+        embedding_function = get_cached_embedding_function(
+            embedding_function, cache_directory=embedding_cache_directory, model=EMBEDDING_MODEL
+        )
+    return embedding_function
+
+
+def get_or_create_vector_store(
+    vector_store_directory: Path,
+    embedding_cache_directory: Optional[Path] = None,
+    use_embedding_cache: bool = True,
+):
+    """
+    Args:
+        vector_store_directory: where the Chroma vector store is persisted
+        embedding_cache_directory: where embeddings are cached, defaults to the EMBEDDING_CACHE_DIRECTORY
+            environment variable, or an "embedding_cache" folder next to the vector store
+        use_embedding_cache: set to False to always call the embedding model
+    """
+    if use_embedding_cache:
+        embedding_cache_directory = embedding_cache_directory or Path(
+            os.getenv("EMBEDDING_CACHE_DIRECTORY", Path(vector_store_directory).parent / "embedding_cache")
+        )
+    embedding_function = get_embedding_function(embedding_cache_directory if use_embedding_cache else None)
 
     vector_store = Chroma(
         embedding_function=embedding_function,
@@ -0,0 +1,200 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from langchain_core.vectorstores import VectorStore
+
+from scout.DataIngest.anonymizer import warm_up_engines
+from scout.DataIngest.models.schemas import Project
+from scout.DataIngest.utils import is_ingestible_file
+from scout.Pipelines.ingest_project_data import get_project_to_resume
+from scout.Pipelines.update_project_files import (
+    find_files_to_replace,
+    find_project_file,
+    get_raw_s3_key,
+    ingest_uploaded_project_files,
+    remove_project_file,
+)
+from scout.utils.storage.filesystem import S3StorageHandler
+from scout.utils.storage.postgres_storage_handler import PostgresStorageHandler
+from scout.utils.storage.storage_handler import BaseStorageHandler
+from scout.utils.utils import logger
+
+DEFAULT_POLL_INTERVAL_SECONDS = 30
+DEFAULT_MAX_BATCH_SIZE = 20
+
+
+class LocalFolderSource:
+    """Files in a local folder, such as a project folder in .data. Files are versioned by modified time and size."""
+
+    def __init__(self, folder_path: Path):
+        self.folder_path = Path(folder_path)
+
+    def list_files(self) -> Dict[str, str]:
+        """Version of each file in the folder, by file name"""
+        versions = {}
+        for entry in os.scandir(self.folder_path):
+            if entry.is_file() and is_ingestible_file(entry.name):
+                stat = entry.stat()
+                versions[entry.name] = f"{stat.st_mtime_ns}-{stat.st_size}"
+        return versions
+
+    def upload(self, file_name: str, raw_s3_key: str, s3_storage_handler: S3StorageHandler) -> None:
+        s3_storage_handler.write_item(str(self.folder_path / file_name), raw_s3_key)
+
+
+class S3PrefixSource:
+    """Files under a prefix in the S3 bucket, e.g. where reviewers upload documents. Files are versioned by ETag."""
+
+    def __init__(self, s3_storage_handler: S3StorageHandler, prefix: str):
+        self.s3_storage_handler = s3_storage_handler
+        self.prefix = prefix if prefix.endswith("/") else prefix + "/"
+
+    def list_files(self) -> Dict[str, str]:
+        """Version of each file directly under the prefix, by file name"""
+        versions = {}
+        paginator = self.s3_storage_handler.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.s3_storage_handler.bucket_name, Prefix=self.prefix, Delimiter="/"):
+            for item in page.get("Contents", []):
+                file_name = item["Key"][len(self.prefix) :]
+                if is_ingestible_file(file_name):
+                    versions[file_name] = item["ETag"]
+        return versions
+
+    def upload(self, file_name: str, raw_s3_key: str, s3_storage_handler: S3StorageHandler) -> None:
+        # Copied within S3, without downloading the file
+        s3_storage_handler.copy_item(self.prefix + file_name, raw_s3_key)
+
+
+class ProjectFileWatcher:
+    """
+    Watches a folder or S3 prefix for new and changed files, and ingests them into an existing project in batches.
+
+    A file is ingested once it has stayed the same between two polls, so files still being copied in are left until
+    they are complete. Changed files replace the project's earlier version. Files the project already has when the
+    watcher starts are assumed to be up to date.
+
+    The watcher runs in one long-lived process, so the vector store's embedding client, the LLM and anonymisation
+    clients and unstructured's models are loaded once and reused for every batch.
+
+    Args:
+        project_name: name of the project to add files to, which must already have been ingested
+        source: `LocalFolderSource` or `S3PrefixSource` to watch
+        vector_store: the project's vector store
+        max_batch_size: maximum number of files ingested together
+        remove_deleted: remove files from the project when they are deleted from the source
+        ingest_kwargs: passed on to `ingest_uploaded_project_files`, e.g. chunking_partition_strategy
+    """
+
+    def __init__(
+        self,
+        project_name: str,
+        source: LocalFolderSource | S3PrefixSource,
+        vector_store: VectorStore,
+        storage_handler: BaseStorageHandler = PostgresStorageHandler(),
+        s3_storage_handler: S3StorageHandler = S3StorageHandler(),
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        remove_deleted: bool = False,
+        **ingest_kwargs,
+    ):
+        self.project_name = project_name
+        self.source = source
+        self.vector_store = vector_store
+        self.storage_handler = storage_handler
+        self.s3_storage_handler = s3_storage_handler
+        self.max_batch_size = max_batch_size
+        self.remove_deleted = remove_deleted
+        self.ingest_kwargs = ingest_kwargs
+        # Version of each file that has been ingested, and of each file seen on the last poll
+        self.ingested: Dict[str, str] = {}
+        self.last_seen: Dict[str, str] = {}
+
+    def _project(self) -> Project:
+        # Read each batch, so the project's saved person map is up to date
+        return get_project_to_resume(self.project_name, self.storage_handler)
+
+    def start(self) -> None:
+        """Records the versions of files the project already has, and loads models before the first batch"""
+        project = self._project()
+        self.last_seen = self.source.list_files()
+        self.ingested = {
+            file_name: version
+            for file_name, version in self.last_seen.items()
+            if find_project_file(project, file_name, self.storage_handler) is not None
+        }
+        logger.info(
+            f"Watching for files for {project.name}: {len(self.ingested)} of {len(self.last_seen)} already ingested"
+        )
+        warm_up_engines()
+
+    def files_to_ingest(self, versions: Dict[str, str]) -> List[str]:
+        """New or changed files that haven't changed since the last poll"""
+        return [
+            file_name
+            for file_name, version in sorted(versions.items())
+            if self.ingested.get(file_name) != version and self.last_seen.get(file_name) == version
+        ]
+
+    def poll(self) -> List[str]:
+        """
+        Ingests a batch of new and changed files, if there are any ready.
+
+        Returns:
+            Names of files ingested
+        """
+        versions = self.source.list_files()
+        file_names = self.files_to_ingest(versions)[: self.max_batch_size]
+        deleted_file_names = [file_name for file_name in self.ingested if file_name not in versions]
+        self.last_seen = versions
+
+        if self.remove_deleted:
+            for file_name in deleted_file_names:
+                remove_project_file(
+                    self.project_name,
+                    file_name,
+                    vector_store=self.vector_store,
+                    storage_handler=self.storage_handler,
+                    s3_storage_handler=self.s3_storage_handler,
+                )
+                del self.ingested[file_name]
+        if not file_names:
+            return []
+
+        logger.info(f"Ingesting {len(file_names)} new or changed files: {file_names}")
+        project = self._project()
+        files_to_replace = find_files_to_replace(
+            project, file_names, storage_handler=self.storage_handler, replace=True
+        )
+        raw_s3_keys = []
+        for file_name in file_names:
+            raw_s3_key = get_raw_s3_key(project, file_name, replacing=files_to_replace)
+            self.source.upload(file_name, raw_s3_key, self.s3_storage_handler)
+            raw_s3_keys.append(raw_s3_key)
+        ingest_uploaded_project_files(
+            project,
+            raw_s3_keys,
+            vector_store=self.vector_store,
+            storage_handler=self.storage_handler,
+            s3_storage_handler=self.s3_storage_handler,
+            files_to_replace=files_to_replace,
+            **self.ingest_kwargs,
+        )
+        for file_name in file_names:
+            self.ingested[file_name] = versions[file_name]
+        return file_names
+
+    def run(
+        self, poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS, stop_event: Optional[threading.Event] = None
+    ) -> None:
+        """Polls until stop_event is set. A batch that fails is logged and retried on the next poll."""
+        stop_event = stop_event or threading.Event()
+        self.start()
+        while not stop_event.is_set():
+            try:
+                if self.poll():
+                    # Carry on with the next batch straight away if there is a backlog
+                    continue
+            except Exception:
+                logger.exception("Failed to ingest batch of watched files, retrying on the next poll")
+            stop_event.wait(poll_interval)
@@ -0,0 +1,78 @@
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+from scout.utils.storage.filesystem import S3StorageHandler
+from scout.utils.utils import logger
+
+
+class CacheStore(ABC):
+    """
+    Stores cache entries by key, on local disk or in S3. Caches are only an optimisation, so `get` and `put` log
+    errors rather than raising them, and ingestion carries on without the cache.
+    """
+
+    @abstractmethod
+    def read(self, key: str) -> Optional[bytes]:
+        """Read the entry with the key, or None if there isn't one"""
+
+    @abstractmethod
+    def write(self, key: str, body: bytes) -> None:
+        """Write an entry, replacing any entry with the same key"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.read(key)
+        except Exception as _:
+            logger.exception(f"Failed to read cache entry: {key}")
+            return None
+
+    def put(self, key: str, body: bytes) -> None:
+        try:
+            self.write(key, body)
+        except Exception as _:
+            logger.exception(f"Failed to write cache entry: {key}")
+
+
+class LocalCacheStore(CacheStore):
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def read(self, key: str) -> Optional[bytes]:
+        path = self.directory / key
+        return path.read_bytes() if path.exists() else None
+
+    def write(self, key: str, body: bytes) -> None:
+        path = self.directory / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written to a temporary file first, so other processes never read a partly written entry
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temp_path.write_bytes(body)
+        temp_path.replace(path)
+
+
+class S3CacheStore(CacheStore):
+    def __init__(self, s3_storage_handler: S3StorageHandler, prefix: str):
+        self.s3_storage_handler = s3_storage_handler
+        self.prefix = prefix
+
+    def read(self, key: str) -> Optional[bytes]:
+        return self.s3_storage_handler.read_bytes(self.prefix + key)
+
+    def write(self, key: str, body: bytes) -> None:
+        self.s3_storage_handler.write_bytes(self.prefix + key, body)
+
+
+def get_cache_store(env_prefix: str, default_directory: Path, s3_prefix: str) -> Optional[CacheStore]:
+    """
+    Cache store set by the <env_prefix> environment variable: "local" (in <env_prefix>_DIRECTORY, by default
+    default_directory) or "s3" (under s3_prefix in the bucket used for project files). None if unset, so that
+    nothing is cached.
+    """
+    cache_type = os.getenv(env_prefix, "").lower()
+    if cache_type == "local":
+        return LocalCacheStore(Path(os.getenv(f"{env_prefix}_DIRECTORY", default_directory)))
+    if cache_type == "s3":
+        return S3CacheStore(S3StorageHandler(), prefix=s3_prefix)
+    return None
@@ -1,7 +1,8 @@
 import base64
 import logging
 import os
-from typing import List
+import tempfile
+from typing import Iterator, List, Optional
 
 import boto3
 from botocore.config import Config
@@ -20,6 +21,12 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Connections kept open to S3 by the client, shared by threads downloading at the same time
+DEFAULT_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", 32))
+DEFAULT_READ_CHUNK_SIZE = 1024 * 1024
+# Objects read with `read_spooled` are kept in memory up to this size, and spill over to disk beyond it
+DEFAULT_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
 class S3StorageHandler(BaseStorageHandler):
     def __init__(
         self,
@@ -44,7 +51,9 @@ class S3StorageHandler(BaseStorageHandler):
                 region_name=self.region_name,
                 aws_access_key_id=os.getenv("MINIO_ACCESS_KEY"),
                 aws_secret_access_key=os.getenv("MINIO_SECRET_KEY"),
-                config=boto3.session.Config(signature_version="s3v4"),
+                config=boto3.session.Config(
+                    signature_version="s3v4", max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS
+                ),
             )
             # Create the bucket if it doesn't exist
             try:
@@ -57,7 +66,9 @@ class S3StorageHandler(BaseStorageHandler):
         else:
             # Use no authentication for production mode
             logger.info("Connecting to S3...")
-            self.s3_client = boto3.client("s3", config=Config(region_name=self.region_name))
+            self.s3_client = boto3.client(
+                "s3", config=Config(region_name=self.region_name, max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS)
+            )
 
     def _add_prefix(self, key: str) -> str:
         """Add the app-data/ prefix to the given key."""
@@ -88,6 +99,58 @@ class S3StorageHandler(BaseStorageHandler):
         except Exception as e:
             print(f"Error writing item: {e}")
 
+    def copy_item(self, source_key: str, destination_key: str):
+        """Copy an object to another key within the bucket, without downloading it"""
+        self.s3_client.copy_object(
+            Bucket=self.bucket_name,
+            CopySource={"Bucket": self.bucket_name, "Key": source_key},
+            Key=destination_key,
+        )
+
+    def delete_key(self, key: str):
+        """Delete the object with the given key from the data store, if there is one"""
+        self.s3_client.delete_object(Bucket=self.bucket_name, Key=key)
+
+    def write_fileobj(self, fileobj, key: str):
+        """Write a file-like object to the data store, streamed in parts rather than read into memory"""
+        self.s3_client.upload_fileobj(Fileobj=fileobj, Bucket=self.bucket_name, Key=key)
+
+    def write_bytes(self, key: str, body: bytes):
+        """Write bytes to an object in the data store"""
+        self.s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=body)
+
+    def read_bytes(self, key: str) -> Optional[bytes]:
+        """Read the bytes of an object in the data store, or None if there is no object with the key"""
+        try:
+            return self.s3_client.get_object(Bucket=self.bucket_name, Key=key)["Body"].read()
+        except self.s3_client.exceptions.NoSuchKey:
+            return None
+
+    def iter_chunks(self, key: str, chunk_size: int = DEFAULT_READ_CHUNK_SIZE) -> Iterator[bytes]:
+        """Streams the content of an object in chunks, over the client's pooled connections"""
+        body = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size=chunk_size)
+        finally:
+            body.close()
+
+    def read_spooled(
+        self, key: str, max_in_memory_bytes: int = DEFAULT_SPOOL_MAX_BYTES
+    ) -> tempfile.SpooledTemporaryFile:
+        """
+        Reads an object into a file-like buffer, rewound to the start. Small objects stay in memory, larger ones
+        are spilled to an anonymous temporary file. Close the buffer when done with it.
+        """
+        buffer = tempfile.SpooledTemporaryFile(max_size=max_in_memory_bytes)
+        try:
+            for chunk in self.iter_chunks(key):
+                buffer.write(chunk)
+        except Exception:
+            buffer.close()
+            raise
+        buffer.seek(0)
+        return buffer
+
     def write_items(self, file_paths: List[str], project_name: str):
         """Write a list of files from given paths to the data store"""
         for file_path in file_paths:
@@ -215,16 +278,21 @@ class S3StorageHandler(BaseStorageHandler):
         recursive: bool = False,
         prefix: str = "test-data/raw/",
         allowed_extensions: List[str] = ["pdf", "docx", "doc", "txt", "pptx", "ppt"],
+        exclude: Optional[List[str]] = None,
     ) -> List[str]:
         # This assumes no duplicate file names in the folder
         output_keys = []
         for file_path in os.listdir(folder_path):
+            if exclude and file_path in exclude:
+                continue
             if file_path.split(".")[-1] in allowed_extensions:
                 self.write_item(folder_path + "/" + file_path, key=prefix + file_path)
                 output_keys.append(prefix + file_path)
         if recursive:
             for subfolder in os.listdir(folder_path):
                 output_keys.extend(
-                    self.upload_folder_contents(os.path.join(folder_path, subfolder), recursive=True, prefix=prefix)
+                    self.upload_folder_contents(
+                        os.path.join(folder_path, subfolder), recursive=True, prefix=prefix, exclude=exclude
+                    )
                 )
         return output_keys
@@ -1,8 +1,11 @@
 import logging
+import uuid
+from datetime import timedelta
+from typing import Dict
 from uuid import UUID
 
 from decorator import contextmanager
-from sqlalchemy import or_
+from sqlalchemy import delete, func, insert, or_, select, text, update
 from sqlalchemy.orm import Session
 
 from scout.DataIngest.models.schemas import Chunk as PyChunk
@@ -17,6 +20,15 @@ from scout.DataIngest.models.schemas import File as PyFile
 from scout.DataIngest.models.schemas import FileCreate
 from scout.DataIngest.models.schemas import FileFilter
 from scout.DataIngest.models.schemas import FileUpdate
+from scout.DataIngest.models.schemas import IngestionRun as PyIngestionRun
+from scout.DataIngest.models.schemas import IngestionRunCreate
+from scout.DataIngest.models.schemas import IngestionRunFile as PyIngestionRunFile
+from scout.DataIngest.models.schemas import IngestionRunFileCreate
+from scout.DataIngest.models.schemas import IngestionRunFileFilter
+from scout.DataIngest.models.schemas import IngestionRunFileUpdate
+from scout.DataIngest.models.schemas import IngestionRunFilter
+from scout.DataIngest.models.schemas import IngestionRunUpdate
+from scout.DataIngest.models.schemas import IngestionStage
 from scout.DataIngest.models.schemas import Project as PyProject
 from scout.DataIngest.models.schemas import ProjectCreate
 from scout.DataIngest.models.schemas import ProjectFilter
@@ -39,6 +51,8 @@ from scout.utils.storage.postgres_models import Chunk as SqChunk
 from scout.utils.storage.postgres_models import Criterion as SqCriterion
 from scout.utils.storage.postgres_models import CriterionGate
 from scout.utils.storage.postgres_models import File as SqFile
+from scout.utils.storage.postgres_models import IngestionRun as SqIngestionRun
+from scout.utils.storage.postgres_models import IngestionRunFile as SqIngestionRunFile
 from scout.utils.storage.postgres_models import Project as SqProject
 from scout.utils.storage.postgres_models import project_criterions
 from scout.utils.storage.postgres_models import project_users
@@ -74,6 +88,12 @@ pydantic_model_to_sqlalchemy_model_map = {
     PyRating: SqRating,
     RatingCreate: SqRating,
     RatingUpdate: SqRating,
+    PyIngestionRun: SqIngestionRun,
+    IngestionRunCreate: SqIngestionRun,
+    IngestionRunUpdate: SqIngestionRun,
+    PyIngestionRunFile: SqIngestionRunFile,
+    IngestionRunFileCreate: SqIngestionRunFile,
+    IngestionRunFileUpdate: SqIngestionRunFile,
 }
 
 pydantic_update_model_to_base_model = {
@@ -84,6 +104,8 @@ pydantic_update_model_to_base_model = {
     ResultUpdate: PyResult,
     UserUpdate: PyUser,
     RatingUpdate: PyRating,
+    IngestionRunUpdate: PyIngestionRun,
+    IngestionRunFileUpdate: PyIngestionRunFile,
 }
 
 pydantic_update_model_to_sqlalchemy_model = {
@@ -94,6 +116,8 @@ pydantic_update_model_to_sqlalchemy_model = {
     ResultUpdate: SqResult,
     UserUpdate: SqUser,
     RatingUpdate: SqRating,
+    IngestionRunUpdate: SqIngestionRun,
+    IngestionRunFileUpdate: SqIngestionRunFile,
 }
 
 pydantic_create_model_to_base_model = {
@@ -104,6 +128,8 @@ pydantic_create_model_to_base_model = {
     ResultCreate: PyResult,
     UserCreate: PyUser,
     RatingCreate: PyRating,
+    IngestionRunCreate: PyIngestionRun,
+    IngestionRunFileCreate: PyIngestionRunFile,
 }
 
 logging.basicConfig(level=logging.INFO)
@@ -180,10 +206,29 @@ def get_or_create_item(
                 return _get_or_create_file(model, db)
             if model_type is RatingCreate:
                 return _get_or_create_rating(model, db)
+            if model_type is IngestionRunCreate:
+                return _get_or_create_ingestion_run(model, db)
+            if model_type is IngestionRunFileCreate:
+                return _get_or_create_ingestion_run_file(model, db)
         except Exception as _:
             logger.exception(f"Failed to get or create item, {model}")
 
 
+def get_or_create_items(
+    models: list[CriterionCreate | ChunkCreate | FileCreate | ProjectCreate | ResultCreate | UserCreate | RatingCreate],
+) -> list[PyProject | PyResult | PyUser | PyChunk | PyFile | PyCriterion | PyRating]:
+    """Gets or creates several items, returned in the same order. Chunks are written in bulk, in one transaction."""
+    if models and all(type(model) is ChunkCreate for model in models):
+        with SessionManager() as db:
+            try:
+                return _get_or_create_chunks(models, db)
+            except Exception as _:
+                db.rollback()
+                logger.exception(f"Failed to get or create {len(models)} chunks")
+                raise
+    return [get_or_create_item(model) for model in models]
+
+
 def _get_or_create_rating(model: RatingCreate, db: Session) -> PyRating:
     sq_model = SqRating
     existing_item = (
@@ -211,6 +256,43 @@ def _get_or_create_rating(model: RatingCreate, db: Session) -> PyRating:
     return PyRating.model_validate(item_to_add)
 
 
+def _get_or_create_ingestion_run(model: IngestionRunCreate, db: Session) -> PyIngestionRun:
+    # One run per project, resuming a project carries on with its existing run
+    sq_model = SqIngestionRun
+    existing_item = db.query(sq_model).filter_by(project_id=model.project.id).first()
+    if existing_item:
+        return PyIngestionRun.model_validate(existing_item)
+    item_to_add = sq_model(
+        project_directory_name=model.project_directory_name,
+        status=model.status,
+        project_id=model.project.id,
+    )
+    db.add(item_to_add)
+    db.commit()
+    db.flush()  # Refresh created item to add ID to it
+    return PyIngestionRun.model_validate(item_to_add)
+
+
+def _get_or_create_ingestion_run_file(model: IngestionRunFileCreate, db: Session) -> PyIngestionRunFile:
+    sq_model = SqIngestionRunFile
+    existing_item = db.query(sq_model).filter_by(run_id=model.run.id, name=model.name).first()
+    if existing_item:
+        return PyIngestionRunFile.model_validate(existing_item)
+    item_to_add = sq_model(
+        name=model.name,
+        raw_s3_key=model.raw_s3_key,
+        processed_s3_key=model.processed_s3_key,
+        stage=IngestionStage(model.stage).value,
+        error=model.error,
+        run_id=model.run.id,
+        file_id=model.file.id if model.file else None,
+    )
+    db.add(item_to_add)
+    db.commit()
+    db.flush()  # Refresh created item to add ID to it
+    return PyIngestionRunFile.model_validate(item_to_add)
+
+
 def _get_or_create_project(
     model: ProjectCreate,
     db: Session,
@@ -222,6 +304,7 @@ def _get_or_create_project(
     item_to_add = sq_model(
         name=model.name,
         results_summary=model.results_summary,
+        person_map=model.person_map,
     )
     db.add(item_to_add)
     db.commit()
@@ -314,7 +397,13 @@ def _get_or_create_chunk(
     db: Session,
 ) -> PyChunk:
     sq_model = SqChunk
-    existing_item = db.query(sq_model).filter_by(idx=model.idx, text=model.text, page_num=model.page_num).first()
+    existing_item = (
+        db.query(sq_model)
+        .filter_by(
+            idx=model.idx, text=model.text, page_num=model.page_num, file_id=model.file.id if model.file else None
+        )
+        .first()
+    )
     if existing_item:
         return PyChunk.model_validate(existing_item)
     assert model.file.id is not None, f"File id from {model.model_dump()} is None"
@@ -324,6 +413,8 @@ def _get_or_create_chunk(
         idx=model.idx,
         text=model.text,
         page_num=model.page_num,
+        partition_strategy=model.partition_strategy,
+        token_count=model.token_count,
         file_id=model.file.id,
     )
     db.add(item_to_add)
@@ -339,12 +430,105 @@ def _get_or_create_chunk(
     return PyChunk.model_validate(item_to_add)
 
 
+def _get_or_create_chunks(
+    models: list[ChunkCreate],
+    db: Session,
+) -> list[PyChunk]:
+    """
+    Bulk version of _get_or_create_chunk: finds existing chunks with one query, then adds the rest with one
+    multi-row INSERT ... RETURNING, all in one transaction.
+    """
+    sq_model = SqChunk
+    for model in models:
+        assert model.file and model.file.id is not None, f"File id from {model.model_dump()} is None"
+
+    def chunk_key(idx: int, text: str, page_num: int, file_id) -> tuple:
+        return idx, text, page_num, str(file_id)
+
+    keys = [chunk_key(model.idx, model.text, model.page_num, model.file.id) for model in models]
+    existing_items = (
+        db.query(sq_model)
+        .filter(
+            sq_model.file_id.in_({model.file.id for model in models}),
+            sq_model.idx.in_({model.idx for model in models}),
+        )
+        .all()
+    )
+    items_by_key = {chunk_key(item.idx, item.text, item.page_num, item.file_id): item for item in existing_items}
+
+    # Chunks repeated within the batch are only inserted once
+    models_to_add = {}
+    for key, model in zip(keys, models):
+        if key not in items_by_key and key not in models_to_add:
+            models_to_add[key] = model
+    rows_to_add = {
+        key: dict(
+            id=uuid.uuid4(),
+            idx=model.idx,
+            text=model.text,
+            page_num=model.page_num,
+            partition_strategy=model.partition_strategy,
+            token_count=model.token_count,
+            file_id=model.file.id,
+        )
+        for key, model in models_to_add.items()
+    }
+
+    chunks_by_key = {key: PyChunk.model_validate(item) for key, item in items_by_key.items()}
+    if rows_to_add:
+        added_items = db.scalars(
+            insert(sq_model).returning(sq_model, sort_by_parameter_order=True),
+            list(rows_to_add.values()),
+        ).all()
+        # Built from the inserted rows and the input models, rather than lazy loading relationships of each chunk
+        for (key, model), item in zip(models_to_add.items(), added_items):
+            chunks_by_key[key] = PyChunk(
+                id=item.id,
+                idx=item.idx,
+                text=item.text,
+                page_num=item.page_num,
+                partition_strategy=item.partition_strategy,
+                token_count=item.token_count,
+                created_datetime=item.created_datetime,
+                updated_datetime=item.updated_datetime,
+                file=model.file,
+                results=model.results,
+            )
+
+        result_rows = {
+            (rows_to_add[key]["id"], result.id)
+            for key, model in zip(keys, models)
+            if key in rows_to_add
+            for result in model.results
+        }
+        if result_rows:
+            db.execute(
+                result_chunks.insert(),
+                [dict(chunk_id=chunk_id, result_id=result_id) for chunk_id, result_id in result_rows],
+            )
+    db.commit()
+
+    logger.info(f"Added {len(rows_to_add)} of {len(models)} chunks, the rest already existed")
+    return [chunks_by_key[key] for key in keys]
+
+
 def _get_or_create_file(
     model: FileCreate,
     db: Session,
 ) -> PyFile:
     sq_model = SqFile
-    existing_item = db.query(sq_model).filter_by(type=model.type, name=model.name).first()
+    # Files are matched by S3 key as well as name, so a new version of a file uploaded to a key of its own (see
+    # `get_raw_s3_key`) gets a file and chunks of its own, rather than taking over the old version's
+    existing_item = (
+        db.query(sq_model)
+        .filter_by(
+            type=model.type,
+            name=model.name,
+            project_id=model.project.id if model.project else None,
+            s3_key=model.s3_key,
+        )
+        .first()
+    )
     if existing_item:
         parsed_item = PyFile.model_validate(existing_item)
         if parsed_item.s3_key:
@@ -361,6 +545,7 @@ def _get_or_create_file(
         s3_bucket=model.s3_bucket,
         s3_key=model.s3_key,
         storage_kind=model.storage_kind,
+        content_hash=model.content_hash,
         project_id=model.project.id,
     )
     db.add(item_to_add)
@@ -413,6 +598,8 @@ def delete_item(
         try:
             sq_model = pydantic_model_to_sqlalchemy_model_map.get(type(model))
             item = db.query(sq_model).get(model.id)
+            if sq_model is SqFile:
+                _delete_file_chunks(model.id, db)
             db.delete(item)
             db.commit()
             return model.id
@@ -420,6 +607,14 @@ def delete_item(
             logger.exception(f"Failed to delete item, {model}")
 
 
+def _delete_file_chunks(file_id: UUID, db: Session) -> None:
+    # Chunks, their links to results and the file's ingestion checkpoints would otherwise be left behind
+    chunk_ids = select(SqChunk.id).where(SqChunk.file_id == file_id)
+    db.execute(delete(result_chunks).where(result_chunks.c.chunk_id.in_(chunk_ids)))
+    db.query(SqChunk).filter(SqChunk.file_id == file_id).delete(synchronize_session=False)
+    db.query(SqIngestionRunFile).filter(SqIngestionRunFile.file_id == file_id).delete(synchronize_session=False)
+
+
 def update_item(
     model: CriterionUpdate | ChunkUpdate | FileUpdate | ProjectUpdate | ResultUpdate | UserUpdate | RatingUpdate,
 ) -> PyCriterion | PyChunk | PyFile | PyProject | PyResult | PyUser | PyRating | None:
@@ -440,10 +635,29 @@ def update_item(
                 return _update_file(model, db)
             if model_type is RatingUpdate:
                 return _update_rating(model, db)
+            if model_type is IngestionRunUpdate:
+                return _update_ingestion_run(model, db)
+            if model_type is IngestionRunFileUpdate:
+                return _update_ingestion_run_file(model, db)
         except Exception as _:
             logger.exception(f"Failed to update item, {model}")
 
 
+def update_items(
+    models: list[CriterionUpdate | ChunkUpdate | FileUpdate | ProjectUpdate | ResultUpdate | UserUpdate | RatingUpdate],
+) -> list[PyCriterion | PyChunk | PyFile | PyProject | PyResult | PyUser | PyRating | None]:
+    """Updates several items, returned in the same order. Files are updated in bulk, in one transaction."""
+    if models and all(type(model) is FileUpdate for model in models):
+        with SessionManager() as db:
+            try:
+                return _update_files(models, db)
+            except Exception as _:
+                db.rollback()
+                logger.exception(f"Failed to update {len(models)} files")
+                raise
+    return [update_item(model) for model in models]
+
+
 def _update_rating(model, db):
     sq_model = pydantic_update_model_to_sqlalchemy_model.get(type(model))
     item = db.query(sq_model).filter(sq_model.id == model.id).one_or_none()
@@ -462,6 +676,137 @@ def _update_rating(model, db):
     return PyRating.model_validate(item)
 
 
+def _update_ingestion_run(model: IngestionRunUpdate, db: Session) -> PyIngestionRun | None:
+    sq_model = pydantic_update_model_to_sqlalchemy_model.get(type(model))
+    item = db.query(sq_model).filter(sq_model.id == model.id).one_or_none()
+
+    if item is None:
+        return None
+
+    item.project_directory_name = model.project_directory_name
+    item.status = model.status
+    item.project_id = model.project.id if model.project else None
+
+    db.commit()
+    db.flush()  # Refresh updated item
+
+    return PyIngestionRun.model_validate(item)
+
+
+def _update_ingestion_run_file(model: IngestionRunFileUpdate, db: Session) -> PyIngestionRunFile | None:
+    sq_model = pydantic_update_model_to_sqlalchemy_model.get(type(model))
+    item = db.query(sq_model).filter(sq_model.id == model.id).one_or_none()
+
+    if item is None:
+        return None
+
+    item.name = model.name
+    item.raw_s3_key = model.raw_s3_key
+    item.processed_s3_key = model.processed_s3_key
+    item.stage = IngestionStage(model.stage).value
+    item.error = model.error
+    item.run_id = model.run.id if model.run else None
+    item.file_id = model.file.id if model.file else None
+
+    db.commit()
+    db.flush()  # Refresh updated item
+
+    return PyIngestionRunFile.model_validate(item)
+
+
+def claim_ingestion_run_file(
+    worker_id: str, lease_seconds: float, max_attempts: int, run_id: UUID | None = None
+) -> PyIngestionRunFile | None:
+    """
+    Claims a file that hasn't finished ingesting, from a run that is in progress, for an ingestion worker.
+
+    Files are locked with `SELECT ... FOR UPDATE SKIP LOCKED`, so workers claiming at the same time get different
+    files. The claim is a lease: if the worker doesn't renew it with `renew_ingestion_run_file_lease` before it
+    expires (e.g. because the worker died), the file can be claimed again. Files claimed max_attempts times are
+    left for someone to look at their error.
+
+    Returns:
+        The claimed file, or None if there are no files to claim
+    """
+    with SessionManager() as db:
+        query = (
+            db.query(SqIngestionRunFile)
+            .join(SqIngestionRun, SqIngestionRunFile.run_id == SqIngestionRun.id)
+            .filter(
+                SqIngestionRun.status == "running",
+                SqIngestionRunFile.stage != IngestionStage.EMBEDDED.value,
+                SqIngestionRunFile.attempts < max_attempts,
+                or_(SqIngestionRunFile.lease_expires_at.is_(None), SqIngestionRunFile.lease_expires_at < func.now()),
+            )
+        )
+        if run_id:
+            query = query.filter(SqIngestionRunFile.run_id == run_id)
+        item = (
+            query.order_by(SqIngestionRunFile.created_datetime)
+            .with_for_update(skip_locked=True, of=SqIngestionRunFile)
+            .first()
+        )
+        if item is None:
+            db.rollback()
+            return None
+        item.claimed_by = worker_id
+        item.lease_expires_at = func.now() + timedelta(seconds=lease_seconds)
+        item.attempts = item.attempts + 1
+        db.commit()
+        return PyIngestionRunFile.model_validate(item)
+
+
+def renew_ingestion_run_file_lease(run_file_id: UUID, worker_id: str, lease_seconds: float) -> bool:
+    """Extends a worker's lease on a file, returning False if the worker no longer holds the lease"""
+    with SessionManager() as db:
+        result = db.execute(
+            update(SqIngestionRunFile)
+            .where(SqIngestionRunFile.id == run_file_id, SqIngestionRunFile.claimed_by == worker_id)
+            .values(lease_expires_at=func.now() + timedelta(seconds=lease_seconds))
+        )
+        db.commit()
+        return result.rowcount == 1
+
+
+def release_ingestion_run_file(run_file_id: UUID, worker_id: str) -> None:
+    """Gives up a worker's lease on a file, so that it can be claimed again straight away if unfinished"""
+    with SessionManager() as db:
+        db.execute(
+            update(SqIngestionRunFile)
+            .where(SqIngestionRunFile.id == run_file_id, SqIngestionRunFile.claimed_by == worker_id)
+            .values(claimed_by=None, lease_expires_at=None)
+        )
+        db.commit()
+
+
+@contextmanager
+def project_lock(project_id: UUID):
+    """
+    Holds a Postgres advisory lock for a project, across all processes and hosts using the database, e.g. so that
+    only one ingestion worker at a time gives people in the project placeholders.
+    """
+    # Advisory lock keys are signed 64 bit integers
+    key = project_id.int >> 65
+    with SessionManager() as db:
+        db.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+        try:
+            yield
+        finally:
+            db.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+            db.commit()
+
+
+def save_project_person_map(project_id: UUID, person_map: Dict[str, str]) -> None:
+    """
+    Saves the placeholders given to people's names in a project. Only the person_map column is updated, as a full
+    project update would also rewrite the project's files from a copy read earlier, dropping files that ingestion
+    workers create in the meantime.
+    """
+    with SessionManager() as db:
+        db.execute(update(SqProject).where(SqProject.id == project_id).values(person_map=person_map))
+        db.commit()
+
+
 def _update_criterion(model: CriterionUpdate, db: Session) -> PyCriterion | None:
     sq_model = pydantic_update_model_to_sqlalchemy_model.get(type(model))
     item = db.query(sq_model).filter(sq_model.id == model.id).one_or_none()
@@ -494,6 +839,8 @@ def _update_chunk(model: ChunkUpdate, db: Session) -> PyChunk | None:
     item.idx = model.idx
     item.text = model.text
     item.page_num = model.page_num
+    item.partition_strategy = model.partition_strategy
+    item.token_count = model.token_count
     item.file_id = model.file.id if model.file else None
     item.results = [db.query(SqResult).get(result.id) for result in model.results]
 
@@ -510,6 +857,41 @@ def _update_file(model: FileUpdate, db: Session) -> PyFile | None:
     if item is None:
         return None
 
+    _set_file_attributes(item, model, db)
+
+    db.commit()
+    db.flush()  # Refresh updated item
+
+    parsed_item = PyFile.model_validate(item)
+    if parsed_item.s3_key:
+        parsed_item.url = str(S3StorageHandler().get_pre_signed_url(parsed_item.s3_key))
+    return parsed_item
+
+
+def _update_files(models: list[FileUpdate], db: Session) -> list[PyFile | None]:
+    """Updates several files with one query and one commit, returned in the same order as the models"""
+    items = {item.id: item for item in db.query(SqFile).filter(SqFile.id.in_([model.id for model in models])).all()}
+    for model in models:
+        if model.id in items:
+            _set_file_attributes(items[model.id], model, db)
+    db.commit()
+    logger.info(f"UPDATED FILES: {len(items)} of {len(models)} files")
+
+    s3_storage_handler = S3StorageHandler()
+    parsed_items = []
+    for model in models:
+        item = items.get(model.id)
+        if item is None:
+            parsed_items.append(None)
+            continue
+        parsed_item = PyFile.model_validate(item)
+        if parsed_item.s3_key:
+            parsed_item.url = str(s3_storage_handler.get_pre_signed_url(parsed_item.s3_key))
+        parsed_items.append(parsed_item)
+    return parsed_items
+
+
+def _set_file_attributes(item: SqFile, model: FileUpdate, db: Session) -> None:
     # Update basic attributes
     item.type = model.type
     item.name = model.name
@@ -520,20 +902,13 @@ def _update_file(model: FileUpdate, db: Session) -> PyFile | None:
     item.s3_bucket = model.s3_bucket
     item.s3_key = model.s3_key
     item.storage_kind = model.storage_kind
+    item.content_hash = model.content_hash
     item.project_id = model.project.id if model.project else None
 
     # Don't update chunks relationship unless explicitly provided
     if model.chunks:
         item.chunks = [db.query(SqChunk).get(chunk.id) for chunk in model.chunks]
 
-    db.commit()
-    db.flush()  # Refresh updated item
-
-    parsed_item = PyFile.model_validate(item)
-    if parsed_item.s3_key:
-        parsed_item.url = str(S3StorageHandler().get_pre_signed_url(parsed_item.s3_key))
-    return parsed_item
-
 
 def _update_project(model: ProjectUpdate, db: Session) -> PyProject | None:
     sq_model = pydantic_update_model_to_sqlalchemy_model.get(type(model))
@@ -544,6 +919,7 @@ def _update_project(model: ProjectUpdate, db: Session) -> PyProject | None:
 
     item.name = model.name
     item.results_summary = model.results_summary
+    item.person_map = model.person_map
     item.files = [db.query(SqFile).get(file.id) for file in model.files]
     item.criterions = [db.query(SqCriterion).get(criterion.id) for criterion in model.criterions]
     item.results = [db.query(SqResult).get(result.id) for result in model.results]
@@ -613,6 +989,10 @@ def filter_items(
                 return _filter_file(model, db)
             if model_type is RatingFilter:
                 return _filter_rating(model, db)
+            if model_type is IngestionRunFilter:
+                return _filter_ingestion_run(model, db)
+            if model_type is IngestionRunFileFilter:
+                return _filter_ingestion_run_file(model, db)
         except Exception as _:
             logger.exception(f"Failed to filter items, {model}")
 
@@ -635,6 +1015,40 @@ def _filter_rating(model, db):
     return results
 
 
+def _filter_ingestion_run(model: IngestionRunFilter, db: Session) -> list[PyIngestionRun]:
+    query = db.query(SqIngestionRun)
+    if model.project_directory_name:
+        query = query.filter(SqIngestionRun.project_directory_name == model.project_directory_name)
+    if model.status:
+        query = query.filter(SqIngestionRun.status == model.status)
+    if model.project:
+        query = query.filter(SqIngestionRun.project_id == model.project.id)
+
+    result = query.all()
+    results = []
+    for item in result:
+        results.append(PyIngestionRun.model_validate(item))
+    return results
+
+
+def _filter_ingestion_run_file(model: IngestionRunFileFilter, db: Session) -> list[PyIngestionRunFile]:
+    query = db.query(SqIngestionRunFile)
+    if model.name:
+        query = query.filter(SqIngestionRunFile.name == model.name)
+    if model.stage:
+        query = query.filter(SqIngestionRunFile.stage == IngestionStage(model.stage).value)
+    if model.run:
+        query = query.filter(SqIngestionRunFile.run_id == model.run.id)
+    if model.file:
+        query = query.filter(SqIngestionRunFile.file_id == model.file.id)
+
+    result = query.all()
+    results = []
+    for item in result:
+        results.append(PyIngestionRunFile.model_validate(item))
+    return results
+
+
 def _filter_user(model: UserFilter, db: Session) -> list[PyUser]:
     query = db.query(SqUser)
     if model.email:
@@ -663,6 +1077,8 @@ def _filter_file(model: FileFilter, db: Session) -> list[PyFile]:
         query = query.filter(SqFile.summary.ilike(f"%{model.summary}%"))
     if model.source:
         query = query.filter(SqFile.source.ilike(f"%{model.source}%"))
+    if model.content_hash:
+        query = query.filter(SqFile.content_hash == model.content_hash)
     if model.project:
         query = query.filter(SqFile.project_id == model.project.id)
     if model.chunks:
@@ -1,8 +1,8 @@
 import enum
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Table, func
-from sqlalchemy.dialects.postgresql import ENUM, UUID
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Table, func, text
+from sqlalchemy.dialects.postgresql import ENUM, JSONB, UUID
 from sqlalchemy.orm import relationship
 
 from scout.utils.storage.postgres_database import Base
@@ -141,9 +141,9 @@ class File(Base):
     s3_bucket = Column(String, nullable=True, default="")
     s3_key = Column(String, nullable=True, default="")
     storage_kind = Column(String, nullable=True, default="local")
+    content_hash = Column(String, nullable=True, index=True)  # SHA-256 of the file that was chunked (see FileBase)
     created_datetime = Column(DateTime(timezone=True), server_default=func.now())
     updated_datetime = Column(DateTime(timezone=True), onupdate=func.now())
-    # TODO add back in file hash to avoid double uploads, do it the way redbox does
 
     project_id = Column(UUID, ForeignKey("project.id"))
     project = relationship("Project", back_populates="files")
@@ -158,6 +158,8 @@ class Chunk(Base):
     idx = Column(Integer, nullable=False)
     text = Column(String, nullable=False)
     page_num = Column(Integer, nullable=False)
+    partition_strategy = Column(String, nullable=True)
+    token_count = Column(Integer, nullable=True)  # cl100k_base tokens in the text
     created_datetime = Column(DateTime(timezone=True), server_default=func.now())
     updated_datetime = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -173,6 +175,8 @@ class Project(Base):
     name = Column(String, nullable=False)
     id = Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True)
     results_summary = Column(String, nullable=True, default="")
+    # Names of people found when anonymising the project's files, mapped to their placeholders
+    person_map = Column(JSONB, nullable=True)
     created_datetime = Column(DateTime(timezone=True), server_default=func.now())
     updated_datetime = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -181,3 +185,55 @@ class Project(Base):
     results = relationship("Result", back_populates="project")
     users = relationship("User", secondary="project_users", back_populates="projects")
     ratings = relationship("Rating", back_populates="project")
+    ingestion_runs = relationship("IngestionRun", back_populates="project")
+
+
+class IngestionStage(enum.Enum):
+    # In the order files pass through ingestion
+    UPLOADED = "UPLOADED"
+    CONVERTED = "CONVERTED"
+    CHUNKED = "CHUNKED"
+    FILE_INFO_DONE = "FILE_INFO_DONE"
+    EMBEDDED = "EMBEDDED"
+
+
+class IngestionRun(Base):
+    __tablename__ = "ingestion_run"
+
+    id = Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True)
+    project_directory_name = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="running")
+    created_datetime = Column(DateTime(timezone=True), server_default=func.now())
+    updated_datetime = Column(DateTime(timezone=True), onupdate=func.now())
+
+    project_id = Column(UUID, ForeignKey("project.id"))
+    project = relationship("Project", back_populates="ingestion_runs")
+
+    files = relationship("IngestionRunFile", back_populates="run")
+
+
+class IngestionRunFile(Base):
+    __tablename__ = "ingestion_run_file"
+
+    id = Column(UUID(as_uuid=True), default=uuid.uuid4, primary_key=True)
+    name = Column(String, nullable=False)
+    raw_s3_key = Column(String, nullable=True)
+    processed_s3_key = Column(String, nullable=True)
+    stage = Column(
+        "ingestion_stage",
+        ENUM(IngestionStage, name="ingestion_stage_enum", create_type=False),
+        nullable=False,
+    )
+    error = Column(String, nullable=True)
+    # Set while an ingestion worker is processing the file, see `claim_ingestion_run_file`
+    claimed_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, server_default=text("0"), default=0)
+    created_datetime = Column(DateTime(timezone=True), server_default=func.now())
+    updated_datetime = Column(DateTime(timezone=True), onupdate=func.now())
+
+    run_id = Column(UUID, ForeignKey("ingestion_run.id"))
+    run = relationship("IngestionRun", back_populates="files")
+
+    file_id = Column(UUID, ForeignKey("file.id"), nullable=True)
+    file = relationship("File")
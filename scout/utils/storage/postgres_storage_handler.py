@@ -30,7 +30,9 @@ from scout.utils.storage.postgres_interface import filter_items
 from scout.utils.storage.postgres_interface import get_all
 from scout.utils.storage.postgres_interface import get_by_id
 from scout.utils.storage.postgres_interface import get_or_create_item
+from scout.utils.storage.postgres_interface import get_or_create_items
 from scout.utils.storage.postgres_interface import update_item
+from scout.utils.storage.postgres_interface import update_items
 from scout.utils.storage.postgres_models import Chunk as SqChunk
 from scout.utils.storage.postgres_models import Criterion as SqCriterion
 from scout.utils.storage.postgres_models import File as SqFile
@@ -55,8 +57,8 @@ class PostgresStorageHandler(BaseStorageHandler):
         self,
         models: List[CriterionCreate | ChunkCreate | FileCreate | ProjectCreate | ResultCreate | UserCreate],
     ) -> List[PyProject | PyResult | PyUser | PyChunk | PyFile | PyCriterion]:
-        """Write a list of objects to a data store"""
-        return [get_or_create_item(model) for model in models]
+        """Write a list of objects to a data store, returned in the same order. Chunks are written in bulk."""
+        return get_or_create_items(models)
 
     def read_item(
         self,
@@ -86,7 +88,7 @@ class PostgresStorageHandler(BaseStorageHandler):
         items: List[CriterionUpdate | ChunkUpdate | FileUpdate | ProjectUpdate | ResultUpdate | UserUpdate],
     ) -> List[SqCriterion | SqChunk | SqFile | SqProject | SqResult | SqUser | None]:
         """Update a list of objects in a data store"""
-        return [update_item(item) for item in items]
+        return update_items(items)
 
     def delete_item(self, model: PyCriterion | PyChunk | PyFile | PyProject | PyResult | PyUser) -> UUID:
         """Delete an object from a data store"""
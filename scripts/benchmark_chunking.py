@@ -0,0 +1,88 @@
+"""
+This script compares chunking settings on a folder of files, to choose CHUNK_MAX_CHARACTERS and
+CHUNK_NEW_AFTER_N_CHARS for a corpus. Each file is partitioned once, then chunked, token counted and embedded with
+each setting, and a labelled set of queries is run against the chunks to measure how often the right file (or text)
+is retrieved.
+
+Queries are a JSON list, or a CSV file, of {"query": ..., "file_name": ..., "text": ...} where text is optional.
+
+Examples:
+    python scripts/benchmark_chunking.py .data/example_project queries.json
+    python scripts/benchmark_chunking.py .data/example_project queries.csv --settings 1000:800 2000:1750 --k 5
+"""
+
+import argparse
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from scout.DataIngest.chunking_benchmark import (
+    DEFAULT_CHUNKING_SETTINGS,
+    DEFAULT_HIT_RATE_TOLERANCE,
+    load_labelled_queries,
+    recommend_setting,
+    run_chunking_benchmark,
+    write_benchmark_results,
+)
+from scout.DataIngest.utils import is_ingestible_file
+from scout.Pipelines.utils import get_embedding_function
+
+load_dotenv()
+
+
+def parse_setting(setting: str) -> tuple:
+    max_characters, new_after_n_chars = setting.split(":")
+    return int(max_characters), int(new_after_n_chars)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark chunking settings on a corpus")
+    parser.add_argument("corpus_directory", type=Path, help="Folder of files to chunk")
+    parser.add_argument("queries", type=Path, help="JSON or CSV file of labelled queries")
+    parser.add_argument(
+        "--settings",
+        nargs="+",
+        type=parse_setting,
+        default=DEFAULT_CHUNKING_SETTINGS,
+        help="max_characters:new_after_n_chars pairs to try",
+    )
+    parser.add_argument("--strategy", default="fast", help="Partition strategy e.g. fast, hi_res, per_page")
+    parser.add_argument("--k", type=int, default=3, help="Chunks retrieved per query")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_HIT_RATE_TOLERANCE)
+    parser.add_argument("--embedding-cache", type=Path, default=Path(".data/embedding_cache"))
+    parser.add_argument("--output", type=Path, default=Path("chunking_benchmark.csv"))
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    file_paths = sorted(
+        path for path in args.corpus_directory.iterdir() if path.is_file() and is_ingestible_file(path.name)
+    )
+    queries = load_labelled_queries(args.queries)
+    embedding_function = get_embedding_function(args.embedding_cache)
+    results = run_chunking_benchmark(
+        file_paths,
+        queries,
+        embed_documents=embedding_function.embed_documents,
+        embed_query=embedding_function.embed_query,
+        settings=args.settings,
+        strategy=args.strategy,
+        k=args.k,
+    )
+    write_benchmark_results(results, args.output)
+
+    for result in results:
+        print(
+            f"{result.max_characters}:{result.new_after_n_chars} - {result.num_chunks} chunks, "
+            f"{result.total_tokens} tokens, chunked in {result.chunk_seconds:.1f}s, embedded in "
+            f"{result.embed_seconds:.1f}s, hit rate {result.hit_rate:.2f} at k={args.k}, "
+            f"{result.mean_context_tokens:.0f} context tokens per query"
+        )
+    recommended = recommend_setting(results, hit_rate_tolerance=args.tolerance)
+    print(f"Partitioned {len(file_paths)} files in {results[0].partition_seconds:.1f}s. Results saved to {args.output}")
+    print(
+        f"Recommended: CHUNK_MAX_CHARACTERS={recommended.max_characters} "
+        f"CHUNK_NEW_AFTER_N_CHARS={recommended.new_after_n_chars}"
+    )
@@ -0,0 +1,51 @@
+"""
+This script runs an ingestion worker, which claims files queued with `scripts/queue_project_ingestion.py` and
+converts, chunks, anonymises and embeds them. Start as many workers as needed, on one or more hosts, against the
+same database and S3 bucket. Stop with Ctrl+C, a file being worked on is picked up by another worker.
+
+Workers on different hosts must share the project's vector store folder in .data, e.g. on a shared volume.
+
+Examples:
+    python scripts/ingestion_worker.py
+    python scripts/ingestion_worker.py --strategy hi_res --lease-seconds 600
+"""
+
+import argparse
+import signal
+import threading
+
+from dotenv import load_dotenv
+
+from scout.Pipelines.ingestion_workers import (
+    DEFAULT_IDLE_SECONDS,
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_MAX_ATTEMPTS,
+    IngestionWorker,
+)
+
+load_dotenv()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Claim and ingest queued project files")
+    parser.add_argument("--strategy", default="fast", help="Partition strategy e.g. fast, hi_res, per_page")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS)
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+    parser.add_argument("--idle-seconds", type=float, default=DEFAULT_IDLE_SECONDS, help="Wait when there's no work")
+    parser.add_argument("--worker-id", help="Defaults to the host name and process id")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    worker = IngestionWorker(
+        chunking_strategy=args.strategy,
+        lease_seconds=args.lease_seconds,
+        max_attempts=args.max_attempts,
+        worker_id=args.worker_id,
+    )
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    worker.run(stop_event=stop_event, idle_seconds=args.idle_seconds)
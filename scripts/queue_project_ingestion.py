@@ -0,0 +1,40 @@
+"""
+This script creates a project from a folder in .data and queues its files for ingestion workers
+(`scripts/ingestion_worker.py`), then waits for the workers to finish and marks the project's ingestion run
+complete, or incomplete if any files failed.
+
+Examples:
+    python scripts/queue_project_ingestion.py example_project
+    python scripts/queue_project_ingestion.py example_project --no-wait
+    python scripts/queue_project_ingestion.py example_project --archive-s3-key uploads/example_project.zip
+"""
+
+import argparse
+
+from dotenv import load_dotenv
+
+from scout.Pipelines.ingestion_workers import DEFAULT_MAX_ATTEMPTS, queue_project_files, wait_for_project_files
+
+load_dotenv()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Queue a project's files for ingestion workers")
+    parser.add_argument("project_directory_name", help="Name of the project's folder in .data")
+    parser.add_argument(
+        "--archive-s3-key", action="append", help="Key of a zip archive in the S3 bucket to ingest, may be repeated"
+    )
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="As given to the workers")
+    parser.add_argument("--timeout", type=float, help="Seconds to wait for the workers")
+    parser.add_argument("--no-wait", action="store_true", help="Queue the files without waiting for the workers")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    project = queue_project_files(args.project_directory_name, archive_s3_keys=args.archive_s3_key)
+    print(f"Queued files for project {project.name}")
+    if not args.no_wait:
+        status = wait_for_project_files(project, max_attempts=args.max_attempts, timeout=args.timeout)
+        print(f"Ingestion of {project.name} is {status}")
@@ -0,0 +1,69 @@
+"""
+This script adds, replaces or removes individual files of a project that has already been ingested,
+without ingesting the rest of the project again.
+
+Examples:
+    python scripts/update_project_files.py example_project-2024-06-01-12-00-00 add .data/late_report.pdf
+    python scripts/update_project_files.py example_project-2024-06-01-12-00-00 replace .data/report.docx
+    python scripts/update_project_files.py example_project-2024-06-01-12-00-00 remove report.docx
+
+LLM flags are not regenerated, run them again for the project if they should take the changes into account.
+"""
+
+import argparse
+
+from dotenv import load_dotenv
+
+from scout.DataIngest.utils import get_vector_store_directory
+from scout.Pipelines.ingest_project_data import get_project_to_resume
+from scout.Pipelines.update_project_files import add_project_files, get_project_directory_name, remove_project_file
+from scout.Pipelines.utils import get_or_create_vector_store
+from scout.utils.storage.filesystem import S3StorageHandler
+from scout.utils.storage.postgres_storage_handler import PostgresStorageHandler
+from scout.utils.utils import logger
+
+load_dotenv()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Add, replace or remove files of an ingested project")
+    parser.add_argument("project_name", help="Name of the project, as created by ingest_project_files")
+    parser.add_argument("action", choices=["add", "replace", "remove"])
+    parser.add_argument("files", nargs="+", help="Paths of files to add or replace, or names of files to remove")
+    parser.add_argument("--strategy", default="fast", help="Partition strategy e.g. fast, hi_res, per_page")
+    parser.add_argument(
+        "--partition-office-natively",
+        action="store_true",
+        help="Chunk docx and pptx files without waiting for them to be converted to PDF",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    storage_handler = PostgresStorageHandler()
+    project = get_project_to_resume(args.project_name, storage_handler)
+    vector_store_directory = get_vector_store_directory(get_project_directory_name(project, storage_handler))
+    vector_store = get_or_create_vector_store(vector_store_directory)
+
+    if args.action == "remove":
+        for file_name in args.files:
+            remove_project_file(
+                project_name=project.name,
+                file_name=file_name,
+                vector_store=vector_store,
+                storage_handler=storage_handler,
+            )
+    else:
+        add_project_files(
+            project_name=project.name,
+            file_paths=args.files,
+            vector_store=vector_store,
+            storage_handler=storage_handler,
+            s3_storage_handler=S3StorageHandler(),
+            chunking_partition_strategy=args.strategy,
+            replace=args.action == "replace",
+            partition_office_natively=args.partition_office_natively,
+        )
+    logger.info(f"Finished updating files of {project.name}")
@@ -0,0 +1,74 @@
+"""
+This script watches a project's folder in .data (or a prefix in the S3 bucket) and ingests new and changed files
+into the project as they arrive, e.g. while documents are still being gathered during a review.
+
+The project must already have been ingested, e.g. with `scripts/analyse_project.py`. Stop with Ctrl+C.
+
+Examples:
+    python scripts/watch_project_files.py example_project-2024-06-01-12-00-00
+    python scripts/watch_project_files.py example_project-2024-06-01-12-00-00 --s3-prefix uploads/example_project/
+"""
+
+import argparse
+import signal
+import threading
+
+from dotenv import load_dotenv
+
+from scout.DataIngest.utils import get_project_directory, get_vector_store_directory
+from scout.Pipelines.ingest_project_data import get_project_to_resume
+from scout.Pipelines.update_project_files import get_project_directory_name
+from scout.Pipelines.utils import get_or_create_vector_store
+from scout.Pipelines.watch_project_files import (
+    DEFAULT_MAX_BATCH_SIZE,
+    DEFAULT_POLL_INTERVAL_SECONDS,
+    LocalFolderSource,
+    ProjectFileWatcher,
+    S3PrefixSource,
+)
+from scout.utils.storage.filesystem import S3StorageHandler
+from scout.utils.storage.postgres_storage_handler import PostgresStorageHandler
+
+load_dotenv()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingest files into a project as they arrive")
+    parser.add_argument("project_name", help="Name of the project, as created by ingest_project_files")
+    parser.add_argument("--s3-prefix", help="Watch this prefix in the S3 bucket instead of the project's folder")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL_SECONDS, help="Seconds between polls")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--remove-deleted", action="store_true", help="Remove files deleted from the source")
+    parser.add_argument("--strategy", default="fast", help="Partition strategy e.g. fast, hi_res, per_page")
+    parser.add_argument("--partition-office-natively", action="store_true")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    storage_handler = PostgresStorageHandler()
+    s3_storage_handler = S3StorageHandler()
+    project = get_project_to_resume(args.project_name, storage_handler)
+    project_directory_name = get_project_directory_name(project, storage_handler)
+    vector_store = get_or_create_vector_store(get_vector_store_directory(project_directory_name))
+    if args.s3_prefix:
+        source = S3PrefixSource(s3_storage_handler, args.s3_prefix)
+    else:
+        source = LocalFolderSource(get_project_directory(project_directory_name))
+
+    watcher = ProjectFileWatcher(
+        project.name,
+        source,
+        vector_store=vector_store,
+        storage_handler=storage_handler,
+        s3_storage_handler=s3_storage_handler,
+        max_batch_size=args.max_batch_size,
+        remove_deleted=args.remove_deleted,
+        chunking_partition_strategy=args.strategy,
+        partition_office_natively=args.partition_office_natively,
+    )
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    watcher.run(poll_interval=args.interval, stop_event=stop_event)
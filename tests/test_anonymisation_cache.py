@@ -0,0 +1,23 @@
+from presidio_analyzer import RecognizerResult
+
+from scout.DataIngest.anonymisation_cache import AnonymisationCache
+from scout.utils.storage.cache_store import LocalCacheStore
+
+
+def test_local_anonymisation_cache_round_trip(tmp_path):
+    cache = AnonymisationCache(LocalCacheStore(tmp_path))
+    text = "Call Jane Smith on 07700 900123"
+    results = [RecognizerResult("PERSON", 5, 15, 0.85), RecognizerResult("PHONE_NUMBER", 19, 31, 0.9)]
+
+    assert cache.get(text, ["PERSON", "PHONE_NUMBER"], 0.8, "v1") is None
+    cache.put(text, ["PERSON", "PHONE_NUMBER"], 0.8, "v1", results)
+
+    cached_results = cache.get(text, ["PHONE_NUMBER", "PERSON"], 0.8, "v1")
+    assert [(result.entity_type, result.start, result.end, result.score) for result in cached_results] == [
+        ("PERSON", 5, 15, 0.85),
+        ("PHONE_NUMBER", 19, 31, 0.9),
+    ]
+    assert cache.get(text, ["PERSON"], 0.8, "v1") is None
+    assert cache.get(text, ["PERSON", "PHONE_NUMBER"], 0.5, "v1") is None
+    assert cache.get(text, ["PERSON", "PHONE_NUMBER"], 0.8, "v2") is None
+    assert cache.get(text + ".", ["PERSON", "PHONE_NUMBER"], 0.8, "v1") is None
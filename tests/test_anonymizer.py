@@ -0,0 +1,81 @@
+from scout.DataIngest.anonymizer import ConsistentPersonOperator
+
+
+def test_consistent_person_operator_reuses_placeholders():
+    operator = ConsistentPersonOperator()
+
+    assert operator("Jane Smith") == "<Person 1>"
+    assert operator("John Brown") == "<Person 2>"
+    assert operator("Jane Smith") == "<Person 1>"
+
+
+def test_consistent_person_operator_carries_on_from_saved_map():
+    operator = ConsistentPersonOperator(person_map={"Jane Smith": "<Person 1>", "John Brown": "<Person 2>"})
+
+    assert operator("John Brown") == "<Person 2>"
+    assert operator("Ann Jones") == "<Person 3>"
+    assert operator.person_map["Ann Jones"] == "<Person 3>"
+
+
+def test_analyze_texts_only_analyses_texts_missing_from_cache(mocker, tmp_path):
+    from presidio_analyzer import RecognizerResult
+
+    from scout.DataIngest.anonymisation_cache import AnonymisationCache
+    from scout.DataIngest.anonymizer import ANONYMISED_ENTITIES, SCORE_THRESHOLD, analyze_texts
+    from scout.utils.storage.cache_store import LocalCacheStore
+
+    cache = AnonymisationCache(LocalCacheStore(tmp_path))
+    cache.put(
+        "Jane Smith wrote this", ANONYMISED_ENTITIES, SCORE_THRESHOLD, "v1", [RecognizerResult("PERSON", 0, 10, 0.9)]
+    )
+    mocker.patch("scout.DataIngest.anonymizer.get_anonymisation_cache", return_value=cache)
+    mocker.patch("scout.DataIngest.anonymizer.get_analyzer_model_version", return_value="v1")
+    mock_analyze_text = mocker.patch("scout.DataIngest.anonymizer.analyze_text", return_value=[])
+
+    all_analyzer_results = analyze_texts(["Jane Smith wrote this", "No one", "No one"])
+
+    mock_analyze_text.assert_called_once_with("No one")
+    assert [[result.entity_type for result in results] for results in all_analyzer_results] == [["PERSON"], [], []]
+    assert cache.get("No one", ANONYMISED_ENTITIES, SCORE_THRESHOLD, "v1") == []
+
+
+def test_cached_analyzer_results_use_the_anonymizers_person_map(tmp_path):
+    from unittest.mock import Mock
+
+    from presidio_analyzer import RecognizerResult
+
+    from scout.DataIngest.anonymisation_cache import AnonymisationCache
+    from scout.DataIngest.anonymizer import ANONYMISED_ENTITIES, SCORE_THRESHOLD, Anonymizer
+    from scout.utils.storage.cache_store import LocalCacheStore
+
+    text = "Jane Smith met John Brown"
+    cache = AnonymisationCache(LocalCacheStore(tmp_path))
+    cache.put(
+        text,
+        ANONYMISED_ENTITIES,
+        SCORE_THRESHOLD,
+        "v1",
+        [RecognizerResult("PERSON", 0, 10, 0.9), RecognizerResult("PERSON", 15, 25, 0.9)],
+    )
+    anonymizer = Anonymizer(analyzer=Mock(), person_map={"John Brown": "<Person 1>"})
+
+    anonymized = anonymizer.anonymize(text, cache.get(text, ANONYMISED_ENTITIES, SCORE_THRESHOLD, "v1"))
+
+    assert anonymized.text == "<Person 2> met <Person 1>"
+    assert anonymizer.person_map == {"John Brown": "<Person 1>", "Jane Smith": "<Person 2>"}
+
+
+def test_analyze_texts_reuses_given_executor(mocker):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from scout.DataIngest.anonymizer import analyze_texts
+
+    mocker.patch("scout.DataIngest.anonymizer.get_anonymisation_cache", return_value=None)
+    mocker.patch("scout.DataIngest.anonymizer.analyze_text", side_effect=lambda text: [text])
+    process_pool = mocker.patch("scout.DataIngest.anonymizer.ProcessPoolExecutor")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert analyze_texts(["a", "b", "c"], max_workers=2, executor=executor) == [["a"], ["b"], ["c"]]
+        assert analyze_texts(["d", "e"], max_workers=2, executor=executor) == [["d"], ["e"]]
+
+    process_pool.assert_not_called()
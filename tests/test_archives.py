@@ -0,0 +1,44 @@
+import zipfile
+from unittest.mock import Mock
+
+from scout.DataIngest.archives import get_archive_members, upload_archive_members
+
+
+def make_archive(path):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("report.pdf", b"%PDF report")
+        zip_file.writestr("appendices/", b"")
+        zip_file.writestr("appendices/report.pdf", b"%PDF appendix")
+        zip_file.writestr("appendices/notes.docx", b"notes")
+        zip_file.writestr("appendices/diagram.png", b"png")
+        zip_file.writestr("__MACOSX/._report.pdf", b"resource fork")
+        zip_file.writestr(".DS_Store", b"")
+    return path
+
+
+def test_get_archive_members_skips_unsupported_and_renames_clashes(tmp_path):
+    with zipfile.ZipFile(make_archive(tmp_path / "project.zip")) as zip_file:
+        members = get_archive_members(zip_file)
+        assert {file_name: member.filename for file_name, member in members.items()} == {
+            "report.pdf": "report.pdf",
+            "appendices-report.pdf": "appendices/report.pdf",
+            "notes.docx": "appendices/notes.docx",
+        }
+
+        assert list(get_archive_members(zip_file, exclude=["report.pdf", "notes.docx"])) == ["appendices-report.pdf"]
+
+
+def test_upload_archive_members_streams_members_to_s3(tmp_path):
+    uploaded = {}
+    mock_s3_storage_handler = Mock()
+    mock_s3_storage_handler.write_fileobj.side_effect = lambda fileobj, key: uploaded.update({key: fileobj.read()})
+
+    keys = upload_archive_members(make_archive(tmp_path / "project.zip"), mock_s3_storage_handler, prefix="p/raw/")
+
+    assert keys == ["p/raw/report.pdf", "p/raw/appendices-report.pdf", "p/raw/notes.docx"]
+    assert uploaded == {
+        "p/raw/report.pdf": b"%PDF report",
+        "p/raw/appendices-report.pdf": b"%PDF appendix",
+        "p/raw/notes.docx": b"notes",
+    }
+    mock_s3_storage_handler.read_spooled.assert_not_called()
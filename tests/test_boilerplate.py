@@ -0,0 +1,78 @@
+import pickle
+
+from unstructured.documents.elements import ElementMetadata, Text
+
+from scout.DataIngest.boilerplate import ProjectBoilerplate, strip_boilerplate
+
+
+def make_element(text, page_number):
+    return Text(text, metadata=ElementMetadata(page_number=page_number))
+
+
+def make_pages(num_pages):
+    elements = []
+    for page_number in range(1, num_pages + 1):
+        elements.append(make_element("OFFICIAL SENSITIVE", page_number))
+        elements.append(make_element(f"Content unique to page {page_number} of the business case", page_number))
+        elements.append(make_element(f"Page {page_number} of {num_pages}", page_number))
+    return elements
+
+
+def test_strip_boilerplate_removes_text_repeated_across_pages():
+    elements, report = strip_boilerplate(make_pages(6))
+
+    assert [element.text for element in elements] == [
+        f"Content unique to page {page_number} of the business case" for page_number in range(1, 7)
+    ]
+    assert report.elements_removed == 12
+    assert report.tokens_saved > 0
+
+
+def test_strip_boilerplate_keeps_text_differing_only_by_numbers():
+    elements = make_pages(6) + [make_element(f"Figure {page_number}", page_number) for page_number in range(1, 7)]
+
+    kept, report = strip_boilerplate(elements)
+
+    assert [element.text for element in kept if element.text.startswith("Figure")] == [
+        f"Figure {page_number}" for page_number in range(1, 7)
+    ]
+    assert report.elements_removed == 12
+
+
+def test_strip_boilerplate_keeps_text_on_few_pages():
+    elements = make_pages(6) + [make_element("Annex A", 2), make_element("Annex A", 5)]
+
+    kept, _ = strip_boilerplate(elements)
+
+    assert [element.text for element in kept].count("Annex A") == 2
+
+
+def test_strip_boilerplate_uses_project_boilerplate():
+    project_boilerplate = ProjectBoilerplate()
+    strip_boilerplate(make_pages(6), project_boilerplate=project_boilerplate)
+
+    kept, report = strip_boilerplate(
+        [make_element("OFFICIAL SENSITIVE", 1), make_element("A one page letter", 1)],
+        project_boilerplate=project_boilerplate,
+    )
+
+    assert [element.text for element in kept] == ["A one page letter"]
+    assert project_boilerplate.tokens_saved > report.tokens_saved
+
+
+def test_project_boilerplate_is_shared_with_worker_processes():
+    project_boilerplate = ProjectBoilerplate()
+    strip_boilerplate(make_pages(6), project_boilerplate=project_boilerplate)
+
+    # As in a worker process, which is sent the hashes found so far and reports back what it stripped
+    worker_boilerplate = ProjectBoilerplate(pickle.loads(pickle.dumps(project_boilerplate.copy_hashes())))
+    kept, report = strip_boilerplate(
+        [make_element("OFFICIAL SENSITIVE", 1), make_element("A one page letter", 1)],
+        project_boilerplate=worker_boilerplate,
+    )
+    tokens_saved = project_boilerplate.tokens_saved
+    project_boilerplate.add(pickle.loads(pickle.dumps(worker_boilerplate.report())))
+
+    assert [element.text for element in kept] == ["A one page letter"]
+    assert project_boilerplate.tokens_saved == tokens_saved + report.tokens_saved
+    assert project_boilerplate.elements_removed == 13
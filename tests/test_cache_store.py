@@ -0,0 +1,35 @@
+from unittest.mock import Mock
+
+from scout.utils.storage.cache_store import LocalCacheStore, S3CacheStore, get_cache_store
+
+
+def test_local_cache_store_round_trip(tmp_path):
+    store = LocalCacheStore(tmp_path)
+
+    assert store.get("v1/abc.json") is None
+    store.put("v1/abc.json", b"cached")
+
+    assert store.get("v1/abc.json") == b"cached"
+    assert list(tmp_path.rglob("*.tmp")) == []
+
+
+def test_cache_store_errors_are_logged_not_raised():
+    s3_storage_handler = Mock()
+    s3_storage_handler.read_bytes.side_effect = Exception("S3 is down")
+    s3_storage_handler.write_bytes.side_effect = Exception("S3 is down")
+    store = S3CacheStore(s3_storage_handler, prefix="partition-cache/")
+
+    assert store.get("v1/abc.json") is None
+    store.put("v1/abc.json", b"cached")
+
+    s3_storage_handler.read_bytes.assert_called_once_with("partition-cache/v1/abc.json")
+
+
+def test_get_cache_store_is_none_unless_set(monkeypatch, tmp_path):
+    monkeypatch.delenv("PARTITION_CACHE", raising=False)
+    assert get_cache_store("PARTITION_CACHE", tmp_path, s3_prefix="partition-cache/") is None
+
+    monkeypatch.setenv("PARTITION_CACHE", "local")
+    store = get_cache_store("PARTITION_CACHE", tmp_path, s3_prefix="partition-cache/")
+    assert isinstance(store, LocalCacheStore)
+    assert store.directory == tmp_path
@@ -0,0 +1,90 @@
+from datetime import datetime
+from uuid import uuid4
+
+from scout.DataIngest.checkpoints import IngestionCheckpointer
+from scout.DataIngest.models.schemas import (
+    IngestionRun,
+    IngestionRunCreate,
+    IngestionRunFile,
+    IngestionRunFileCreate,
+    IngestionRunFileFilter,
+    IngestionRunUpdate,
+    IngestionStage,
+)
+
+
+class FakeStorageHandler:
+    def __init__(self, run_status="running"):
+        self.run_files = []
+        self.run_status = run_status
+        self.run_updates = []
+
+    def write_item(self, model):
+        if isinstance(model, IngestionRunCreate):
+            return IngestionRun(
+                id=uuid4(),
+                created_datetime=datetime.now(),
+                updated_datetime=None,
+                project_directory_name=model.project_directory_name,
+                status=self.run_status,
+            )
+        assert isinstance(model, IngestionRunFileCreate)
+        run_file = IngestionRunFile(
+            id=uuid4(), created_datetime=datetime.now(), updated_datetime=None, **model.model_dump()
+        )
+        self.run_files.append(run_file)
+        return run_file
+
+    def update_item(self, model):
+        if isinstance(model, IngestionRunUpdate):
+            self.run_updates.append(model.status)
+            return IngestionRun(
+                created_datetime=datetime.now(),
+                updated_datetime=datetime.now(),
+                **model.model_dump(exclude={"project"}),
+            )
+        return IngestionRunFile(created_datetime=datetime.now(), updated_datetime=datetime.now(), **model.model_dump())
+
+    def get_item_by_attribute(self, model):
+        assert isinstance(model, IngestionRunFileFilter)
+        return self.run_files
+
+
+def test_checkpointer_tracks_stages_of_files():
+    checkpointer = IngestionCheckpointer(
+        project=None, project_directory_name="test", storage_handler=FakeStorageHandler()
+    )
+    checkpointer.mark("report.docx", IngestionStage.UPLOADED, raw_s3_key="project/raw/report.docx")
+    checkpointer.mark("report.docx", IngestionStage.CONVERTED, processed_s3_key="project/processed/report.pdf")
+    checkpointer.mark("notes.pdf", IngestionStage.UPLOADED, raw_s3_key="project/raw/notes.pdf")
+
+    # Processed file names are matched back to the raw file
+    assert checkpointer.stage_of("report.pdf") == IngestionStage.CONVERTED
+    assert checkpointer.is_done("report.docx", IngestionStage.UPLOADED)
+    assert not checkpointer.is_done("report.docx", IngestionStage.CHUNKED)
+    assert [run_file.name for run_file in checkpointer.files_at(IngestionStage.UPLOADED)] == ["notes.pdf"]
+    assert checkpointer.files["report.docx"].raw_s3_key == "project/raw/report.docx"
+
+
+def test_checkpointer_resumes_existing_files():
+    storage_handler = FakeStorageHandler()
+    checkpointer = IngestionCheckpointer(project=None, project_directory_name="test", storage_handler=storage_handler)
+    checkpointer.mark("notes.pdf", IngestionStage.UPLOADED, raw_s3_key="project/raw/notes.pdf")
+
+    resumed = IngestionCheckpointer(project=None, project_directory_name="test", storage_handler=storage_handler)
+    assert resumed.stage_of("notes.pdf") == IngestionStage.UPLOADED
+    resumed.mark_failed("notes.pdf", ValueError("Conversion failed"))
+    assert resumed.files["notes.pdf"].error == "Conversion failed"
+    assert resumed.finish() == "incomplete"
+
+
+def test_checkpointer_only_reopens_a_finished_run_when_started():
+    storage_handler = FakeStorageHandler(run_status="complete")
+
+    checkpointer = IngestionCheckpointer(project=None, project_directory_name="test", storage_handler=storage_handler)
+    assert checkpointer.run.status == "complete"
+    assert storage_handler.run_updates == []
+
+    checkpointer.start()
+    assert checkpointer.run.status == "running"
+    assert storage_handler.run_updates == ["running"]
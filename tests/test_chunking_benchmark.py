@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from scout.DataIngest.chunking_benchmark import (
+    ChunkingBenchmarkResult,
+    LabelledQuery,
+    benchmark_setting,
+    load_labelled_queries,
+    recommend_setting,
+)
+
+
+def make_result(max_characters, hit_rate, mean_context_tokens, total_tokens=1000):
+    return ChunkingBenchmarkResult(
+        max_characters=max_characters,
+        new_after_n_chars=max_characters - 250,
+        num_chunks=10,
+        total_tokens=total_tokens,
+        mean_chunk_tokens=100.0,
+        partition_seconds=1.0,
+        chunk_seconds=0.1,
+        embed_seconds=1.0,
+        hit_rate=hit_rate,
+        mean_context_tokens=mean_context_tokens,
+    )
+
+
+def test_recommend_setting_prefers_cheapest_of_best_hit_rates():
+    results = [
+        make_result(1000, hit_rate=0.80, mean_context_tokens=600),
+        make_result(2000, hit_rate=0.90, mean_context_tokens=1200),
+        make_result(3000, hit_rate=0.91, mean_context_tokens=1800),
+    ]
+
+    assert recommend_setting(results, hit_rate_tolerance=0.02).max_characters == 2000
+
+
+def test_load_labelled_queries_from_csv(tmp_path):
+    queries_path = tmp_path / "queries.csv"
+    queries_path.write_text("query,file_name,text\nWhat is the budget?,costs.pdf,\nWho signed off?,case.pdf,Jo\n")
+
+    queries = load_labelled_queries(queries_path)
+
+    assert queries == [
+        LabelledQuery(query="What is the budget?", file_name="costs.pdf"),
+        LabelledQuery(query="Who signed off?", file_name="case.pdf", text="Jo"),
+    ]
+
+
+def test_benchmark_setting_measures_hits_against_expected_text(mocker):
+    mocker.patch(
+        "scout.DataIngest.chunking_benchmark.chunk_by_title",
+        side_effect=lambda elements, **_: [SimpleNamespace(text=text) for text in elements],
+    )
+    elements_by_file = {"costs.pdf": ["The budget is 10m", "Risks are high"], "case.pdf": ["Signed off by Jo"]}
+    # Chunks are embedded along one axis each, queries point at the chunk they should retrieve
+    chunk_vectors = {"The budget is 10m": [1, 0, 0], "Risks are high": [0, 1, 0], "Signed off by Jo": [0, 0, 1]}
+    queries = [
+        LabelledQuery(query="budget", file_name="costs.pdf", text="budget is 10m"),
+        LabelledQuery(query="sign off", file_name="case.pdf", text="signed off by Sam"),
+    ]
+
+    result = benchmark_setting(
+        elements_by_file,
+        queries,
+        query_embeddings=np.array([[1.0, 0.1, 0], [0, 0.1, 1.0]]),
+        embed_documents=lambda texts: [chunk_vectors[text] for text in texts],
+        max_characters=1000,
+        new_after_n_chars=800,
+        k=1,
+    )
+
+    assert result.num_chunks == 3
+    assert result.hit_rate == 0.5
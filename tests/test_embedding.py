@@ -0,0 +1,152 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+from uuid import uuid4
+
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import InMemoryByteStore
+
+from scout.DataIngest.chunkers import (
+    add_chunks_to_vector_store,
+    anonymise_chunks,
+    copy_chunk_vectors,
+    process_chunks,
+)
+from scout.DataIngest.embedding import (
+    EmbeddingRateLimiter,
+    RateLimitedEmbeddings,
+    count_tokens,
+    embed_texts_in_batches,
+    make_token_batches,
+)
+
+
+def test_make_token_batches_respects_token_budget_and_order():
+    batches = make_token_batches([40, 40, 30, 100, 10, 10], max_tokens_per_batch=80)
+
+    assert batches == [[0, 1], [2], [3], [4, 5]]
+
+
+def test_make_token_batches_limits_texts_per_batch():
+    batches = make_token_batches([1] * 5, max_tokens_per_batch=100, max_texts_per_batch=2)
+
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+def test_embed_texts_in_batches_keeps_order():
+    texts = [f"text {i}" for i in range(50)]
+
+    embeddings, stats = embed_texts_in_batches(
+        texts,
+        lambda batch: [[float(text.split()[-1])] for text in batch],
+        max_tokens_per_batch=10,
+        max_concurrent_batches=4,
+        rate_limiter=EmbeddingRateLimiter(),
+    )
+
+    assert embeddings == [[float(i)] for i in range(50)]
+    assert stats.texts == 50
+    assert stats.batches > 1
+
+
+def test_embed_texts_in_batches_uses_given_token_counts():
+    embeddings, stats = embed_texts_in_batches(
+        ["a", "b", "c"],
+        lambda batch: [[0.0] for _ in batch],
+        max_tokens_per_batch=10,
+        rate_limiter=EmbeddingRateLimiter(),
+        token_counts=[6, 6, 6],
+    )
+
+    assert stats.tokens == 18
+    assert stats.batches == 3
+
+
+def test_process_chunks_counts_tokens_and_anonymising_recounts_them():
+    raw_chunks = [
+        SimpleNamespace(text="Jo Bloggs approved the business case", metadata=SimpleNamespace(page_number=1)),
+        SimpleNamespace(text="Costs rose", metadata=SimpleNamespace(page_number=None)),
+    ]
+
+    chunks = process_chunks(file=None, raw_chunks=raw_chunks)
+
+    assert [chunk.token_count for chunk in chunks] == count_tokens([chunk.text for chunk in raw_chunks])
+    assert [chunk.page_num for chunk in chunks] == [1, 0]
+
+    anonymizer = SimpleNamespace(
+        anonymize=lambda text, results: SimpleNamespace(text=text.replace("Jo Bloggs", "<PERSON_1>"))
+    )
+    anonymise_chunks(chunks, anonymizer=anonymizer, analyzer_results=[[], []])
+
+    assert chunks[0].token_count == count_tokens(["<PERSON_1> approved the business case"])[0]
+
+
+def test_copy_chunk_vectors_adds_copies_with_their_own_ids(mocker):
+    mocker.patch("scout.DataIngest.chunkers.CacheBackedEmbeddings", Mock)
+    file = SimpleNamespace(id=uuid4())
+    chunks = [
+        SimpleNamespace(id=uuid4(), idx=0, text="Costs rose", page_num=1, token_count=2, file=file),
+        SimpleNamespace(id=uuid4(), idx=1, text="Costs fell", page_num=2, token_count=2, file=file),
+    ]
+    vector_store = Mock()
+
+    copy_chunk_vectors(chunks, project_id="project", vector_store=vector_store)
+
+    assert vector_store.add_texts.call_args.kwargs["ids"] == [str(chunk.id) for chunk in chunks]
+    assert vector_store.add_texts.call_args.kwargs["texts"] == ["Costs rose", "Costs fell"]
+
+
+def test_copy_chunk_vectors_keeps_token_counts(mocker):
+    mocker.patch("scout.DataIngest.chunkers.CacheBackedEmbeddings", Mock)
+    count_tokens = mocker.patch("scout.DataIngest.chunkers.count_tokens")
+    file = SimpleNamespace(id=uuid4())
+    chunks = [SimpleNamespace(id=uuid4(), idx=0, text="Costs rose", page_num=1, token_count=2, file=file)]
+    vector_store = Mock()
+
+    copy_chunk_vectors(chunks, project_id="project", vector_store=vector_store)
+
+    (metadata,) = vector_store.add_texts.call_args.kwargs["metadatas"]
+    assert metadata["token_count"] == 2
+    assert metadata["uuid"] == str(chunks[0].id)
+    count_tokens.assert_not_called()
+
+
+def test_add_chunks_to_vector_store_adds_token_batches_with_ids():
+    file = SimpleNamespace(id=uuid4())
+    chunks = [
+        SimpleNamespace(id=uuid4(), text=f"Chunk {i}", page_num=1, token_count=tokens, file=file)
+        for i, tokens in enumerate([3, 3, 3])
+    ]
+    vector_store = Mock()
+
+    add_chunks_to_vector_store(chunks, project_id="project", vector_store=vector_store, max_tokens_per_add=6)
+
+    added = {}
+    for call in vector_store.add_texts.call_args_list:
+        for text, metadata, id in zip(call.kwargs["texts"], call.kwargs["metadatas"], call.kwargs["ids"]):
+            added[id] = (text, metadata["token_count"])
+    assert vector_store.add_texts.call_count == 2
+    assert added == {str(chunk.id): (chunk.text, 3) for chunk in chunks}
+
+
+def test_rate_limited_embeddings_only_take_tokens_for_texts_missing_from_the_cache():
+    model = Mock()
+    model.embed_documents.side_effect = lambda texts: [[float(len(text))] for text in texts]
+    rate_limiter = Mock(wraps=EmbeddingRateLimiter())
+    embeddings = CacheBackedEmbeddings.from_bytes_store(
+        RateLimitedEmbeddings(model, rate_limiter=rate_limiter), InMemoryByteStore(), namespace="test"
+    )
+    embeddings.embed_documents(["Costs rose"])
+    rate_limiter.acquire.reset_mock()
+
+    assert embeddings.embed_documents(["Costs rose", "Costs fell by half"]) == [[10.0], [18.0]]
+    model.embed_documents.assert_called_with(["Costs fell by half"])
+    rate_limiter.acquire.assert_called_once_with(count_tokens(["Costs fell by half"])[0])
+
+
+def test_rate_limiter_pauses_after_rate_limited_response():
+    rate_limiter = EmbeddingRateLimiter()
+    rate_limiter.observe_response(SimpleNamespace(status_code=429, headers={"retry-after-ms": "50"}))
+
+    assert rate_limiter.rate_limited_responses == 1
+    assert rate_limiter.acquire(100) > 0
+    assert rate_limiter.acquire(100) == 0
@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+from scout.DataIngest.file_info import add_llm_generated_file_info_for_files, get_llm_file_info_for_files
+from scout.DataIngest.models.schemas import FileInfo
+
+
+def _mock_async_client(mocker, create):
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+        client=SimpleNamespace(close=AsyncMock()),
+    )
+    mocker.patch("scout.DataIngest.file_info.get_async_instructor_client", return_value=client)
+    return client
+
+
+def test_get_llm_file_info_for_files_limits_concurrency_and_keeps_order(mocker):
+    in_flight, max_in_flight = 0, 0
+
+    async def create(messages, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return FileInfo(clean_name=messages[1]["content"])
+
+    client = _mock_async_client(mocker, create)
+
+    file_infos = get_llm_file_info_for_files(
+        "project", [(f"file{i}.pdf", f"text {i}") for i in range(6)], max_concurrency=2
+    )
+
+    assert [file_info.clean_name for file_info in file_infos] == [f"text {i}" for i in range(6)]
+    assert max_in_flight == 2
+    client.client.close.assert_awaited_once()
+
+
+def test_get_llm_file_info_for_files_runs_inside_an_event_loop(mocker):
+    async def create(messages, **kwargs):
+        return FileInfo(clean_name=messages[1]["content"])
+
+    _mock_async_client(mocker, create)
+
+    async def main():
+        return get_llm_file_info_for_files("project", [("file.pdf", "text")])
+
+    assert [file_info.clean_name for file_info in asyncio.run(main())] == ["text"]
+
+
+def test_add_llm_generated_file_info_for_files_updates_in_bulk(mocker):
+    async def create(messages, **kwargs):
+        if messages[1]["content"] == "bad":
+            raise ConnectionError("API unavailable")
+        return FileInfo(summary="A summary")
+
+    _mock_async_client(mocker, create)
+    storage_handler = Mock()
+    storage_handler.update_items.side_effect = lambda file_updates: file_updates
+    files = [
+        SimpleNamespace(id=uuid4(), name=name, type=".pdf", chunks=[], project=None) for name in ["a.pdf", "b.pdf"]
+    ]
+
+    updated_files, failed_files = add_llm_generated_file_info_for_files(
+        "project",
+        [(files[0], [SimpleNamespace(text="good")]), (files[1], [SimpleNamespace(text="bad")])],
+        storage_handler=storage_handler,
+    )
+
+    # A file the LLM fails on is saved without file info, rather than failing to ingest
+    storage_handler.update_items.assert_called_once()
+    assert [file.id for file in updated_files] == [files[0].id, files[1].id]
+    assert [file.summary for file in updated_files] == ["A summary", None]
+    assert failed_files == {}
@@ -1,8 +1,11 @@
 import uuid
 
-from scout.DataIngest.models.schemas import ChunkCreate, FileCreate, FileUpdate, ProjectCreate
+from scout.DataIngest.models.schemas import ChunkCreate, FileCreate, FileUpdate, Project, ProjectCreate
 from scout.utils.storage.postgres_database import SessionLocal
+from scout.utils.storage.postgres_interface import save_project_person_map
 from scout.utils.storage.postgres_models import Chunk as SqChunk
+from scout.utils.storage.postgres_models import File as SqFile
+from scout.utils.storage.postgres_models import Project as SqProject
 from scout.utils.storage.postgres_storage_handler import PostgresStorageHandler
 
 
@@ -102,3 +105,21 @@ def test_file_update_without_chunks():
         print(f"Found chunks: {db_chunks}")
         assert len(db_chunks) == 1, f"Expected 1 chunk, got {len(db_chunks)}"
         assert db_chunks[0].text == "Initial chunk 1"
+
+
+def test_saving_person_map_keeps_files_created_since_project_was_read():
+    """Test that saving a project's person map doesn't drop files another worker created in the meantime"""
+    storage_handler = PostgresStorageHandler()
+    created_project = storage_handler.write_item(ProjectCreate(name="test_project", id=uuid.uuid4()))
+    read_project = storage_handler.read_item(object_id=created_project.id, model=Project)
+
+    # Created by another worker after the project was read
+    created_file = storage_handler.write_item(
+        FileCreate(name="test_file3.pdf", type=".pdf", project=created_project, s3_key=f"{uuid.uuid4()}.pdf")
+    )
+    save_project_person_map(read_project.id, {"Jane Smith": "<Person 1>"})
+
+    with SessionLocal() as db:
+        db_project = db.query(SqProject).get(created_project.id)
+        assert db_project.person_map == {"Jane Smith": "<Person 1>"}
+        assert db.query(SqFile).get(created_file.id).project_id == created_project.id
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import Mock
+from uuid import uuid4
+
+from scout.DataIngest.models.schemas import IngestionRun, IngestionRunBase, IngestionRunFile, IngestionStage, Project
+from scout.Pipelines.ingestion_workers import IngestionWorker, wait_for_project_files
+
+PROJECT = Project(id=uuid4(), name="project", created_datetime=datetime.now(), updated_datetime=None)
+RUN = IngestionRun(
+    id=uuid4(),
+    created_datetime=datetime.now(),
+    updated_datetime=None,
+    project_directory_name="project",
+    status="running",
+    project=PROJECT,
+)
+
+
+def make_run_file(stage, attempts=1, lease_expires_at=None):
+    # As returned by `claim_ingestion_run_file`, whose run doesn't include its project
+    return IngestionRunFile(
+        id=uuid4(),
+        created_datetime=datetime.now(),
+        updated_datetime=None,
+        name="report.pdf",
+        stage=stage,
+        attempts=attempts,
+        lease_expires_at=lease_expires_at,
+        run=IngestionRunBase.model_validate(RUN.model_dump(exclude={"project", "files"})),
+    )
+
+
+def make_storage_handler():
+    storage_handler = Mock()
+    storage_handler.read_item.side_effect = lambda object_id, model: {IngestionRun: RUN, Project: PROJECT}[model]
+    return storage_handler
+
+
+def test_run_once_marks_failed_file_and_releases_lease(mocker):
+    run_file = make_run_file(IngestionStage.UPLOADED)
+    mocker.patch("scout.Pipelines.ingestion_workers.claim_ingestion_run_file", return_value=run_file)
+    release = mocker.patch("scout.Pipelines.ingestion_workers.release_ingestion_run_file")
+    checkpointer_class = mocker.patch("scout.Pipelines.ingestion_workers.IngestionCheckpointer")
+    storage_handler = make_storage_handler()
+    worker = IngestionWorker(storage_handler=storage_handler, s3_storage_handler=Mock(), worker_id="worker-1")
+    mocker.patch.object(worker, "_vector_store")
+    error = RuntimeError("conversion failed")
+    mocker.patch("scout.Pipelines.ingestion_workers.convert_to_pdf_from_s3", side_effect=error)
+
+    assert worker.run_once()
+
+    checkpointer_class.assert_called_with(PROJECT, "project", storage_handler)
+    checkpointer_class.return_value.mark_failed.assert_called_once_with("report.pdf", error)
+    release.assert_called_once_with(run_file.id, "worker-1")
+
+
+def test_run_once_without_queued_files(mocker):
+    mocker.patch("scout.Pipelines.ingestion_workers.claim_ingestion_run_file", return_value=None)
+    worker = IngestionWorker(storage_handler=Mock(), s3_storage_handler=Mock())
+
+    assert not worker.run_once()
+
+
+def test_wait_for_project_files_waits_for_leased_last_attempt(mocker):
+    mocker.patch("scout.Pipelines.ingestion_workers.get_project_directory_name", return_value="project")
+    mocker.patch("scout.Pipelines.ingestion_workers.time.sleep")
+    checkpointer_class = mocker.patch("scout.Pipelines.ingestion_workers.IngestionCheckpointer")
+    leased = make_run_file(
+        IngestionStage.CHUNKED, attempts=3, lease_expires_at=datetime.now(timezone.utc) + timedelta(minutes=5)
+    )
+    given_up = make_run_file(IngestionStage.CONVERTED, attempts=3)
+    checkpointer_class.side_effect = [
+        SimpleNamespace(files={"report.pdf": leased}),
+        Mock(files={"report.pdf": given_up}, finish=Mock(return_value="incomplete")),
+    ]
+
+    assert wait_for_project_files(PROJECT, storage_handler=Mock(), max_attempts=3) == "incomplete"
+    assert checkpointer_class.call_count == 2
@@ -0,0 +1,57 @@
+import threading
+
+from scout.DataIngest.memory import MemoryBudget, log_peak_rss, peak_rss_bytes
+
+
+def test_memory_budget_holds_back_files_until_memory_is_released():
+    budget = MemoryBudget(max_bytes=100)
+    budget.acquire(60)
+    acquired = threading.Event()
+    waiting = threading.Thread(target=lambda: (budget.acquire(60), acquired.set()))
+    waiting.start()
+
+    assert not acquired.wait(0.1)
+    budget.release(60)
+    assert acquired.wait(1)
+    waiting.join()
+    assert budget.in_flight_bytes == 60
+
+
+def test_memory_budget_lets_through_file_larger_than_budget_alone():
+    budget = MemoryBudget(max_bytes=100)
+
+    with budget.reserve(500):
+        assert budget.in_flight_bytes == 500
+    assert budget.in_flight_bytes == 0
+
+
+def test_memory_budget_estimates_from_file_size(tmp_path):
+    file_path = tmp_path / "report.pdf"
+    file_path.write_bytes(b"x" * 1000)
+
+    assert MemoryBudget(max_bytes=None, memory_per_file_byte=5).estimate(file_path) == 5000
+
+
+def test_log_peak_rss():
+    with log_peak_rss("chunking report.pdf"):
+        data = bytearray(2**20)
+    del data
+
+    assert peak_rss_bytes() > 0
+
+
+def test_log_peak_rss_only_resets_peak_for_blocks_on_their_own(mocker):
+    reset_peak_rss = mocker.patch("scout.DataIngest.memory.reset_peak_rss", return_value=True)
+    logger = mocker.patch("scout.DataIngest.memory.logger")
+
+    with log_peak_rss("chunking a.pdf"):
+        with log_peak_rss("chunking b.pdf"):
+            pass
+    with log_peak_rss("chunking c.pdf"):
+        pass
+
+    assert reset_peak_rss.call_count == 2
+    messages = [call.args[0] for call in logger.info.call_args_list]
+    assert "alongside other files" in messages[0] and "b.pdf" in messages[0]
+    assert "alongside other files" in messages[1] and "a.pdf" in messages[1]
+    assert messages[2].startswith("Peak RSS chunking c.pdf: ")
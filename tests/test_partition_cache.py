@@ -0,0 +1,34 @@
+import gzip
+
+from unstructured.documents.elements import Text, Title
+
+from scout.DataIngest.partition_cache import PartitionCache, partition_cache_key
+from scout.utils.storage.cache_store import LocalCacheStore
+
+
+def test_local_partition_cache_round_trip(tmp_path):
+    cache = PartitionCache(LocalCacheStore(tmp_path))
+    elements = [Title("Business case"), Text("Some text about the project")]
+
+    assert cache.get("abc123", "fast") is None
+    cache.put("abc123", "fast", elements, {1: "fast"})
+
+    cached_elements, page_strategies = cache.get("abc123", "fast")
+    assert [element.text for element in cached_elements] == ["Business case", "Some text about the project"]
+    assert [type(element) for element in cached_elements] == [Title, Text]
+    assert page_strategies == {1: "fast"}
+    assert cache.get("abc123", "hi_res") is None
+
+
+def test_corrupt_partition_cache_entries_are_ignored(tmp_path):
+    store = LocalCacheStore(tmp_path)
+    cache = PartitionCache(store)
+    store.put(partition_cache_key("not_gzip", "fast"), b"not gzip")
+    store.put(partition_cache_key("truncated", "fast"), gzip.compress(b'{"elements": []}')[:-4])
+    store.put(partition_cache_key("not_json", "fast"), gzip.compress(b"not json"))
+    store.put(partition_cache_key("missing_keys", "fast"), gzip.compress(b"{}"))
+
+    assert cache.get("not_gzip", "fast") is None
+    assert cache.get("truncated", "fast") is None
+    assert cache.get("not_json", "fast") is None
+    assert cache.get("missing_keys", "fast") is None
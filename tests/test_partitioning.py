@@ -0,0 +1,70 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+from scout.DataIngest.chunkers import check_file_can_be_chunked
+from scout.DataIngest.partitioning import (
+    can_partition_without_converting,
+    count_pdf_pages,
+    group_pages_by_strategy,
+    partition_file,
+    write_pdf_page_range,
+)
+
+
+def make_pdf(path, num_pages):
+    writer = PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(width=200, height=200)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def test_write_pdf_page_range(tmp_path):
+    filepath = make_pdf(tmp_path / "test.pdf", 10)
+
+    range_filepath = write_pdf_page_range(PdfReader(str(filepath)), first_page=4, last_page=7)
+
+    assert count_pdf_pages(range_filepath) == 4
+    range_filepath.unlink()
+
+
+def test_partition_file_small_pdf_is_not_split(tmp_path, mocker):
+    filepath = make_pdf(tmp_path / "test.pdf", 3)
+    parallel = mocker.patch("scout.DataIngest.partitioning.partition_pdf_in_parallel")
+    mocker.patch("scout.DataIngest.partitioning.partition", return_value=[])
+
+    assert partition_file(filepath, strategy="fast", max_workers=4) == ([], {})
+    parallel.assert_not_called()
+
+
+def test_group_pages_by_strategy():
+    strategies = ["fast", "fast", "hi_res", "fast", "fast", "fast"]
+
+    assert group_pages_by_strategy(strategies, max_pages_per_range=2) == [
+        (1, 2, "fast"),
+        (3, 3, "hi_res"),
+        (4, 5, "fast"),
+        (6, 6, "fast"),
+    ]
+
+
+def test_can_partition_without_converting():
+    assert can_partition_without_converting("project/raw/report.docx")
+    assert can_partition_without_converting("project/raw/Slides.PPTX")
+    assert not can_partition_without_converting("project/raw/report.pdf")
+    assert not can_partition_without_converting("project/raw/notes.doc")
+
+
+def test_check_file_can_be_chunked_allows_office_files_partitioned_natively():
+    file = SimpleNamespace(name="report.pdf", type=".pdf")
+
+    check_file_can_be_chunked(file, Path("/tmp/report.pdf"))
+    check_file_can_be_chunked(file, Path("/tmp/report.docx"))
+    with pytest.raises(ValueError):
+        check_file_can_be_chunked(file, Path("/tmp/notes.doc"))
+    with pytest.raises(ValueError):
+        check_file_can_be_chunked(SimpleNamespace(name="report.docx", type=".docx"), Path("/tmp/report.docx"))
@@ -0,0 +1,43 @@
+from scout.DataIngest.pipeline import Stage, StagedPipeline
+
+
+def test_staged_pipeline_runs_items_through_all_stages():
+    pipeline = StagedPipeline(
+        [
+            Stage("double", lambda x: x * 2, concurrency=3),
+            Stage("increment", lambda x: x + 1, concurrency=2),
+        ],
+        queue_size=2,
+    )
+    results = pipeline.run(range(20))
+
+    assert sorted(results) == [x * 2 + 1 for x in range(20)]
+    assert [stats.items_in for stats in pipeline.stats] == [20, 20]
+    assert pipeline.errors == []
+
+
+def test_staged_pipeline_records_errors_and_drops_items():
+    def fail_on_three(x):
+        if x == 3:
+            raise ValueError("Bad item")
+        return None if x == 5 else x
+
+    pipeline = StagedPipeline([Stage("check", fail_on_three, concurrency=2), Stage("keep", lambda x: x)])
+    results = pipeline.run(range(10))
+
+    assert sorted(results) == [0, 1, 2, 4, 6, 7, 8, 9]
+    assert [(stage_name, item) for stage_name, item, _ in pipeline.errors] == [("check", 3)]
+    assert pipeline.stats[0].errors == 1
+    assert pipeline.stats[1].items_in == 8
+
+
+def test_staged_pipeline_logs_item_descriptions(mocker):
+    log_exception = mocker.patch("scout.DataIngest.pipeline.logger.exception")
+
+    def fail(item):
+        raise ValueError("Bad item")
+
+    pipeline = StagedPipeline([Stage("check", fail)], describe_item=lambda item: item[0])
+    pipeline.run([("report.pdf", ["a very long chunk of text"])])
+
+    log_exception.assert_called_once_with("Pipeline stage check failed for item report.pdf")
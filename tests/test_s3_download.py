@@ -0,0 +1,51 @@
+from unittest.mock import Mock
+
+from scout.DataIngest.s3_download import convert_to_pdf_from_s3, get_processed_file_key
+
+
+def test_get_processed_file_key():
+    assert get_processed_file_key("my-project/raw/report.docx") == "my-project/processed/report.pdf"
+    assert get_processed_file_key("my-project/raw/slides.final.pptx") == "my-project/processed/slides.final.pdf"
+    assert get_processed_file_key("report.pdf") == "processed/report.pdf"
+
+
+def test_convert_to_pdf_from_s3_copies_pdfs_and_keeps_order(mocker):
+    mock_s3_storage_handler = Mock()
+    mock_convert = mocker.patch(
+        "scout.DataIngest.s3_download.LibreOfficeClient.convert",
+        side_effect=lambda key: get_processed_file_key(key),
+    )
+
+    converted_keys = convert_to_pdf_from_s3(
+        ["p/raw/a.docx", "p/raw/b.pdf", "p/raw/c.pptx"], s3_storage_handler=mock_s3_storage_handler
+    )
+
+    assert converted_keys == ["p/processed/a.pdf", "p/processed/b.pdf", "p/processed/c.pdf"]
+    mock_s3_storage_handler.copy_item.assert_called_once_with("p/raw/b.pdf", "p/processed/b.pdf")
+    assert sorted(call.args[0] for call in mock_convert.call_args_list) == ["p/raw/a.docx", "p/raw/c.pptx"]
+
+
+def test_download_files_reads_keys_from_bucket_in_order():
+    import hashlib
+
+    from scout.Pipelines.ingest_project_data import download_files
+
+    contents = {"p/processed/a.pdf": [b"first ", b"file"], "p/processed/b.docx": [b"second file"]}
+    mock_s3_storage_handler = Mock()
+    mock_s3_storage_handler.iter_chunks.side_effect = lambda key: iter(contents[key])
+
+    downloads = download_files(
+        ["p/processed/a.pdf", "p/processed/b.docx"],
+        mock_s3_storage_handler,
+        max_concurrent_downloads=2,
+    )
+
+    (a_path, a_hash), (b_path, b_hash) = downloads
+    assert (a_path.suffix, a_path.read_bytes(), a_hash) == (
+        ".pdf",
+        b"first file",
+        hashlib.sha256(b"first file").hexdigest(),
+    )
+    assert (b_path.suffix, b_path.read_bytes()) == (".docx", b"second file")
+    a_path.unlink()
+    b_path.unlink()
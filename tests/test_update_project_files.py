@@ -0,0 +1,189 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import Mock
+from uuid import uuid4
+
+import pytest
+
+from scout.DataIngest.models.schemas import File, Project
+from scout.Pipelines.update_project_files import (
+    add_project_files,
+    delete_file_from_project,
+    find_project_file,
+    get_processed_file_name,
+    get_raw_s3_key,
+    ingest_uploaded_project_files,
+)
+
+
+def make_project():
+    return Project(id=uuid4(), name="project", created_datetime=datetime.now(), updated_datetime=None)
+
+
+def make_file(name, num_chunks=0):
+    return SimpleNamespace(id=uuid4(), name=name, chunks=[SimpleNamespace(id=uuid4()) for _ in range(num_chunks)])
+
+
+def make_stored_file(name, s3_key=None):
+    return File(
+        id=uuid4(), created_datetime=datetime.now(), updated_datetime=None, type=".pdf", name=name, s3_key=s3_key
+    )
+
+
+def test_get_processed_file_name():
+    assert get_processed_file_name("report.docx") == "report.pdf"
+    assert get_processed_file_name(".data/project/slides.final.pptx") == "slides.final.pdf"
+
+
+def test_find_project_file_matches_whole_name():
+    storage_handler = Mock()
+    report = make_file("report.pdf")
+    storage_handler.get_item_by_attribute.return_value = [make_file("old_report.pdf"), report]
+
+    assert find_project_file(make_project(), "report.docx", storage_handler) is report
+
+
+def test_delete_file_from_project_deletes_vectors_and_file():
+    vector_store, storage_handler = Mock(), Mock()
+    file = make_file("report.pdf", num_chunks=2)
+
+    delete_file_from_project(file, vector_store=vector_store, storage_handler=storage_handler)
+
+    vector_store.delete.assert_called_once_with(ids=[str(chunk.id) for chunk in file.chunks])
+    storage_handler.delete_item.assert_called_once_with(file)
+
+
+def test_add_project_files_refuses_existing_file_without_replace(mocker):
+    mocker.patch(
+        "scout.Pipelines.update_project_files.get_project_to_resume",
+        return_value=make_project(),
+    )
+    storage_handler = Mock()
+    storage_handler.get_item_by_attribute.return_value = [make_file("report.pdf", num_chunks=1)]
+    vector_store = Mock()
+
+    with pytest.raises(ValueError):
+        add_project_files("project", ["report.docx"], vector_store=vector_store, storage_handler=storage_handler)
+    storage_handler.delete_item.assert_not_called()
+    vector_store.delete.assert_not_called()
+
+
+def test_delete_file_from_project_deletes_s3_objects():
+    vector_store, storage_handler, s3_storage_handler = Mock(), Mock(), Mock()
+    file = make_stored_file("report.pdf", s3_key="project/processed/report.pdf")
+    storage_handler.get_item_by_attribute.return_value = [
+        SimpleNamespace(raw_s3_key="project/raw/report.docx", processed_s3_key="project/processed/report.pdf")
+    ]
+
+    delete_file_from_project(
+        file, vector_store=vector_store, storage_handler=storage_handler, s3_storage_handler=s3_storage_handler
+    )
+
+    assert [call.args[0] for call in s3_storage_handler.delete_key.call_args_list] == [
+        "project/processed/report.pdf",
+        "project/raw/report.docx",
+    ]
+
+
+def mock_ingestion(mocker, embedded):
+    for name in ["get_project_directory_name", "save_person_map", "Anonymizer"]:
+        mocker.patch(f"scout.Pipelines.update_project_files.{name}")
+    mocker.patch("scout.Pipelines.update_project_files.convert_to_pdf_from_s3", side_effect=lambda keys, **_: [])
+    checkpointer = mocker.patch("scout.Pipelines.update_project_files.IngestionCheckpointer").return_value
+    checkpointer.is_done.return_value = embedded
+    new_file = make_file("report.pdf")
+    mocker.patch("scout.Pipelines.update_project_files.save_files_to_db_and_temp", return_value=[(new_file, Mock())])
+    return mocker.patch("scout.Pipelines.update_project_files.chunk_embed_save_from_temp_filepath")
+
+
+def test_replaced_file_is_kept_if_new_version_fails(mocker):
+    chunk_embed_save = mock_ingestion(mocker, embedded=False)
+    chunk_embed_save.side_effect = RuntimeError("Embedding failed")
+    storage_handler, s3_storage_handler = Mock(), Mock()
+    storage_handler.get_item_by_attribute.return_value = []
+    old_file = make_stored_file("report.pdf")
+
+    with pytest.raises(RuntimeError):
+        ingest_uploaded_project_files(
+            make_project(),
+            ["project/replacements/1/raw/report.pdf"],
+            vector_store=Mock(),
+            storage_handler=storage_handler,
+            s3_storage_handler=s3_storage_handler,
+            files_to_replace=[old_file],
+        )
+    storage_handler.delete_item.assert_not_called()
+    s3_storage_handler.delete_key.assert_not_called()
+
+
+def test_replaced_file_is_deleted_once_new_version_is_embedded(mocker):
+    mock_ingestion(mocker, embedded=True)
+    storage_handler, s3_storage_handler, vector_store = Mock(), Mock(), Mock()
+    storage_handler.get_item_by_attribute.return_value = []
+    old_file = make_stored_file("report.pdf", s3_key="project/processed/report.pdf")
+
+    ingest_uploaded_project_files(
+        make_project(),
+        ["project/replacements/1/raw/report.pdf"],
+        vector_store=vector_store,
+        storage_handler=storage_handler,
+        s3_storage_handler=s3_storage_handler,
+        files_to_replace=[old_file],
+    )
+
+    storage_handler.delete_item.assert_called_once_with(old_file)
+    s3_storage_handler.delete_key.assert_called_once_with("project/processed/report.pdf")
+
+
+def test_get_raw_s3_key_uploads_replacements_separately():
+    project = make_project()
+
+    assert get_raw_s3_key(project, "notes.docx", replacing=[make_file("report.pdf")]) == "project/raw/notes.docx"
+    replacement_key = get_raw_s3_key(project, "report.docx", replacing=[make_file("report.pdf")])
+    assert replacement_key.startswith("project/replacements/") and replacement_key.endswith("/raw/report.docx")
+
+
+def test_replacing_a_file_keeps_the_new_version_and_its_chunks(mocker, tmp_path):
+    """Runs against Postgres, as replacing a file depends on how files are found again when they are saved"""
+    from scout.DataIngest.models.schemas import ChunkCreate, FileFilter, IngestionRunCreate, ProjectCreate
+    from scout.Pipelines.ingest_project_data import create_file_from_s3_key
+    from scout.utils.storage.postgres_storage_handler import PostgresStorageHandler
+
+    storage_handler = PostgresStorageHandler()
+    s3_storage_handler, vector_store = Mock(), Mock()
+    project = storage_handler.write_item(ProjectCreate(name=f"test_project_{uuid4().hex}"))
+    storage_handler.write_item(IngestionRunCreate(project_directory_name="test_project", project=project))
+    old_file = create_file_from_s3_key(
+        "project/processed/report.pdf",
+        project=project,
+        s3_storage_handler=s3_storage_handler,
+        storage_handler=storage_handler,
+        content_hash="old",
+    )
+    old_chunks = storage_handler.write_items([ChunkCreate(idx=0, text="Old text", page_num=1, file=old_file)])
+    old_file = find_project_file(project, "report.pdf", storage_handler)
+
+    temp_filepath = tmp_path / "report.pdf"
+    temp_filepath.write_bytes(b"%PDF")
+    mocker.patch("scout.Pipelines.update_project_files.convert_to_pdf_from_s3", side_effect=lambda keys, **_: [])
+    mocker.patch("scout.Pipelines.ingest_project_data.download_files", return_value=[(temp_filepath, "new")])
+    mocker.patch(
+        "scout.Pipelines.ingest_project_data.chunk_file",
+        side_effect=lambda file, **_: [ChunkCreate(idx=0, text="New text", page_num=1, file=file)],
+    )
+    mocker.patch("scout.Pipelines.ingest_project_data.add_llm_generated_file_info_for_files", return_value=([], {}))
+
+    ingest_uploaded_project_files(
+        project,
+        ["project/replacements/1/raw/report.pdf"],
+        vector_store=vector_store,
+        storage_handler=storage_handler,
+        s3_storage_handler=s3_storage_handler,
+        files_to_replace=[old_file],
+    )
+
+    (file,) = storage_handler.get_item_by_attribute(FileFilter(name="report.pdf", project=project))
+    assert file.id != old_file.id
+    assert file.s3_key == "project/replacements/1/processed/report.pdf"
+    assert [chunk.text for chunk in file.chunks] == ["New text"]
+    vector_store.delete.assert_called_once_with(ids=[str(chunk.id) for chunk in old_chunks])
@@ -0,0 +1,47 @@
+from datetime import datetime
+from unittest.mock import Mock
+from uuid import uuid4
+
+from scout.DataIngest.models.schemas import Project
+
+from scout.Pipelines.watch_project_files import LocalFolderSource, ProjectFileWatcher
+
+
+def test_local_folder_source_lists_watched_files(tmp_path):
+    (tmp_path / "report.pdf").write_bytes(b"report")
+    (tmp_path / "notes.docx").write_bytes(b"notes")
+    (tmp_path / "image.png").write_bytes(b"image")
+    (tmp_path / ".~lock.notes.docx").write_bytes(b"lock")
+
+    versions = LocalFolderSource(tmp_path).list_files()
+
+    assert sorted(versions) == ["notes.docx", "report.pdf"]
+
+
+def test_poll_ingests_files_once_they_stop_changing(mocker):
+    project = Project(id=uuid4(), name="project", created_datetime=datetime.now(), updated_datetime=None)
+    mocker.patch("scout.Pipelines.watch_project_files.get_project_to_resume", return_value=project)
+    mocker.patch("scout.Pipelines.watch_project_files.find_project_file", return_value=None)
+    mocker.patch("scout.Pipelines.watch_project_files.warm_up_engines")
+    mocker.patch("scout.Pipelines.watch_project_files.find_files_to_replace", return_value=[])
+    ingest = mocker.patch("scout.Pipelines.watch_project_files.ingest_uploaded_project_files")
+    source = Mock()
+    source.list_files.return_value = {}
+    watcher = ProjectFileWatcher(
+        "project", source, vector_store=Mock(), storage_handler=Mock(), s3_storage_handler=Mock()
+    )
+    watcher.start()
+
+    # Seen for the first time, it may still be being copied
+    source.list_files.return_value = {"report.pdf": "v1"}
+    assert watcher.poll() == []
+    # Unchanged since the last poll
+    assert watcher.poll() == ["report.pdf"]
+    assert ingest.call_args.args[1] == ["project/raw/report.pdf"]
+    # Already ingested
+    assert watcher.poll() == []
+    # Changed, ingested again once it has settled
+    source.list_files.return_value = {"report.pdf": "v2"}
+    assert watcher.poll() == []
+    assert watcher.poll() == ["report.pdf"]
+    assert ingest.call_count == 2